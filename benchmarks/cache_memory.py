@@ -0,0 +1,106 @@
+"""Vergleicht den Speicherbedarf des Gateway-Caches im normalen und im schlanken Betrieb (LEAN_CACHE).
+
+Erzeugt synthetische GUILD_CREATE-Daten und lädt sie in den Cache eines nicht verbundenen
+Clients, so wie er nach dem Start (und im normalen Betrieb nach dem Chunking) aussieht.
+
+    python benchmarks/cache_memory.py --guilds 20 --members 5000 --voice 200
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import discord
+
+from common import load_talk_bot, save_results
+
+BOT_ID = 1 << 40
+
+def snowflake(n):
+    return (n << 22) | 1
+
+def guild_payload(guild_index, members, voice_members, lean):
+    guild_id = snowflake(1_000_000 + guild_index)
+    voice_channel_id = snowflake(2_000_000 + guild_index)
+    member_ids = [snowflake(10_000_000 + guild_index * members + i) for i in range(members)]
+    in_voice = member_ids[:voice_members]
+
+    def member(user_id):
+        return {
+            "user": {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None},
+            "roles": [],
+            "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+
+    # Ohne Members-Intent schickt Discord nur Mitglieder in Voice-Kanälen und den Bot selbst
+    cached_ids = in_voice if lean else member_ids
+    payload = {
+        "id": str(guild_id),
+        "name": f"Server {guild_index}",
+        "owner_id": str(member_ids[0]),
+        "member_count": members,
+        "roles": [{"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [{"id": str(voice_channel_id), "type": 2, "name": "🎙️ Talk", "position": 0, "permission_overwrites": [], "bitrate": 64000, "user_limit": 0}],
+        "members": [member(user_id) for user_id in cached_ids] + [member(BOT_ID)],
+        "voice_states": [
+            {"user_id": str(user_id), "channel_id": str(voice_channel_id), "session_id": "x", "deaf": False, "mute": False,
+             "self_deaf": False, "self_mute": False, "self_video": False, "suppress": False}
+            for user_id in in_voice
+        ],
+    }
+    if not lean:
+        payload["presences"] = [
+            {"user": {"id": str(user_id)}, "status": "online", "activities": [{"name": "Spiel", "type": 0}], "client_status": {"desktop": "online"}}
+            for user_id in member_ids
+        ]
+    return payload
+
+def measure(talk_bot, lean, guilds, members, voice_members):
+    client = discord.Client(intents=talk_bot.build_intents(lean), member_cache_flags=talk_bot.build_member_cache_flags(lean))
+    client._connection.user = discord.ClientUser(state=client._connection, data={"id": str(BOT_ID), "username": "bot", "discriminator": "0", "avatar": None})
+    payloads = [guild_payload(i, members, voice_members, lean) for i in range(guilds)]
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for payload in payloads:
+        client._connection._add_guild_from_data(payload)
+    elapsed = time.perf_counter() - started
+    del payloads
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cached_members = sum(len(guild.members) for guild in client.guilds)
+    return {
+        "mode": "lean" if lean else "full",
+        "cached_members": cached_members,
+        "cache_bytes": current,
+        "peak_bytes": peak,
+        "load_seconds": round(elapsed, 4),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, default=5000, help="Mitglieder pro Server")
+    parser.add_argument("--voice", type=int, default=200, help="Mitglieder pro Server in Voice-Kanälen")
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    results = [measure(talk_bot, lean, args.guilds, args.members, args.voice) for lean in (False, True)]
+    for result in results:
+        print(f"{result['mode']:>4}: {result['cached_members']:>8} Mitglieder, "
+              f"{result['cache_bytes'] / 1024 / 1024:8.1f} MiB Cache, {result['load_seconds']:.2f}s")
+    full, lean = results
+    if lean["cache_bytes"]:
+        print(f"Faktor: {full['cache_bytes'] / lean['cache_bytes']:.1f}x weniger Speicher im schlanken Betrieb")
+    path = save_results("cache_memory", {"parameters": vars(args), "runs": results}, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+
+if __name__ == "__main__":
+    main()
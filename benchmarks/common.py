@@ -0,0 +1,43 @@
+"""Gemeinsame Hilfsfunktionen für die Benchmarks"""
+import importlib.util
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+def load_talk_bot():
+    """Importiert talk-bot.py als Modul (der Dateiname ist kein gültiger Modulname)"""
+    module = sys.modules.get("talk_bot")
+    if module is not None:
+        return module
+    # Die Erweiterungen unter cogs/ werden als Paket aus dem Projektordner importiert
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location("talk_bot", os.path.join(ROOT, "talk-bot.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["talk_bot"] = module
+    spec.loader.exec_module(module)
+    # talk-bot.py erstellt die Instanz erst unter __main__
+    module.bot = module.TalkBot()
+    return module
+
+def save_results(name, results, path=None):
+    """Speichert Ergebnisse als JSON, damit Läufe verglichen werden können"""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        path = os.path.join(RESULTS_DIR, f"{name}_{stamp}.json")
+    document = {
+        "benchmark": name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return path
@@ -0,0 +1,316 @@
+"""Minimale Nachbildung der discord.py-Objekte und der HTTP-Schicht für Benchmarks ohne Discord-Verbindung.
+
+Die Fakes bilden nur die Attribute und Methoden nach, die talk-bot.py tatsächlich verwendet.
+REST-Aufrufe warten eine einstellbare Latenz ab und werden pro Route gezählt.
+"""
+import asyncio
+import collections
+import itertools
+import random
+import time
+
+import discord
+
+_ids = itertools.count(1 << 32)
+
+def next_id():
+    return next(_ids)
+
+class FakeHTTP:
+    """Simuliert Discord-REST-Aufrufe mit Latenz und zählt sie pro Route"""
+
+    def __init__(self, latency=0.02, jitter=0.5, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.calls = collections.Counter()
+        self.inflight = 0
+
+    async def request(self, route):
+        self.calls[route] += 1
+        self.inflight += 1
+        try:
+            if self.latency:
+                spread = self.latency * self.jitter
+                await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-spread, spread)))
+        finally:
+            self.inflight -= 1
+
+class FakePermissions:
+    def __init__(self, administrator=False):
+        self.administrator = administrator
+
+class FakeVoiceState:
+    def __init__(self, channel=None):
+        self.channel = channel
+
+class FakeGuild:
+    def __init__(self, gateway, name, id=None):
+        self.gateway = gateway
+        self.id = id or next_id()
+        self.name = name
+        self.channels = {}
+        self.members = {}
+        self.default_role = discord.Object(id=self.id, type=discord.Role)
+        self.me = discord.Object(id=next_id(), type=discord.Member)
+
+    @property
+    def voice_channels(self):
+        return [c for c in self.channels.values() if isinstance(c, FakeVoiceChannel)]
+
+    @property
+    def categories(self):
+        return [c for c in self.channels.values() if isinstance(c, FakeCategory)]
+
+    @property
+    def text_channels(self):
+        return [c for c in self.channels.values() if isinstance(c, FakeTextChannel)]
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    async def fetch_member(self, user_id):
+        await self.gateway.http.request("fetch_member")
+        member = self.members.get(user_id)
+        if member is None:
+            raise discord.NotFound(_FakeResponse(404), "Unknown Member")
+        return member
+
+    async def create_voice_channel(self, name, category=None, overwrites=None, reason=None):
+        await self.gateway.http.request("create")
+        channel = self.gateway.add_voice_channel(self, name, category)
+        if overwrites is not None:
+            channel.overwrites = dict(overwrites)
+        return channel
+
+class FakeCategory:
+    def __init__(self, guild, name, id=None):
+        self.id = id or next_id()
+        self.guild = guild
+        self.name = name
+        self.overwrites = {}
+
+    @property
+    def voice_channels(self):
+        return [c for c in self.guild.voice_channels if c.category is self]
+
+class FakeTextChannel:
+    def __init__(self, guild, name, id=None):
+        self.id = id or next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = f"<#{self.id}>"
+
+    async def send(self, **kwargs):
+        await self.guild.gateway.http.request("message")
+
+class FakeVoiceChannel:
+    def __init__(self, guild, name, category=None, id=None):
+        self.id = id or next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.mention = f"<#{self.id}>"
+        self.members = []
+        self.overwrites = dict(category.overwrites) if category is not None else {}
+
+    def overwrites_for(self, target):
+        for key, overwrite in self.overwrites.items():
+            if key.id == target.id:
+                return overwrite
+        return discord.PermissionOverwrite()
+
+    async def delete(self, reason=None):
+        gateway = self.guild.gateway
+        await gateway.http.request("delete")
+        gateway.remove_channel(self)
+
+    async def edit(self, name=None, category=None, reason=None, overwrites=None, sync_permissions=False, **kwargs):
+        await self.guild.gateway.http.request("edit")
+        if name is not None:
+            self.name = name
+        if category is not None:
+            self.category = category
+        if overwrites is not None:
+            self.overwrites = dict(overwrites)
+        elif sync_permissions and self.category is not None:
+            self.overwrites = dict(self.category.overwrites)
+        return self
+
+class FakeMember:
+    def __init__(self, guild, name, administrator=False, id=None):
+        self.id = id or next_id()
+        self.guild = guild
+        self.name = name
+        self.voice = None
+        self.guild_permissions = FakePermissions(administrator)
+        self.dms = 0
+
+    def __str__(self):
+        return self.name
+
+    async def move_to(self, channel, reason=None):
+        gateway = self.guild.gateway
+        await gateway.http.request("move")
+        if gateway.echo_moves:
+            gateway.move(self, channel)
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.gateway.http.request("dm")
+        self.dms += 1
+
+class _FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "Fake"
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+        self.messages = []
+        self.views = []
+        self.modal = None
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self):
+        if self._done:
+            raise RuntimeError("Interaction wurde bereits beantwortet")
+        self._done = True
+        await self.interaction.gateway.http.request("interaction")
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond()
+        self.messages.append(content if content is not None else kwargs.get("embed"))
+        self.views.append(kwargs.get("view"))
+
+    async def edit_message(self, **kwargs):
+        await self._respond()
+        self.messages.append(kwargs.get("content") if kwargs.get("embed") is None else kwargs["embed"])
+        self.views.append(kwargs.get("view"))
+
+    async def send_modal(self, modal):
+        await self._respond()
+        self.modal = modal
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.messages = []
+
+    async def send(self, content=None, **kwargs):
+        await self.interaction.gateway.http.request("followup")
+        self.messages.append(content if content is not None else kwargs.get("embed"))
+
+class FakeInteraction:
+    def __init__(self, gateway, user, guild=None, custom_id=None):
+        self.gateway = gateway
+        self.id = next_id()
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.type = discord.InteractionType.component if custom_id else discord.InteractionType.application_command
+        self.data = {"custom_id": custom_id} if custom_id else {}
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.edits = []
+
+    async def edit_original_response(self, **kwargs):
+        await self.gateway.http.request("interaction")
+        self.edits.append(kwargs.get("content"))
+
+class FakeGateway:
+    """Hält Server, Kanäle und Voice-Zustände und liefert Voice-Events an den Bot aus.
+
+    Wie bei discord.py wird der Cache zuerst aktualisiert und dann der Handler aufgerufen.
+    """
+
+    def __init__(self, http=None):
+        self.http = http or FakeHTTP()
+        self.guilds = {}
+        self.channels = {}
+        self.handler = None           # on_voice_state_update
+        self.followups = set()        # von move_to ausgelöste Events
+        self.latencies = []           # Laufzeit jedes Handler-Aufrufs in Sekunden
+        self.clock = time.perf_counter
+        # False beim Nachspielen eines Journals: dort liefert das Journal die Folge-Events der Verschiebungen
+        self.echo_moves = True
+
+    def add_guild(self, name, id=None):
+        guild = FakeGuild(self, name, id)
+        self.guilds[guild.id] = guild
+        return guild
+
+    def add_category(self, guild, name, id=None):
+        category = FakeCategory(guild, name, id)
+        guild.channels[category.id] = category
+        return category
+
+    def add_text_channel(self, guild, name, id=None):
+        channel = FakeTextChannel(guild, name, id)
+        guild.channels[channel.id] = channel
+        return channel
+
+    def add_voice_channel(self, guild, name, category=None, id=None):
+        channel = FakeVoiceChannel(guild, name, category, id)
+        guild.channels[channel.id] = channel
+        self.channels[channel.id] = channel
+        return channel
+
+    def add_member(self, guild, name, administrator=False, id=None):
+        member = FakeMember(guild, name, administrator, id)
+        guild.members[member.id] = member
+        return member
+
+    def remove_channel(self, channel):
+        channel.guild.channels.pop(channel.id, None)
+        self.channels.pop(channel.id, None)
+        for member in list(channel.members):
+            self.move(member, None, dispatch=False)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+    def _set_voice(self, member, channel):
+        before = FakeVoiceState(member.voice.channel if member.voice else None)
+        if before.channel is not None and member in before.channel.members:
+            before.channel.members.remove(member)
+        if channel is not None:
+            channel.members.append(member)
+            member.voice = FakeVoiceState(channel)
+        else:
+            member.voice = None
+        return before, FakeVoiceState(channel)
+
+    async def _dispatch(self, member, before, after):
+        started = self.clock()
+        await self.handler(member, before, after)
+        self.latencies.append(self.clock() - started)
+
+    async def voice_update(self, member, channel):
+        """Aktualisiert den Voice-Zustand und ruft den Handler auf; misst dessen Laufzeit"""
+        before, after = self._set_voice(member, channel)
+        await self._dispatch(member, before, after)
+
+    def move(self, member, channel, dispatch=True):
+        """Von move_to ausgelöst: Zustand sofort ändern, Event im Hintergrund ausliefern"""
+        before, after = self._set_voice(member, channel)
+        if dispatch:
+            task = asyncio.get_running_loop().create_task(self._dispatch(member, before, after))
+            self.followups.add(task)
+            task.add_done_callback(self.followups.discard)
+
+    async def drain(self):
+        while self.followups:
+            await asyncio.gather(*list(self.followups))
@@ -0,0 +1,371 @@
+"""Lasttest für die Handler aus talk-bot.py mit simuliertem Gateway und simulierter HTTP-Schicht.
+
+Szenarien:
+    voice_churn      Mitglieder betreten und verlassen offene Talks (on_voice_state_update)
+    password_joins   Massenhafte Beitritte zu passwortgeschützten Talks inkl. DM und Kick
+    interactions     Beitritts-Buttons, /talks_anzeigen und /talk_beitreten
+    create_burst     Alle Mitglieder klicken gleichzeitig „Talk erstellen“ (Kontingente und Warteschlange)
+
+    python benchmarks/load_test.py --members 10000 --talks 500
+    python benchmarks/load_test.py --scenario password_joins --latency 0.05   (mit Rate-Limits)
+"""
+import argparse
+import asyncio
+import collections
+import logging
+import random
+import resource
+import time
+import tracemalloc
+
+from common import load_talk_bot, save_results
+from fakes import FakeGateway, FakeHTTP, FakeInteraction
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def summarize(name, samples, wall, http, extra=None):
+    result = {
+        "scenario": name,
+        "events": len(samples),
+        "wall_seconds": round(wall, 4),
+        "throughput_per_second": round(len(samples) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 4),
+        "max_ms": round(max(samples) * 1000, 4) if samples else 0.0,
+        "rest_calls": dict(http.calls),
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    result.update(extra or {})
+    return result
+
+def measured_coalescer(talk_bot):
+    """VoiceEventCoalescer, der für jede eingeplante Entscheidung ein Future anlegt.
+
+    Das Future ist erledigt, sobald die erste Entscheidung (Passwort-DM, Kick) fertig ist;
+    das anschließende Zusammenfassungsfenster gehört nicht mehr zur Latenz des Events.
+    """
+    class MeasuredCoalescer(talk_bot.VoiceEventCoalescer):
+        def __init__(self):
+            super().__init__()
+            self.decisions = []
+
+        def submit(self, key, decide):
+            if key in self._active:
+                return super().submit(key, decide)
+            done = asyncio.get_running_loop().create_future()
+            self.decisions.append(done)
+
+            async def measured():
+                try:
+                    await decide()
+                finally:
+                    if not done.done():
+                        done.set_result(None)
+            return super().submit(key, measured)
+
+    return MeasuredCoalescer()
+
+class Harness:
+    """Verbindet die Bot-Instanz aus talk-bot.py mit einem FakeGateway.
+
+    Jeder Harness setzt den gesamten Zustand des Bots zurück, damit die Ergebnisse
+    nicht von der Reihenfolge der Szenarien abhängen.
+    """
+
+    def __init__(self, talk_bot, args, rate_limits=None):
+        self.tb = talk_bot
+        rate_limits = args.rate_limits if rate_limits is None else rate_limits
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.http = FakeHTTP(latency=args.latency, seed=args.seed)
+        self.gateway = FakeGateway(self.http)
+        self.guilds = []
+        self.members = []
+        self.talks = []
+
+        bot = talk_bot.bot
+        bot.get_channel = self.gateway.get_channel
+        bot.get_guild = self.gateway.get_guild
+        bot.talk_settings = {}
+        bot.talks = talk_bot.TalkRegistry()
+        bot.talk_lists = talk_bot.TalkListCache()
+        bot.store = talk_bot.MemoryTalkStore()
+        bot.metrics = talk_bot.Metrics()
+        bot.voice_events = measured_coalescer(talk_bot)
+        bot.member_lru = talk_bot.MemberLRU()
+        bot.talk_locks = talk_bot.KeyedLocks("talk", metrics=bot.metrics)
+        bot.joining = collections.Counter()
+        bot.password_attempts = talk_bot.AttemptThrottle()
+        bot.channel_pool = talk_bot.TalkChannelPool(bot, size=0)
+        bot.talk_access = talk_bot.TalkAccessControl(bot)
+        route_limits = None if rate_limits else {route: (1e9, 1e9) for route in talk_bot.REST_ROUTE_LIMITS}
+        bot.rest = talk_bot.RestScheduler(route_limits=route_limits or talk_bot.REST_ROUTE_LIMITS, metrics=bot.metrics)
+        # Löschungen liegen außerhalb der Messung
+        bot.deletion_scheduler = talk_bot.TalkDeletionScheduler(bot, delay=3600)
+        bot.admission = talk_bot.TalkAdmission(bot)
+        bot.occupancy = talk_bot.TalkOccupancy(bot)
+        self.bot = bot
+
+    async def start(self):
+        # Erweiterungen bleiben zwischen den Szenarien geladen und greifen über self.bot auf den neuen Zustand zu
+        for name in self.tb.EXTENSIONS:
+            if name not in self.bot.extensions:
+                await self.bot.load_extension(name)
+        handler = self.bot.get_cog("VoiceEvents").on_voice_state_update
+        voice_events = self.bot.voice_events
+
+        async def handle(member, before, after):
+            # Gemessen wird bis zum Ende der Arbeit, die der Handler an den Coalescer abgegeben hat
+            first = len(voice_events.decisions)
+            await handler(member, before, after)
+            pending = voice_events.decisions[first:]
+            if pending:
+                await asyncio.gather(*pending)
+        self.gateway.handler = handle
+        self.bot.rest.start()
+        self.bot.deletion_scheduler.start()
+
+    def stop(self):
+        self.bot.rest.stop()
+        self.bot.deletion_scheduler.stop()
+
+    def populate(self, guilds, talks, members, protected=0.0):
+        """Legt Server, Talk-Kategorien, Talks und Mitglieder an und registriert die Talks beim Bot"""
+        for index in range(guilds):
+            guild = self.gateway.add_guild(f"Server {index}")
+            category = self.gateway.add_category(guild, "Talks")
+            channel = self.gateway.add_text_channel(guild, "talk-erstellen")
+            self.bot.talk_settings[guild.id] = {"category": category, "channel": channel}
+            self.guilds.append((guild, category))
+        for index in range(members):
+            guild, _ = self.guilds[index % guilds]
+            self.members.append(self.gateway.add_member(guild, f"user{index}"))
+        for index in range(talks):
+            guild, category = self.guilds[index % guilds]
+            password = "geheim" if self.random.random() < protected else None
+            prefix = "🔒" if password else "🎙️"
+            channel = self.gateway.add_voice_channel(guild, f"{prefix} Talk {index}", category)
+            creator = self.random.choice([m for m in self.members[:guilds * 10] if m.guild is guild] or self.members)
+            self.bot.talks.add(channel.id, guild.id, creator.id, password, channel.name, [creator.id])
+            self.talks.append(channel)
+
+    def talks_in(self, guild):
+        return [talk for talk in self.talks if talk.guild is guild]
+
+    async def settle(self):
+        """Wartet, bis alle Hintergrundarbeiten (Kicks, DMs, Folge-Events) erledigt sind"""
+        while True:
+            await self.gateway.drain()
+            await asyncio.sleep(0)
+            busy = any(self.bot.rest.queue_depth().values()) or self.bot.voice_events.stats()["pending"]
+            if not busy and not self.gateway.followups and not self.http.inflight:
+                return
+            await asyncio.sleep(0.01)
+
+async def scenario_voice_churn(harness, args):
+    harness.populate(args.guilds, args.talks, args.members)
+    by_guild = {guild.id: harness.talks_in(guild) for guild, _ in harness.guilds}
+    targets = {member.id: harness.random.choice(by_guild[member.guild.id]) for member in harness.members}
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def update(member, channel):
+        async with slots:
+            await harness.gateway.voice_update(member, channel)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(update(member, targets[member.id]) for member in harness.members))
+    await asyncio.gather(*(update(member, None) for member in harness.members))
+    wall = time.perf_counter() - started
+    return summarize("voice_churn", harness.gateway.latencies, wall, harness.http, {
+        "pending_deletions": len(harness.bot.deletion_scheduler),
+        "occupancy_bytes": harness.bot.occupancy.memory_bytes(),
+    })
+
+async def scenario_password_joins(harness, args):
+    harness.populate(args.guilds, args.talks, args.members, protected=1.0)
+    by_guild = {guild.id: harness.talks_in(guild) for guild, _ in harness.guilds}
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def session(member, talk):
+        async with slots:
+            # Ungeduldige Benutzer verlassen den Talk und versuchen es direkt noch einmal
+            for attempt in range(args.retries):
+                if attempt:
+                    await harness.gateway.voice_update(member, None)
+                await harness.gateway.voice_update(member, talk)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        session(member, harness.random.choice(by_guild[member.guild.id])) for member in harness.members
+    ))
+    handler_wall = time.perf_counter() - started
+    await harness.settle()
+    wall = time.perf_counter() - started
+    return summarize("password_joins", harness.gateway.latencies, handler_wall, harness.http, {
+        "settle_seconds": round(wall, 4),
+        "dms_sent": sum(member.dms for member in harness.members),
+        "voice_events": harness.bot.voice_events.stats(),
+        "rest": harness.bot.rest.stats(),
+    })
+
+async def scenario_interactions(harness, args):
+    harness.populate(args.guilds, args.talks, args.members)
+    tb = harness.tb
+    interactions = harness.bot.get_cog("Interactions")
+    talk_commands = harness.bot.get_cog("TalkCommands")
+    samples = {"join_button": [], "talks_anzeigen": [], "talk_beitreten": []}
+    lobbies = {guild.id: harness.gateway.add_voice_channel(guild, "Lobby") for guild, _ in harness.guilds}
+    for member in harness.members:
+        harness.gateway.move(member, lobbies[member.guild.id], dispatch=False)
+    by_guild = {guild.id: harness.talks_in(guild) for guild, _ in harness.guilds}
+
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def timed(name, coro):
+        started = time.perf_counter()
+        await coro
+        samples[name].append(time.perf_counter() - started)
+
+    async def session(member, talk):
+        async with slots:
+            harness.bot.talks.authorize(talk.id, member.id)
+            custom_id = tb.ComponentRouter.build("join", talk.id, member.guild.id)
+            await timed("join_button", interactions.on_interaction(FakeInteraction(harness.gateway, member, member.guild, custom_id)))
+            await timed("talks_anzeigen", talk_commands.list_talks.callback(talk_commands, FakeInteraction(harness.gateway, member, member.guild)))
+            name = talk.name.split(" ", 1)[1]
+            await timed("talk_beitreten", talk_commands.join_talk.callback(talk_commands, FakeInteraction(harness.gateway, member, member.guild), name))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        session(member, harness.random.choice(by_guild[member.guild.id])) for member in harness.members
+    ))
+    wall = time.perf_counter() - started
+    await harness.settle()
+
+    all_samples = [value for values in samples.values() for value in values]
+    return summarize("interactions", all_samples, wall, harness.http, {
+        "commands": {
+            name: {"p50_ms": round(percentile(values, 0.5) * 1000, 4), "p99_ms": round(percentile(values, 0.99) * 1000, 4)}
+            for name, values in samples.items()
+        },
+    })
+
+async def scenario_create_burst(harness, args):
+    harness.populate(args.guilds, args.talks, args.members)
+    tb = harness.tb
+    interactions = harness.bot.get_cog("Interactions")
+    samples = {"create_button": [], "create_submit": []}
+    outcomes = {"created": 0, "rejected_click": 0, "rejected_submit": 0, "position_updates": 0}
+
+    async def click(member, index):
+        custom_id = tb.ComponentRouter.build("create")
+        interaction = FakeInteraction(harness.gateway, member, member.guild, custom_id)
+        started = time.perf_counter()
+        await interactions.on_interaction(interaction)
+        samples["create_button"].append(time.perf_counter() - started)
+        modal = interaction.response.modal
+        if modal is None:
+            outcomes["rejected_click"] += 1
+            return
+        # Formular wie ein Benutzer ausfüllen und absenden
+        modal.talk_name._value = f"Burst {index}"
+        modal.password_required._value = "Nein"
+        submit = FakeInteraction(harness.gateway, member, member.guild)
+        started = time.perf_counter()
+        await modal.on_submit(submit)
+        samples["create_submit"].append(time.perf_counter() - started)
+        outcomes["position_updates"] += sum(1 for text in submit.edits if text and "Position" in text)
+        if submit.edits and submit.edits[-1].startswith("✅"):
+            outcomes["created"] += 1
+        else:
+            outcomes["rejected_submit"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(click(member, index) for index, member in enumerate(harness.members)))
+    wall = time.perf_counter() - started
+    await harness.settle()
+
+    admission = harness.bot.admission
+    all_samples = [value for values in samples.values() for value in values]
+    return summarize("create_burst", all_samples, wall, harness.http, {
+        "commands": {
+            name: {"p50_ms": round(percentile(values, 0.5) * 1000, 4), "p99_ms": round(percentile(values, 0.99) * 1000, 4)}
+            for name, values in samples.items()
+        },
+        "outcomes": outcomes,
+        "admitted": admission.admitted,
+        "rejected": dict(admission.rejected),
+    })
+
+SCENARIOS = {
+    "voice_churn": scenario_voice_churn,
+    "password_joins": scenario_password_joins,
+    "interactions": scenario_interactions,
+    "create_burst": scenario_create_burst,
+}
+# Szenarien, deren Aussage von den Rate-Limits abhängt (Kick vs. Passwort-DM); hier sind die
+# Token-Buckets standardmäßig aktiv, daher auch weniger Mitglieder, damit der Lauf überschaubar bleibt
+RATE_LIMITED_SCENARIOS = {"password_joins": 500}
+DEFAULT_MEMBERS = 10000
+
+async def run_scenario(talk_bot, name, args):
+    args = argparse.Namespace(**vars(args))
+    if args.rate_limits is None:
+        args.rate_limits = name in RATE_LIMITED_SCENARIOS
+    if args.members is None:
+        args.members = RATE_LIMITED_SCENARIOS.get(name, DEFAULT_MEMBERS) if args.rate_limits else DEFAULT_MEMBERS
+    harness = Harness(talk_bot, args)
+    await harness.start()
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        result = await SCENARIOS[name](harness, args)
+    finally:
+        harness.stop()
+    result["members"] = args.members
+    result["rate_limits"] = args.rate_limits
+    if args.trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["python_heap_bytes"] = current
+        result["python_heap_peak_bytes"] = peak
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append", help="Szenario (mehrfach möglich, Standard: alle)")
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--talks", type=int, default=500)
+    parser.add_argument("--members", type=int, help="Mitglieder (Standard: 10000, bei password_joins mit Rate-Limits 500)")
+    parser.add_argument("--retries", type=int, default=3, help="Beitrittsversuche pro Mitglied bei password_joins")
+    parser.add_argument("--concurrency", type=int, default=100, help="Gleichzeitige Benutzer in allen Szenarien außer create_burst")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulierte REST-Latenz in Sekunden")
+    parser.add_argument("--rate-limits", action=argparse.BooleanOptionalAction, default=None,
+                        help="Token-Buckets des REST-Planers nicht aufheben (Standard: nur bei password_joins)")
+    parser.add_argument("--trace-memory", action="store_true", help="Python-Heap mit tracemalloc messen (verlangsamt die Handler)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Log-Ausgaben des Bots anzeigen")
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    if not args.verbose:
+        talk_bot.logger.setLevel(logging.WARNING)
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        result = asyncio.run(run_scenario(talk_bot, name, args))
+        results.append(result)
+        print(f"{name:>15}: {result['events']:>7} Aufrufe, {result['throughput_per_second']:>10.1f}/s, "
+              f"p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, max RSS {result['max_rss_kib'] / 1024:.1f} MiB")
+
+    parameters = {key: value for key, value in vars(args).items() if key not in ("output", "verbose")}
+    path = save_results("load_test", {"parameters": parameters, "scenarios": results}, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+
+if __name__ == "__main__":
+    main()
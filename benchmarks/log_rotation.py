@@ -0,0 +1,55 @@
+"""Prüft, dass beim Rotieren der Log-Dateien keine Einträge verloren gehen.
+
+Schreibt --records Einträge mit einer sehr kleinen Rotationsgröße, sodass viele Segmente
+in derselben Sekunde enden, und zählt die Einträge in allen Dateien. Fehlt einer,
+endet das Skript mit Exit-Code 1.
+
+    python benchmarks/log_rotation.py --records 1000 --max-bytes 2000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from common import load_talk_bot, save_results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--max-bytes", type=int, default=2000, help="Rotationsgröße (LOG_MAX_BYTES)")
+    parser.add_argument("--size", type=int, default=100, help="Ungefähre Länge eines Eintrags in Bytes")
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    talk_bot.logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        handler = talk_bot.SessionLogHandler(directory, max_bytes=args.max_bytes)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        padding = "x" * max(0, args.size - 12)
+        started = time.perf_counter()
+        for index in range(args.records):
+            handler.emit(logging.makeLogRecord({"msg": f"{index:010d} {padding}"}))
+        handler.close_session()
+        elapsed = time.perf_counter() - started
+
+        files = sorted(os.listdir(directory))
+        seen = set()
+        for name in files:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                seen.update(int(line.split(" ", 1)[0]) for line in f if line.strip())
+
+    missing = args.records - len(seen & set(range(args.records)))
+    results = {"records": args.records, "max_bytes": args.max_bytes, "files": len(files),
+               "missing": missing, "seconds": round(elapsed, 4)}
+    print(f"{args.records} Einträge in {len(files)} Dateien, {missing} verloren ({elapsed * 1000:.1f} ms)")
+    path = save_results("log_rotation", results, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+    if missing:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
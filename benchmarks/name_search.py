@@ -0,0 +1,72 @@
+"""Misst die Namenssuche von /talk_beitreten und der Autovervollständigung.
+
+Legt --talks Talks in einem Server an und sucht mit kurzen und längeren Präfixen,
+Wortanfängen, Teilzeichenketten und exakten Namen. Liegt das p99 einer Anfrage über
+--budget Millisekunden, endet das Skript mit Exit-Code 1.
+
+    python benchmarks/name_search.py --talks 5000 --budget 1
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+
+from common import load_talk_bot, save_results
+
+WORDS = ("gaming", "games", "musik", "lernen", "chill", "talk", "runde", "abend", "projekt", "team", "quiz", "film")
+QUERIES = ("g", "ga", "gam", "gaming", "m", "t", "runde", "abend team", "ill", "xyz")
+
+def build_registry(talk_bot, talks, seed):
+    rng = random.Random(seed)
+    registry = talk_bot.TalkRegistry()
+    names = []
+    for channel_id in range(1, talks + 1):
+        name = f"🎙️ {' '.join(rng.sample(WORDS, 2))} {channel_id}"
+        registry.add(channel_id, 1, 1, None, name)
+        names.append(name.split(" ", 1)[1])
+    return registry, names
+
+def measure(registry, query, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        registry.search(1, query)
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    return durations[len(durations) // 2], durations[min(len(durations) - 1, int(0.99 * len(durations)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--talks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200, help="Wiederholungen pro Anfrage")
+    parser.add_argument("--budget", type=float, default=1.0, help="Erlaubtes p99 pro Anfrage in Millisekunden")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    talk_bot.logger.setLevel(logging.WARNING)
+    registry, names = build_registry(talk_bot, args.talks, args.seed)
+
+    results = []
+    over_budget = []
+    print(f"{'Anfrage':>20} {'Median':>10} {'p99':>10} {'Treffer':>8}")
+    for query in QUERIES + (names[len(names) // 2],):
+        median, p99 = measure(registry, query, args.repeat)
+        result = {"query": query, "median_ms": round(median * 1000, 4), "p99_ms": round(p99 * 1000, 4),
+                  "hits": len(registry.search(1, query))}
+        results.append(result)
+        marker = " ⚠" if result["p99_ms"] > args.budget else ""
+        print(f"{query:>20} {result['median_ms']:>7.3f} ms {result['p99_ms']:>7.3f} ms {result['hits']:>8}{marker}")
+        if marker:
+            over_budget.append(query)
+
+    path = save_results("name_search", {"talks": args.talks, "budget_ms": args.budget, "queries": results}, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+    if over_budget:
+        print(f"Über dem Budget von {args.budget} ms: {', '.join(over_budget)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Misst die Kosten von scrypt für verschiedene Parameter, um PASSWORD_SCRYPT_* abzustimmen.
+
+Für jede Kombination werden die Dauer eines Hashes, der Speicherbedarf, der Durchsatz
+des Thread-Pools (PASSWORD_HASH_WORKERS) und die größte Verzögerung der Event-Loop
+während eines Schwalls gleichzeitiger Prüfungen ermittelt.
+
+    python benchmarks/password_hash.py --n 13 14 15 16 --workers 2 --burst 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from common import load_talk_bot, save_results
+
+async def measure_burst(talk_bot, stored, workers, burst):
+    """Prüft burst Passwörter gleichzeitig und misst Durchsatz und Event-Loop-Verzögerung"""
+    hasher = talk_bot.PasswordHasher(workers=workers)
+    lags = []
+    interval = 0.005
+
+    async def ticker():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - started - interval))
+
+    task = asyncio.get_running_loop().create_task(ticker())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(hasher.verify(stored, "falsch") for _ in range(burst)))
+    finally:
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        hasher.close()
+    return burst / elapsed, max(lags) if lags else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=[12, 13, 14, 15, 16], help="Exponenten für N = 2^n")
+    parser.add_argument("--r", type=int, default=8)
+    parser.add_argument("--p", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=2, help="Threads im Pool")
+    parser.add_argument("--burst", type=int, default=20, help="Gleichzeitige Prüfungen pro Messung")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen für die Einzelmessung")
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    talk_bot.logger.setLevel(logging.WARNING)
+
+    results = []
+    print(f"{'N':>8} {'Speicher':>10} {'Hash':>10} {'Prüfungen/s':>12} {'Loop-Verzögerung':>17}")
+    for exponent in args.n:
+        n = 2 ** exponent
+        durations = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            stored = talk_bot.hash_password("geheim", n=n, r=args.r, p=args.p)
+            durations.append(time.perf_counter() - started)
+        per_second, max_lag = asyncio.run(measure_burst(talk_bot, stored, args.workers, args.burst))
+        result = {
+            "n": n,
+            "r": args.r,
+            "p": args.p,
+            "memory_bytes": 128 * n * args.r,
+            "hash_ms": round(statistics.median(durations) * 1000, 2),
+            "verifications_per_second": round(per_second, 1),
+            "max_loop_lag_ms": round(max_lag * 1000, 2),
+        }
+        results.append(result)
+        print(f"{n:>8} {result['memory_bytes'] / 1024 / 1024:>8.1f} MiB {result['hash_ms']:>7.1f} ms "
+              f"{result['verifications_per_second']:>12.1f} {result['max_loop_lag_ms']:>14.2f} ms")
+
+    path = save_results("password_hash", {"workers": args.workers, "burst": args.burst, "parameters": results}, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+
+if __name__ == "__main__":
+    main()
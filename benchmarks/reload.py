@@ -0,0 +1,85 @@
+"""Vergleicht das Neuladen einer Erweiterung mit einem Kaltstart des Bots.
+
+Der Kaltstart wird in frischen Prozessen gemessen: Python-Start, Import von discord.py
+und talk-bot.py, Aufbau des Bots und Laden aller Erweiterungen. Verbindung,
+Mitglieder-Chunking und die Synchronisierung der Befehle kommen im echten Betrieb
+noch hinzu; diese Zeit zeigt /erweiterung_neu_laden als „Kaltstart bis zur Bereitschaft“ an.
+
+    python benchmarks/reload.py --repeat 20 --cold 5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import subprocess
+import sys
+import time
+
+from common import ROOT, load_talk_bot, save_results
+
+COLD_START = """
+import asyncio, logging, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {benchmarks!r})
+from common import load_talk_bot
+talk_bot = load_talk_bot()
+talk_bot.logger.setLevel(logging.WARNING)
+asyncio.run(talk_bot.bot.load_extensions())
+print(time.perf_counter() - started)
+"""
+
+def measure_cold(repeat):
+    """Wanduhrzeit und Zeit im Interpreter für frische Prozesse"""
+    wall, inside = [], []
+    code = COLD_START.format(benchmarks=f"{ROOT}/benchmarks")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        wall.append(time.perf_counter() - started)
+        inside.append(float(output.strip().splitlines()[-1]))
+    return wall, inside
+
+async def measure_reloads(talk_bot, repeat):
+    bot = talk_bot.bot
+    await bot.load_extensions()
+    durations = {name: [] for name in talk_bot.EXTENSIONS}
+    for _ in range(repeat):
+        for name in talk_bot.EXTENSIONS:
+            durations[name].append(await bot.reload_extension_timed(name))
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Neuladevorgänge pro Erweiterung")
+    parser.add_argument("--cold", type=int, default=5, help="Kaltstarts in frischen Prozessen")
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    talk_bot.logger.setLevel(logging.WARNING)
+
+    durations = asyncio.run(measure_reloads(talk_bot, args.repeat))
+    wall, inside = measure_cold(args.cold)
+
+    results = {"reload": {}, "cold_start": {
+        "process_ms": round(statistics.median(wall) * 1000, 1),
+        "import_and_setup_ms": round(statistics.median(inside) * 1000, 1),
+    }}
+    print(f"{'Erweiterung':>20} {'Median':>10} {'Max':>10}")
+    for name, values in durations.items():
+        results["reload"][name] = {
+            "median_ms": round(statistics.median(values) * 1000, 3),
+            "max_ms": round(max(values) * 1000, 3),
+        }
+        print(f"{name:>20} {results['reload'][name]['median_ms']:>7.2f} ms {results['reload'][name]['max_ms']:>7.2f} ms")
+    total = sum(statistics.median(values) for values in durations.values())
+    results["reload_all_ms"] = round(total * 1000, 3)
+    print(f"{'alle':>20} {total * 1000:>7.2f} ms")
+    print(f"Kaltstart ohne Gateway: {results['cold_start']['process_ms']:.0f} ms pro Prozess "
+          f"({results['cold_start']['import_and_setup_ms']:.0f} ms Import und Aufbau)")
+
+    path = save_results("reload", results, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+
+if __name__ == "__main__":
+    main()
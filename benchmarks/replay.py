@@ -0,0 +1,316 @@
+"""Spielt ein Event-Journal (EVENT_JOURNAL=1) mit simulierter HTTP-Schicht durch die Handler des Bots.
+
+Server, Kanäle und Mitglieder werden aus dem Schnappschuss am Anfang des Journals und
+bei Bedarf aus den IDs der Events nachgebaut. Voice-Events gehen an on_voice_state_update,
+Buttons an on_interaction, /talks_anzeigen und /talk_beitreten an die Befehle und
+Autovervollständigungen an die Talk-Suche. Formulareingaben enthält das Journal nicht,
+nur ihre Wirkung (TALK_CREATE, TALK_AUTHORIZE).
+
+Verschiebungen und Kicks des Bots landen nur in der simulierten HTTP-Schicht; die
+resultierenden Voice-Events kommen wie im Original aus dem Journal. Leere Talks löscht
+nur ein aufgezeichnetes CHANNEL_DELETE.
+
+    python benchmarks/replay.py journals/2026-01-01_20-00-00.jsonl.gz
+    python benchmarks/replay.py journal.jsonl.gz --speed 1 --latency 0.05
+    python benchmarks/replay.py journal.jsonl.gz --profile replay.prof
+    python benchmarks/replay.py journal.jsonl.gz --baseline benchmarks/results/replay_alt.json
+"""
+import argparse
+import asyncio
+import collections
+import cProfile
+import gzip
+import json
+import logging
+import pstats
+import sys
+import time
+import types
+import zlib
+
+from common import load_talk_bot, save_results
+from fakes import FakeInteraction
+from load_test import Harness, percentile
+
+# Slash-Befehle, deren Optionen nur aus Text bestehen und die keinen Zustand außerhalb des Bots ändern
+REPLAY_COMMANDS = ("talks_anzeigen", "talk_beitreten")
+
+def read_journal(path):
+    """Liefert (Millisekunden, Event, Daten); ein abgeschnittenes Ende (Absturz) beendet das Lesen"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                offset, event, payload = json.loads(line)
+                yield offset, event, payload
+        except (EOFError, zlib.error, json.JSONDecodeError) as e:
+            print(f"Journal endet unvollständig ({type(e).__name__}), Rest wird ignoriert", file=sys.stderr)
+
+def snowflake(value):
+    return int(value) if value is not None else None
+
+class Replayer:
+    """Baut den aufgezeichneten Zustand im FakeGateway nach und ruft die Handler auf"""
+
+    def __init__(self, harness):
+        self.tb = harness.tb
+        self.bot = harness.bot
+        self.gateway = harness.gateway
+        self.gateway.echo_moves = False
+        self.interactions = self.bot.get_cog("Interactions")
+        self.voice = self.bot.get_cog("VoiceEvents")
+        self.talk_commands = self.bot.get_cog("TalkCommands")
+        self.samples = collections.defaultdict(list)
+        self.skipped = collections.Counter()
+        self.password = self.tb.hash_password("replay", n=2 ** 4)
+
+    def guild(self, guild_id):
+        guild_id = snowflake(guild_id)
+        return self.gateway.get_guild(guild_id) or self.gateway.add_guild(f"Server {guild_id}", id=guild_id)
+
+    def category(self, guild, category_id):
+        category_id = snowflake(category_id)
+        if category_id is None:
+            return None
+        return guild.get_channel(category_id) or self.gateway.add_category(guild, f"Kategorie {category_id}", id=category_id)
+
+    def channel(self, guild, channel_id, name=None, parent_id=None):
+        channel_id = snowflake(channel_id)
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            channel = self.gateway.add_voice_channel(guild, name or f"Kanal {channel_id}", self.category(guild, parent_id), id=channel_id)
+        return channel
+
+    def member(self, guild, user_id):
+        user_id = snowflake(user_id)
+        return guild.get_member(user_id) or self.gateway.add_member(guild, f"user{user_id}", id=user_id)
+
+    def user(self, user_id):
+        """Benutzer einer DM-Interaktion: das Mitglied aus irgendeinem Server oder nur die ID"""
+        user_id = snowflake(user_id)
+        for guild in self.gateway.guilds.values():
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member
+        return types.SimpleNamespace(id=user_id, voice=None)
+
+    def add_talk(self, payload, authorized=()):
+        guild = self.guild(payload["guild_id"])
+        channel = self.channel(guild, payload["channel_id"], payload["name"], payload.get("parent_id"))
+        password = self.password if payload["protected"] else None
+        creator_id = snowflake(payload["creator_id"])
+        self.bot.talks.add(channel.id, guild.id, creator_id, password, payload["name"], [snowflake(a) for a in authorized] + [creator_id])
+        self.bot.talk_lists.invalidate(guild.id)
+        return guild, channel
+
+    async def timed(self, kind, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        finally:
+            self.samples[kind].append(time.perf_counter() - started)
+
+    def apply(self, event, payload):
+        """Wendet einen Eintrag an; gibt eine Coroutine zurück, wenn ein Handler gemessen wird"""
+        handler = getattr(self, "on_" + event.lower(), None)
+        if handler is None:
+            self.skipped[event] += 1
+            return None
+        return handler(payload)
+
+    def on_journal(self, payload):
+        if payload.get("version") != 1:
+            raise SystemExit(f"Unbekannte Journal-Version: {payload.get('version')}")
+
+    def on_snapshot_guild(self, payload):
+        guild = self.guild(payload["guild_id"])
+        category = self.category(guild, payload["category_id"])
+        channel_id = snowflake(payload["channel_id"])
+        channel = guild.get_channel(channel_id) or self.gateway.add_text_channel(guild, "talk-erstellen", id=channel_id)
+        self.bot.talk_settings[guild.id] = {"category": category, "channel": channel}
+
+    def on_snapshot_talk(self, payload):
+        guild, channel = self.add_talk(payload, payload.get("authorized", ()))
+        for user_id in payload.get("members", ()):
+            self.gateway._set_voice(self.member(guild, user_id), channel)
+
+    def on_talk_create(self, payload):
+        self.add_talk(payload)
+
+    def on_talk_authorize(self, payload):
+        self.bot.talks.authorize(snowflake(payload["channel_id"]), snowflake(payload["user_id"]))
+
+    def on_voice_state_update(self, payload):
+        if payload.get("guild_id") is None:
+            self.skipped["VOICE_STATE_UPDATE"] += 1
+            return None
+        guild = self.guild(payload["guild_id"])
+        member = self.member(guild, payload["user_id"])
+        channel = self.channel(guild, payload["channel_id"]) if payload.get("channel_id") is not None else None
+        return self.timed("voice_state_update", self.gateway.voice_update(member, channel))
+
+    def on_interaction_create(self, payload):
+        guild = self.guild(payload["guild_id"]) if payload.get("guild_id") is not None else None
+        user = self.member(guild, payload["user_id"]) if guild is not None else self.user(payload["user_id"])
+        data = payload["data"]
+        if payload["type"] == 3:
+            interaction = FakeInteraction(self.gateway, user, guild, data["custom_id"])
+            parsed = self.bot.components.parse(data["custom_id"])
+            kind = f"button:{parsed[0] if parsed else 'fremd'}"
+            return self.timed(kind, self.interactions.on_interaction(interaction))
+        options = {option["name"]: option.get("value") for option in data.get("options", ())}
+        if payload["type"] == 4:
+            focused = next((option for option in data.get("options", ()) if option.get("focused")), None)
+            if guild is None or focused is None or focused["name"] != "talk_name":
+                self.skipped[f"autocomplete:{data['name']}"] += 1
+                return None
+            started = time.perf_counter()
+            self.tb.talk_name_choices(self.bot, guild, focused.get("value") or "")
+            self.samples["autocomplete"].append(time.perf_counter() - started)
+            return None
+        if data["name"] not in REPLAY_COMMANDS or guild is None:
+            self.skipped[f"command:{data['name']}"] += 1
+            return None
+        command = self.bot.tree.get_command(data["name"])
+        interaction = FakeInteraction(self.gateway, user, guild)
+        return self.timed(f"command:{data['name']}", command.callback(command.binding, interaction, **options))
+
+    def on_channel_create(self, payload):
+        if payload.get("guild_id") is None:
+            return None
+        guild = self.guild(payload["guild_id"])
+        if payload["type"] == 2:
+            self.channel(guild, payload["id"], payload.get("name"), payload.get("parent_id"))
+        elif payload["type"] == 4:
+            self.category(guild, payload["id"])
+        return None
+
+    def on_channel_update(self, payload):
+        if payload.get("guild_id") is None:
+            return None
+        guild = self.guild(payload["guild_id"])
+        channel = guild.get_channel(snowflake(payload["id"]))
+        if channel is None:
+            return None
+        before = types.SimpleNamespace(id=channel.id, name=channel.name, guild=guild)
+        channel.name = payload.get("name") or channel.name
+        return self.timed("channel_update", self.voice.on_guild_channel_update(before, channel))
+
+    def on_channel_delete(self, payload):
+        if payload.get("guild_id") is None:
+            return None
+        guild = self.guild(payload["guild_id"])
+        channel = guild.get_channel(snowflake(payload["id"]))
+        if channel is None:
+            return None
+        if hasattr(channel, "members"):
+            self.gateway.remove_channel(channel)
+        else:
+            guild.channels.pop(channel.id, None)
+        return self.timed("channel_delete", self.voice.on_guild_channel_delete(channel))
+
+async def replay(talk_bot, args):
+    harness = Harness(talk_bot, args)
+    await harness.start()
+    replayer = Replayer(harness)
+    pending = set()
+    entries = 0
+    started = time.perf_counter()
+    try:
+        for offset, event, payload in read_journal(args.journal):
+            entries += 1
+            if args.speed > 0:
+                # Abstände wie aufgezeichnet; Handler laufen wie bei discord.py als eigene Tasks
+                delay = offset / 1000 / args.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            coro = replayer.apply(event, payload)
+            if coro is None:
+                continue
+            if args.speed > 0:
+                task = asyncio.get_running_loop().create_task(coro)
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            else:
+                await coro
+        if pending:
+            await asyncio.gather(*list(pending))
+        wall = time.perf_counter() - started
+        await harness.settle()
+    finally:
+        harness.stop()
+
+    handlers = {
+        kind: {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 0.5) * 1000, 4),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+            "max_ms": round(max(values) * 1000, 4),
+        }
+        for kind, values in sorted(replayer.samples.items())
+    }
+    return {
+        "journal": args.journal,
+        "speed": args.speed,
+        "entries": entries,
+        "wall_seconds": round(wall, 4),
+        "handlers": handlers,
+        "skipped": dict(replayer.skipped),
+        "rest_calls": dict(harness.http.calls),
+        "talks": len(harness.bot.talks),
+    }
+
+def compare(result, baseline_path, tolerance):
+    """Vergleicht p99 je Handler mit einem früheren Lauf; gibt die Zahl der Verschlechterungen zurück"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]["handlers"]
+    regressions = 0
+    for kind, stats in result["handlers"].items():
+        old = baseline.get(kind)
+        if old is None or not old["p99_ms"]:
+            continue
+        ratio = stats["p99_ms"] / old["p99_ms"]
+        marker = "  ← langsamer" if ratio > tolerance else ""
+        regressions += bool(marker)
+        print(f"{kind:>26}: p99 {old['p99_ms']:.3f} → {stats['p99_ms']:.3f} ms ({ratio:.2f}x){marker}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("journal", help="Pfad des Journals (.jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=0, help="Wiedergabegeschwindigkeit (1 = wie aufgezeichnet, 0 = so schnell wie möglich)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulierte REST-Latenz in Sekunden")
+    parser.add_argument("--rate-limits", action="store_true", help="Token-Buckets des REST-Planers nicht aufheben")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--profile", help="cProfile-Statistik in diese Datei schreiben")
+    parser.add_argument("--baseline", help="Ergebnisdatei eines früheren Laufs zum Vergleich der p99-Latenzen")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="Erlaubter Faktor gegenüber --baseline")
+    parser.add_argument("--verbose", action="store_true", help="Log-Ausgaben des Bots anzeigen")
+    parser.add_argument("--output", help="Pfad der JSON-Ergebnisdatei")
+    args = parser.parse_args()
+
+    talk_bot = load_talk_bot()
+    if not args.verbose:
+        talk_bot.logger.setLevel(logging.WARNING)
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    result = asyncio.run(replay(talk_bot, args))
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+    print(f"{result['entries']} Einträge in {result['wall_seconds']:.2f}s, {result['talks']} Talks am Ende")
+    for kind, stats in result["handlers"].items():
+        print(f"{kind:>26}: {stats['count']:>7} Aufrufe, p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+    if result["skipped"]:
+        print("Übersprungen: " + ", ".join(f"{kind} {count}" for kind, count in sorted(result["skipped"].items())))
+
+    path = save_results("replay", result, args.output)
+    print(f"Ergebnisse gespeichert: {path}")
+    if args.baseline and compare(result, args.baseline, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Erweiterungen des Talk-Bots (Befehle, Button-Handler, Voice-Events).
+
+Jede Erweiterung lässt sich per /erweiterung_neu_laden austauschen, ohne die
+Gateway-Verbindung neu aufzubauen. Der Zustand (Talks, Planer, Speicher) liegt
+am Bot und bleibt dabei erhalten.
+"""
@@ -0,0 +1,469 @@
+"""Befehle für Administratoren: Einrichtung, Statistiken, Massenaktionen und Neuladen der Erweiterungen"""
+import asyncio
+import collections
+import logging
+import os
+import re
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.ui import Button, TextInput, View
+
+from talk_bot import EXTENSIONS, ComponentRouter, TalkModal, find_talk, send_reply, talk_name_choices
+
+logger = logging.getLogger('talk-bot')
+
+# Gleichzeitige Aufträge bei Admin-Massenaktionen und Mindestabstand der Fortschrittsanzeige (Sekunden)
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 5))
+BULK_PROGRESS_INTERVAL = 1.5
+USER_ID_PATTERN = re.compile(r"<@!?(\d+)>|\b(\d{15,20})\b")
+
+def limits_text(limits):
+    """Grenzen eines Servers als Text; 0 bedeutet unbegrenzt"""
+    def value(number):
+        return str(number) if number else "unbegrenzt"
+    return (f"Talks pro Benutzer: {value(limits.user_quota)}, Talks pro Server: {value(limits.guild_quota)}, "
+            f"Warteschlange: {value(limits.queue_size)}")
+
+class TalkCreationModal(TalkModal):
+    def __init__(self, bot, limits=None):
+        super().__init__(bot, title="Talk-Nachricht erstellen")
+        # Beim Einrichten mitgegebene Grenzen; werden erst beim Absenden gespeichert
+        self.limits = limits or {}
+
+        self.channel = TextInput(
+            label="Kanalname",
+            placeholder="Gib den Namen des Kanals ein, in dem die Nachricht gepostet werden soll",
+            required=True
+        )
+        self.message = TextInput(
+            label="Nachrichteninhalt",
+            placeholder="Gib den Inhalt der Nachricht ein",
+            style=discord.TextStyle.paragraph,
+            required=True
+        )
+        self.category = TextInput(
+            label="Kategoriename",
+            placeholder="Gib den Namen der Kategorie ein, in der Talks erstellt werden sollen",
+            required=True
+        )
+
+        self.add_item(self.channel)
+        self.add_item(self.message)
+        self.add_item(self.category)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        channel = discord.utils.get(interaction.guild.text_channels, name=self.channel.value)
+        category = discord.utils.get(interaction.guild.categories, name=self.category.value)
+
+        if not channel:
+            await interaction.response.send_message("❌ Kanal nicht gefunden!", ephemeral=True)
+            return
+
+        if not category:
+            await interaction.response.send_message("❌ Kategorie nicht gefunden!", ephemeral=True)
+            return
+
+        # Einstellungen für diesen Server speichern
+        self.bot.talk_settings[interaction.guild.id] = {"category": category, "channel": channel}
+        self.bot.store.save_settings(interaction.guild.id, category.id, channel.id)
+        self.bot.channel_pool.request_refill()
+        if self.limits:
+            self.bot.admission.configure(interaction.guild.id, **self.limits)
+
+        # Talk-Erstellungsnachricht erstellen und senden
+        embed = discord.Embed(
+            title="📣 Erstelle einen Talk-Kanal",
+            description=self.message.value,
+            color=discord.Color.blue()
+        )
+
+        # Button-View erstellen
+        view = View(timeout=None)  # Kein Timeout für persistenten Button
+        view.add_item(Button(
+            label="Talk erstellen",
+            style=discord.ButtonStyle.primary,
+            custom_id=ComponentRouter.build("create"),
+            emoji="🎙️"
+        ))
+
+        await channel.send(embed=embed, view=view)
+        await interaction.response.send_message("✅ Talk-Erstellungsnachricht erfolgreich eingerichtet!", ephemeral=True)
+
+async def require_admin(interaction: discord.Interaction):
+    if interaction.user.guild_permissions.administrator:
+        return True
+    await interaction.response.send_message("❌ Du benötigst Administratorrechte, um diesen Befehl zu verwenden!", ephemeral=True)
+    return False
+
+async def run_bulk(interaction: discord.Interaction, title, items, worker, concurrency=BULK_CONCURRENCY):
+    """Führt worker(item) mit begrenzter Parallelität aus und zeigt den Fortschritt in einer einzigen Antwort.
+
+    worker gibt True (erledigt) oder False (übersprungen) zurück; Ausnahmen zählen als Fehler.
+    Gibt {"ok": ..., "skipped": ..., "failed": ...} zurück.
+    """
+    counts = {"ok": 0, "skipped": 0, "failed": 0}
+    total = len(items)
+    started = time.perf_counter()
+    work = collections.deque(items)
+
+    def progress(final=False):
+        done = sum(counts.values())
+        icon = "✅" if final else "⏳"
+        text = f"{icon} {title}: {done}/{total} – {counts['ok']} erledigt, {counts['skipped']} übersprungen, {counts['failed']} Fehler"
+        if final:
+            text += f" ({time.perf_counter() - started:.1f}s)"
+        return text
+
+    async def run_worker():
+        while work:
+            item = work.popleft()
+            try:
+                counts["ok" if await worker(item) else "skipped"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                logger.error(f"Fehler bei {title} für {item}: {e}")
+
+    async def report():
+        shown = None
+        while True:
+            await asyncio.sleep(BULK_PROGRESS_INTERVAL)
+            text = progress()
+            if text != shown:
+                shown = text
+                try:
+                    await interaction.edit_original_response(content=text)
+                except discord.HTTPException as e:
+                    logger.warning(f"Fortschritt konnte nicht aktualisiert werden: {e}")
+
+    if not interaction.response.is_done():
+        await interaction.response.defer(ephemeral=True, thinking=True)
+    reporter = asyncio.get_running_loop().create_task(report())
+    try:
+        await asyncio.gather(*(run_worker() for _ in range(min(concurrency, total) or 1)))
+    finally:
+        reporter.cancel()
+    await interaction.edit_original_response(content=progress(final=True))
+    logger.info(f"{title} von {interaction.user} abgeschlossen: {counts}")
+    return counts
+
+class Admin(commands.Cog):
+    """Befehle, die nur Administratoren sehen"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Befehl zum Einrichten des Talk-Systems
+    @app_commands.command(
+        name="talk_system_einrichten",
+        description="Richte das Talk-Erstellungssystem für deinen Server ein"
+    )
+    @app_commands.describe(
+        talks_pro_benutzer="Wie viele Talks ein Benutzer gleichzeitig besitzen darf (0 = unbegrenzt)",
+        talks_pro_server="Wie viele Talks es auf diesem Server höchstens gibt (0 = unbegrenzt)",
+        warteschlange="Wie viele Talk-Erstellungen gleichzeitig warten dürfen (0 = unbegrenzt)"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def setup_talk_system(
+        self,
+        interaction: discord.Interaction,
+        talks_pro_benutzer: app_commands.Range[int, 0, 25] = None,
+        talks_pro_server: app_commands.Range[int, 0, 500] = None,
+        warteschlange: app_commands.Range[int, 0, 200] = None
+    ):
+        """Befehl zum Einrichten des Talk-Erstellungssystems"""
+        if not await require_admin(interaction):
+            return
+        bot = self.bot
+        limits = {
+            name: value for name, value in (
+                ("user_quota", talks_pro_benutzer), ("guild_quota", talks_pro_server), ("queue_size", warteschlange)
+            ) if value is not None
+        }
+
+        # Bereits eingerichtet: nur die Grenzen ändern, ohne eine weitere Nachricht zu posten
+        if limits and interaction.guild.id in bot.talk_settings:
+            applied = bot.admission.configure(interaction.guild.id, **limits)
+            await interaction.response.send_message(f"✅ Grenzen aktualisiert. {limits_text(applied)}", ephemeral=True)
+            logger.info(f"Talk-Grenzen für Server {interaction.guild.id} von {interaction.user} geändert: {limits}")
+            return
+
+        modal = TalkCreationModal(bot, limits)
+        await interaction.response.send_modal(modal)
+
+    # Befehl zum Anzeigen der Bot-Statistiken
+    @app_commands.command(
+        name="bot_stats",
+        description="Zeigt Leistungsdaten des Bots an"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def show_stats(self, interaction: discord.Interaction):
+        """Befehl zum Anzeigen der Bot-Statistiken (nur Administratoren)"""
+        if not await require_admin(interaction):
+            return
+        bot = self.bot
+
+        def latency_line(histogram):
+            if histogram is None or not histogram.count:
+                return "keine Daten"
+            return (f"p50 ≤ {histogram.quantile(0.5) * 1000:.0f} ms, p99 ≤ {histogram.quantile(0.99) * 1000:.0f} ms "
+                    f"({histogram.count} Aufrufe)")
+
+        lag = bot.metrics.get("talkbot_event_loop_lag_seconds")
+        rest = bot.rest.stats()
+
+        embed = discord.Embed(title="📊 Bot-Statistiken", color=discord.Color.blue())
+        embed.add_field(
+            name="Talks",
+            value=f"Aktiv auf diesem Server: {len(bot.talks.for_guild(interaction.guild.id))}\n"
+                  f"Aktiv insgesamt: {len(bot.talks)}\n"
+                  f"Geplante Löschungen: {len(bot.deletion_scheduler)}",
+            inline=False
+        )
+        embed.add_field(
+            name="Gateway",
+            value=f"Latenz: {bot.latency * 1000:.0f} ms\n"
+                  f"Event-Loop-Verzögerung: {bot.metrics.loop_lag * 1000:.1f} ms\n"
+                  f"Verlauf: {latency_line(lag)}",
+            inline=False
+        )
+        for event in ("on_voice_state_update", "on_interaction"):
+            embed.add_field(name=event, value=latency_line(bot.metrics.get("talkbot_event_seconds", event=event)), inline=False)
+        embed.add_field(
+            name="REST-Planer",
+            value="Warteschlange: " + ", ".join(f"{name} {depth}" for name, depth in rest["depth"].items()) + "\n"
+                  "Wartezeit max.: " + ", ".join(f"{name} {wait['max'] * 1000:.0f} ms" for name, wait in rest["wait"].items()) + "\n"
+                  f"Zusammengefasst: {rest['coalesced']}",
+            inline=False
+        )
+        embed.add_field(
+            name="Talk-Sperren",
+            value=f"Erworben: {bot.talk_locks.acquired}, davon umkämpft: {bot.talk_locks.contended}\n"
+                  f"Wartezeit: {latency_line(bot.metrics.get('talkbot_lock_wait_seconds', scope='talk'))}",
+            inline=False
+        )
+        admission = bot.admission
+        embed.add_field(
+            name="Talk-Erstellung",
+            value=f"{limits_text(admission.limits(interaction.guild.id))}\n"
+                  f"Wartend: {len(admission.queues.get(interaction.guild.id, ()))} auf diesem Server, {admission.queued} insgesamt\n"
+                  f"Zugelassen: {admission.admitted}, abgelehnt: "
+                  + (", ".join(f"{reason} {count}" for reason, count in admission.rejected.items()) or "0"),
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # Befehl zum Aufräumen aller leeren Talks
+    @app_commands.command(
+        name="talks_aufraeumen",
+        description="Löscht alle leeren Talks und verwaiste Einträge auf diesem Server"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def cleanup_talks(self, interaction: discord.Interaction):
+        """Befehl zum gesammelten Löschen leerer Talks (nur Administratoren)"""
+        if not await require_admin(interaction):
+            return
+        bot = self.bot
+        guild = interaction.guild
+        records = [
+            record for record in bot.talks.for_guild(guild.id)
+            if guild.get_channel(record.channel_id) is None or len(guild.get_channel(record.channel_id).members) == 0
+        ]
+        if not records:
+            await interaction.response.send_message("Es gibt keine leeren Talks zum Aufräumen.", ephemeral=True)
+            return
+
+        async def delete(record):
+            return await bot.deletion_scheduler.delete_now(record.channel_id, guild.id, record.name)
+
+        await run_bulk(interaction, "Talks aufräumen", records, delete)
+
+    # Befehl zum Autorisieren mehrerer Benutzer für einen Talk
+    @app_commands.command(
+        name="talk_autorisieren",
+        description="Autorisiert mehrere Benutzer oder eine Rolle für einen Talk"
+    )
+    @app_commands.describe(
+        talk_name="Der Name des Talks",
+        benutzer="Erwähnungen oder Benutzer-IDs, getrennt durch Leerzeichen",
+        rolle="Alle Mitglieder dieser Rolle autorisieren"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def authorize_users(self, interaction: discord.Interaction, talk_name: str, benutzer: str = None, rolle: discord.Role = None):
+        """Befehl zum Autorisieren mehrerer Benutzer für einen Talk (nur Administratoren)"""
+        if not await require_admin(interaction):
+            return
+        bot = self.bot
+        guild = interaction.guild
+        record, channel = find_talk(bot, guild, talk_name)
+        if record is None:
+            await interaction.response.send_message(f"❌ Kein Talk mit dem Namen '{talk_name}' gefunden.", ephemeral=True)
+            return
+
+        user_ids = {int(a or b) for a, b in USER_ID_PATTERN.findall(benutzer or "")}
+        if rolle is not None:
+            # Ohne vollständigen Mitglieder-Cache (LEAN_CACHE) enthält die Rolle nur bekannte Mitglieder
+            user_ids.update(member.id for member in rolle.members)
+        if not user_ids:
+            await interaction.response.send_message("❌ Keine Benutzer angegeben.", ephemeral=True)
+            return
+
+        async def authorize(user_id):
+            if await bot.resolve_member(guild, user_id) is None:
+                raise LookupError("Mitglied nicht gefunden")
+            async with bot.talk_locks.hold(record.channel_id):
+                if bot.talks.get(record.channel_id) is not record:
+                    raise LookupError("Talk existiert nicht mehr")
+                if not bot.talks.authorize(record.channel_id, user_id):
+                    return False
+                bot.store.add_authorized(record.channel_id, user_id)
+                bot.journal.note("TALK_AUTHORIZE", channel_id=record.channel_id, user_id=user_id)
+                return True
+
+        counts = await run_bulk(interaction, f"Autorisierung für {channel.name}", sorted(user_ids), authorize)
+        if counts["ok"]:
+            # Alle neuen Berechtigungen in einer einzigen Kanalbearbeitung
+            try:
+                await bot.talk_access.grant(channel)
+            except Exception as e:
+                logger.error(f"Fehler beim Vergeben der Talk-Berechtigungen: {e}")
+
+    # Befehl zum Verschieben aller Mitglieder eines Voice-Kanals in einen Talk
+    @app_commands.command(
+        name="talk_gruppe_verschieben",
+        description="Verschiebt alle Mitglieder eines Voice-Kanals in einen Talk"
+    )
+    @app_commands.describe(
+        quelle="Der Voice-Kanal, dessen Mitglieder verschoben werden",
+        talk_name="Der Name des Ziel-Talks"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def move_group(self, interaction: discord.Interaction, quelle: discord.VoiceChannel, talk_name: str):
+        """Befehl zum Verschieben einer ganzen Gruppe in einen Talk (nur Administratoren)"""
+        if not await require_admin(interaction):
+            return
+        bot = self.bot
+        guild = interaction.guild
+        record, channel = find_talk(bot, guild, talk_name)
+        if record is None:
+            await interaction.response.send_message(f"❌ Kein Talk mit dem Namen '{talk_name}' gefunden.", ephemeral=True)
+            return
+        members = [member for member in quelle.members if member.voice and member.voice.channel and member.voice.channel.id != channel.id]
+        if not members:
+            await interaction.response.send_message(f"❌ In {quelle.name} ist niemand, der verschoben werden kann.", ephemeral=True)
+            return
+
+        # Die Gruppe vorab autorisieren, damit der Passwortschutz sie nicht wieder entfernt
+        async with bot.talk_locks.hold(channel.id):
+            for member in members:
+                if bot.talks.authorize(channel.id, member.id):
+                    bot.store.add_authorized(channel.id, member.id)
+                    bot.journal.note("TALK_AUTHORIZE", channel_id=channel.id, user_id=member.id)
+        try:
+            await bot.talk_access.grant(channel)
+        except Exception as e:
+            logger.error(f"Fehler beim Vergeben der Talk-Berechtigungen: {e}")
+
+        async def move(member):
+            if not (member.voice and member.voice.channel):
+                return False
+            if not await bot.move_into_talk(member, channel):
+                raise LookupError("Talk existiert nicht mehr")
+            return True
+
+        await run_bulk(interaction, f"Verschieben nach {channel.name}", members, move)
+
+    @authorize_users.autocomplete("talk_name")
+    @move_group.autocomplete("talk_name")
+    async def talk_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Schlägt passende Talks des Servers vor, beste Treffer zuerst"""
+        return talk_name_choices(self.bot, interaction.guild, current)
+
+    # Befehl zum Anzeigen der Talk-Auslastung
+    @app_commands.command(
+        name="talk_auslastung",
+        description="Zeigt Spitzenwerte, Lebensdauer und Beitrittsraten der Talks auf diesem Server"
+    )
+    @app_commands.describe(
+        zeitraum="Ausgewerteter Zeitraum (Standard: 24 Stunden)"
+    )
+    @app_commands.choices(zeitraum=[
+        app_commands.Choice(name="1 Stunde", value=3600),
+        app_commands.Choice(name="24 Stunden", value=86400),
+        app_commands.Choice(name="7 Tage", value=7 * 86400),
+        app_commands.Choice(name="30 Tage", value=30 * 86400),
+    ])
+    @app_commands.default_permissions(administrator=True)
+    async def show_occupancy(self, interaction: discord.Interaction, zeitraum: app_commands.Choice[int] = None):
+        """Befehl zum Anzeigen der Talk-Auslastung (nur Administratoren)"""
+        if not await require_admin(interaction):
+            return
+        window = zeitraum.value if zeitraum else 86400
+        label = zeitraum.name if zeitraum else "24 Stunden"
+        summary = self.bot.occupancy.summary(interaction.guild.id, window)
+        if summary is None:
+            await interaction.response.send_message("ℹ️ Für diesen Server wurde noch keine Talk-Aktivität aufgezeichnet.", ephemeral=True)
+            return
+
+        peak = f"{summary['peak']}"
+        if summary["peak_at"] is not None:
+            peak += f" (<t:{int(summary['peak_at'])}:f>)"
+        lifetime = summary["avg_lifetime"]
+        embed = discord.Embed(title=f"📈 Talk-Auslastung – {label}", color=discord.Color.blue())
+        embed.add_field(name="Gleichzeitige Talks", value=f"Aktuell: {summary['talks']}\nSpitze: {peak}", inline=False)
+        embed.add_field(
+            name="Talks",
+            value=f"Erstellt: {summary['created']}, gelöscht: {summary['ended']}\n"
+                  f"Durchschnittliche Lebensdauer: {f'{lifetime / 60:.1f} min' if lifetime is not None else 'keine Daten'}",
+            inline=False
+        )
+        embed.add_field(
+            name="Beitritte",
+            value=f"{summary['joins_per_hour']:.1f} pro Stunde beigetreten, {summary['leaves_per_hour']:.1f} pro Stunde verlassen",
+            inline=False
+        )
+        embed.set_footer(text=f"Auflösung: {summary['resolution'] // 60} min")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # Befehl zum Neuladen der Erweiterungen ohne Neustart
+    @app_commands.command(
+        name="erweiterung_neu_laden",
+        description="Lädt Befehle und Event-Handler neu, ohne die Verbindung zu Discord zu trennen"
+    )
+    @app_commands.describe(
+        erweiterung="Die neu zu ladende Erweiterung (leer lassen für alle)"
+    )
+    @app_commands.choices(erweiterung=[
+        app_commands.Choice(name=name.rsplit(".", 1)[-1], value=name) for name in EXTENSIONS
+    ])
+    @app_commands.default_permissions(administrator=True)
+    async def reload_extensions(self, interaction: discord.Interaction, erweiterung: app_commands.Choice[str] = None):
+        """Befehl zum Neuladen einer oder aller Erweiterungen (nur Administratoren)"""
+        if not await require_admin(interaction):
+            return
+        bot = self.bot
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        lines = []
+        total = 0.0
+        for name in [erweiterung.value] if erweiterung else EXTENSIONS:
+            try:
+                elapsed = await bot.reload_extension_timed(name)
+            except commands.ExtensionError as e:
+                # discord.py hat die vorherige Version wiederhergestellt
+                logger.error(f"Fehler beim Neuladen der Erweiterung {name}: {e}")
+                lines.append(f"❌ {name}: {e}")
+                continue
+            total += elapsed
+            lines.append(f"✅ {name}: {elapsed * 1000:.1f} ms")
+
+        # Nur synchronisieren, wenn sich Befehle tatsächlich geändert haben
+        await bot.sync_commands()
+        if bot.startup_seconds is not None:
+            lines.append(f"Neu geladen in {total * 1000:.1f} ms, Kaltstart bis zur Bereitschaft: {bot.startup_seconds:.1f} s")
+        await send_reply(interaction, "\n".join(lines))
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
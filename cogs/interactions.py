@@ -0,0 +1,318 @@
+"""Button-Interaktionen und die Formulare zum Erstellen und Betreten von Talks"""
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands
+from discord.ui import TextInput
+
+from talk_bot import PRIORITY_CREATE, TALK_QUEUE_PROGRESS_INTERVAL, TalkModal, send_reply, timed_event
+
+logger = logging.getLogger('talk-bot')
+
+def admission_message(bot, guild_id, reason):
+    """Antwort für eine abgelehnte Talk-Erstellung"""
+    limits = bot.admission.limits(guild_id)
+    if reason == "user":
+        return f"❌ Du hast bereits {limits.user_quota} Talk(s) in diesem Server. Lösche oder verlasse zuerst einen davon."
+    if reason == "guild":
+        return f"❌ In diesem Server gibt es bereits {limits.guild_quota} Talks. Bitte versuche es später erneut."
+    return "⏳ Gerade werden sehr viele Talks erstellt. Bitte versuche es in ein paar Sekunden erneut."
+
+async def report_position(bot, interaction: discord.Interaction, ticket):
+    """Zeigt die Warteposition in der zurückgestellten Antwort, bis der Talk an der Reihe ist"""
+    shown = None
+    while True:
+        position = bot.admission.position(ticket)
+        if position <= 1:
+            return
+        if position != shown:
+            eta = bot.admission.estimate(position)
+            try:
+                await interaction.edit_original_response(
+                    content=f"⏳ Dein Talk wird erstellt – Position {position} in der Warteschlange (ca. {eta:.0f} s)."
+                )
+            except discord.HTTPException:
+                return
+            shown = position
+        await asyncio.sleep(TALK_QUEUE_PROGRESS_INTERVAL)
+
+class CreateTalkModal(TalkModal):
+    def __init__(self, bot):
+        super().__init__(bot, title="Erstelle deinen Talk")
+
+        self.talk_name = TextInput(
+            label="Talk-Name",
+            placeholder="Gib den Namen deines Talks ein",
+            required=True,
+            max_length=32
+        )
+
+        self.password_required = TextInput(
+            label="Passwort erforderlich?",
+            placeholder="Ja oder Nein",
+            required=True,
+            max_length=3
+        )
+
+        self.password = TextInput(
+            label="Passwort (falls erforderlich)",
+            placeholder="Leer lassen, wenn kein Passwort benötigt wird",
+            required=False,
+            max_length=20
+        )
+
+        self.add_item(self.talk_name)
+        self.add_item(self.password_required)
+        self.add_item(self.password)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        bot = self.bot
+        guild_id = interaction.guild.id
+
+        if guild_id not in bot.talk_settings:
+            await interaction.response.send_message("❌ Das Talk-System ist in diesem Server nicht eingerichtet!", ephemeral=True)
+            return
+
+        category = bot.talk_settings[guild_id]["category"]
+
+        # Überprüfen, ob ein Passwort erforderlich ist
+        password_required = self.password_required.value.lower() in ["ja", "yes", "j", "y"]
+        password = self.password.value if password_required else None
+
+        if password_required and not password:
+            await interaction.response.send_message("❌ Du hast angegeben, dass ein Passwort erforderlich ist, aber keines eingegeben!", ephemeral=True)
+            return
+
+        # Kontingente erneut prüfen: zwischen Klick und Absenden können andere Talks entstanden sein
+        ticket, reason = bot.admission.admit(guild_id, interaction.user.id)
+        if ticket is None:
+            await interaction.response.send_message(admission_message(bot, guild_id, reason), ephemeral=True)
+            logger.info(f"Talk-Erstellung von {interaction.user} abgelehnt ({reason})")
+            return
+
+        # Erstellung kann in der Warteschlange dauern, daher zuerst bestätigen
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        reporter = asyncio.create_task(report_position(bot, interaction, ticket))
+        try:
+            # Erst hashen, dann den Kanal anlegen: so ist ein sichtbarer 🔒-Kanal sofort als geschützter Talk registriert
+            if password is not None:
+                password = await bot.passwords.hash(password)
+
+            # Voice-Kanal aus dem Pool übernehmen oder neu erstellen
+            prefix = "🔒" if password_required else "🎙️"
+            channel_name = f"{prefix} {self.talk_name.value}"
+            overwrites = None
+            if password_required and bot.talk_access.enabled:
+                # Discord verweigert das Verbinden, bis der Bot eine Berechtigung vergibt
+                overwrites = bot.talk_access.creation_overwrites(interaction.guild, category, interaction.user)
+            permissions = {"overwrites": overwrites} if overwrites is not None else {}
+            new_channel = await bot.channel_pool.claim(interaction.guild, category, channel_name, overwrites)
+            if new_channel is None:
+                new_channel = await bot.rest.submit(
+                    PRIORITY_CREATE, "create",
+                    lambda: interaction.guild.create_voice_channel(
+                        name=channel_name,
+                        category=category,
+                        **permissions
+                    ),
+                    guild_id=guild_id
+                )
+
+            # Ersteller, Passwort-Hash und Kanalnamen speichern; der Ersteller ist autorisiert
+            bot.talks.add(new_channel.id, guild_id, interaction.user.id, password, new_channel.name, [interaction.user.id])
+            bot.talk_lists.invalidate(guild_id)
+            bot.occupancy.talk_opened(guild_id, new_channel.id)
+            bot.store.save_talk(new_channel.id, guild_id, interaction.user.id, password, new_channel.name)
+            bot.store.add_authorized(new_channel.id, interaction.user.id)
+            bot.journal.note(
+                "TALK_CREATE", channel_id=new_channel.id, guild_id=guild_id, creator_id=interaction.user.id,
+                protected=password is not None, name=new_channel.name
+            )
+
+            password_info = "mit Passwortschutz" if password_required else "ohne Passwortschutz"
+            content = f"✅ Dein Talk wurde in {new_channel.mention} erstellt ({password_info})!"
+            logger.info(f"Talk-Kanal '{new_channel.name}' erstellt von {interaction.user}")
+
+        except discord.Forbidden:
+            content = "❌ Ich habe keine Berechtigung, Voice-Kanäle zu erstellen!"
+        except Exception as e:
+            logger.error(f"Fehler beim Erstellen des Talk-Kanals: {e}")
+            content = "❌ Beim Erstellen deines Talk-Kanals ist ein Fehler aufgetreten."
+        finally:
+            bot.admission.release(ticket)
+            reporter.cancel()
+
+        try:
+            await interaction.edit_original_response(content=content)
+        except discord.HTTPException as e:
+            logger.warning(f"Antwort zur Talk-Erstellung konnte nicht gesendet werden: {e}")
+
+class PasswordModal(TalkModal):
+    def __init__(self, bot, channel_id, channel_name, guild_id, user_id):
+        super().__init__(bot, title="Passwort eingeben")
+        self.channel_id = channel_id
+        self.channel_name = channel_name
+        self.guild_id = guild_id
+        self.user_id = user_id
+
+        self.password = TextInput(
+            label="Passwort",
+            placeholder="Gib das Passwort für diesen Talk ein",
+            required=True
+        )
+
+        self.add_item(self.password)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        bot = self.bot
+        entered_password = self.password.value
+        record = bot.talks.get(self.channel_id)
+
+        # Überprüfen, ob wir in einer DM sind
+        if interaction.guild is None:
+            guild = bot.get_guild(self.guild_id)
+            if not guild:
+                await interaction.response.send_message("❌ Server nicht gefunden. Bitte versuche es erneut.", ephemeral=True)
+                return
+            channel = guild.get_channel(self.channel_id)
+            member = await bot.resolve_member(guild, self.user_id)
+        else:
+            guild = interaction.guild
+            channel = guild.get_channel(self.channel_id)
+            member = interaction.user
+
+        if not channel or not member:
+            await interaction.response.send_message("❌ Kanal oder Benutzer nicht gefunden.", ephemeral=True)
+            return
+
+        # Versuche begrenzen, bevor scrypt Rechenzeit kostet
+        attempt_key = (interaction.user.id, self.channel_id)
+        wait = bot.password_attempts.hit(attempt_key)
+        if wait:
+            await interaction.response.send_message(f"⏳ Zu viele Versuche. Bitte warte {wait:.0f} Sekunden.", ephemeral=True)
+            logger.info(f"Passwortversuche von Benutzer {interaction.user.id} für Talk-Kanal {self.channel_id} begrenzt")
+            return
+
+        # Prüfung und Verschieben können dauern, daher zuerst bestätigen
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        stored = record.password if record else None
+        correct, rehash = await bot.passwords.verify(stored, entered_password) if stored is not None else (False, False)
+
+        if correct:
+            bot.password_attempts.reset(attempt_key)
+            if rehash:
+                # Klartext oder veraltete Kostenparameter durch einen aktuellen Hash ersetzen
+                rehashed = await bot.passwords.hash(entered_password)
+
+            # Passwort ist korrekt, Benutzer autorisieren, sofern der Talk inzwischen nicht gelöscht wurde
+            async with bot.talk_locks.hold(self.channel_id):
+                if bot.talks.get(self.channel_id) is not record:
+                    await send_reply(interaction, "❌ Dieser Talk existiert nicht mehr.")
+                    return
+                if rehash and record.password == stored:
+                    record.password = rehashed
+                    bot.store.save_talk(record.channel_id, record.guild_id, record.creator_id, record.password, record.name)
+                if bot.talks.authorize(self.channel_id, self.user_id):
+                    bot.store.add_authorized(self.channel_id, self.user_id)
+                    bot.journal.note("TALK_AUTHORIZE", channel_id=self.channel_id, user_id=self.user_id)
+
+            logger.info(f"Benutzer {self.user_id} wurde für Talk-Kanal {self.channel_id} autorisiert")
+            try:
+                await bot.talk_access.grant(channel)
+            except Exception as e:
+                logger.error(f"Fehler beim Vergeben der Talk-Berechtigung: {e}")
+
+            # Überprüfen, ob der Benutzer mit einem Voice-Channel verbunden ist
+            if member.voice and member.voice.channel:
+                try:
+                    if not await bot.move_into_talk(member, channel):
+                        await send_reply(interaction, "❌ Dieser Talk existiert nicht mehr.")
+                        return
+                    await send_reply(interaction, f"✅ Passwort korrekt! Du wurdest in den Talk '{self.channel_name}' verschoben.")
+                    logger.info(f"Benutzer {member.id} wurde in Talk-Kanal {self.channel_id} verschoben")
+                except Exception as e:
+                    logger.error(f"Fehler beim Verschieben des Benutzers in den Kanal: {e}")
+                    await send_reply(interaction, f"✅ Passwort korrekt! Bitte tritt dem Talk '{self.channel_name}' manuell bei.")
+            else:
+                await send_reply(
+                    interaction,
+                    f"✅ Passwort korrekt! Bitte tritt dem Talk '{self.channel_name}' manuell bei, da du derzeit nicht in einem Voice-Channel bist."
+                )
+        else:
+            await send_reply(interaction, "❌ Falsches Passwort!")
+            logger.info(f"Benutzer {self.user_id} hat ein falsches Passwort für Talk-Kanal {self.channel_id} eingegeben")
+
+class Interactions(commands.Cog):
+    """Leitet Button-Klicks über bot.components an die Handler weiter"""
+
+    ACTIONS = ("create", "password", "join")
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        components = self.bot.components
+        components.register("create")(self.handle_create_button)
+        components.register("password", args=3)(self.handle_password_button)
+        components.register("join", args=2, defer=True)(self.handle_join_button)
+
+    async def cog_unload(self):
+        for action in self.ACTIONS:
+            self.bot.components.unregister(action)
+
+    async def handle_create_button(self, interaction: discord.Interaction):
+        """Öffnet das Formular zum Erstellen eines Talks"""
+        # Schnell ablehnen, bevor jemand ein Formular ausfüllt, das ohnehin abgewiesen würde
+        reason = self.bot.admission.reject(interaction.guild_id, interaction.user.id)
+        if reason is not None:
+            await interaction.response.send_message(admission_message(self.bot, interaction.guild_id, reason), ephemeral=True)
+            return
+        modal = CreateTalkModal(self.bot)
+        await interaction.response.send_modal(modal)
+
+    async def handle_password_button(self, interaction: discord.Interaction, channel_id, guild_id, user_id):
+        """Öffnet das Passwort-Formular für einen geschützten Talk"""
+        record = self.bot.talks.get(channel_id)
+        channel_name = record.name if record else "Unbekannter Kanal"
+        modal = PasswordModal(self.bot, channel_id, channel_name, guild_id, user_id)
+        await interaction.response.send_modal(modal)
+
+    async def handle_join_button(self, interaction: discord.Interaction, channel_id, guild_id):
+        """Verschiebt autorisierte Benutzer in den Talk"""
+        bot = self.bot
+        if not bot.talks.is_authorized(channel_id, interaction.user.id):
+            await send_reply(interaction, "❌ Du bist nicht autorisiert, diesem Talk beizutreten.")
+            logger.info(f"Benutzer {interaction.user.id} nicht autorisiert für Talk-Kanal {channel_id}")
+            return
+
+        guild = bot.get_guild(guild_id)
+        if not guild:
+            await send_reply(interaction, "❌ Server nicht gefunden.")
+            return
+
+        channel = guild.get_channel(channel_id)
+        member = await bot.resolve_member(guild, interaction.user.id)
+        if channel and member and member.voice and member.voice.channel:
+            try:
+                if not await bot.move_into_talk(member, channel):
+                    await send_reply(interaction, "❌ Dieser Talk existiert nicht mehr.")
+                    return
+                await send_reply(interaction, "✅ Du wurdest in den Talk verschoben.")
+                logger.info(f"Benutzer {member.id} wurde in Talk-Kanal {channel_id} verschoben")
+            except Exception as e:
+                logger.error(f"Fehler beim Verschieben des Benutzers: {e}")
+                await send_reply(interaction, "❌ Fehler beim Verschieben in den Talk-Kanal.")
+        else:
+            await send_reply(interaction, "❌ Du musst in einem Voice-Channel sein, um verschoben zu werden.")
+
+    @commands.Cog.listener()
+    @timed_event
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Button-Interaktionen verarbeiten"""
+        if not interaction.type == discord.InteractionType.component:
+            return
+        await self.bot.components.dispatch(interaction)
+
+async def setup(bot):
+    await bot.add_cog(Interactions(bot))
@@ -0,0 +1,149 @@
+"""Slash-Befehle zum Anzeigen von und Beitreten zu Talks"""
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.ui import Button, View
+
+from talk_bot import ComponentRouter, PasswordButtonView, find_talk, send_reply, talk_name_choices
+
+logger = logging.getLogger('talk-bot')
+
+def render_talk_list(bot, guild, user_id, page):
+    """Baut eine Seite der Talk-Übersicht; gibt (None, None) zurück, wenn es keine Talks gibt"""
+    entries, page, pages, total = bot.talk_lists.page(guild, bot.talks, page)
+    if not entries:
+        return None, None
+
+    embed = discord.Embed(
+        title="📣 Verfügbare Talks",
+        description="Hier sind alle verfügbaren Talks auf diesem Server:",
+        color=discord.Color.blue()
+    )
+    for channel_id, name, status, member_count in entries:
+        # Zugriff nur für die sichtbaren Talks prüfen
+        access = "✅ Zugriff erlaubt" if bot.talks.is_authorized(channel_id, user_id) else "❌ Zugriff verweigert"
+        embed.add_field(
+            name=name,
+            value=f"{status}\n{access}\nMitglieder: {member_count}",
+            inline=True
+        )
+    if pages > 1:
+        embed.set_footer(text=f"Seite {page + 1}/{pages} · {total} Talks")
+    return embed, TalkListView(guild.id, page, pages) if pages > 1 else None
+
+# Benutzerdefinierte View zum Blättern in der Talk-Übersicht
+class TalkListView(View):
+    def __init__(self, guild_id, page, pages):
+        super().__init__(timeout=None)
+        self.add_item(Button(
+            label="Zurück",
+            style=discord.ButtonStyle.secondary,
+            custom_id=ComponentRouter.build("talks", guild_id, max(page - 1, 0)),
+            emoji="◀️",
+            disabled=page == 0
+        ))
+        self.add_item(Button(
+            label="Weiter",
+            style=discord.ButtonStyle.secondary,
+            custom_id=ComponentRouter.build("talks", guild_id, min(page + 1, pages - 1)),
+            emoji="▶️",
+            disabled=page >= pages - 1
+        ))
+
+class TalkCommands(commands.Cog):
+    """/talks_anzeigen, /talk_beitreten und das Blättern in der Übersicht"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.bot.components.register("talks", args=2)(self.handle_talk_list_page)
+
+    async def cog_unload(self):
+        self.bot.components.unregister("talks")
+
+    async def handle_talk_list_page(self, interaction: discord.Interaction, guild_id, page):
+        """Blättert in der Talk-Übersicht; die Seite kommt aus dem zwischengespeicherten Schnappschuss"""
+        guild = interaction.guild or self.bot.get_guild(guild_id)
+        if guild is None or guild.id != guild_id:
+            await interaction.response.send_message("❌ Server nicht gefunden. Bitte versuche es erneut.", ephemeral=True)
+            return
+        embed, view = render_talk_list(self.bot, guild, interaction.user.id, page)
+        if embed is None:
+            await interaction.response.edit_message(content="Es sind derzeit keine Talks verfügbar.", embed=None, view=None)
+            return
+        await interaction.response.edit_message(embed=embed, view=view)
+
+    # Befehl zum Anzeigen aller verfügbaren Talks
+    @app_commands.command(
+        name="talks_anzeigen",
+        description="Zeigt alle verfügbaren Talks an"
+    )
+    async def list_talks(self, interaction: discord.Interaction):
+        """Befehl zum Anzeigen aller verfügbaren Talks"""
+        embed, view = render_talk_list(self.bot, interaction.guild, interaction.user.id, 0)
+        if embed is None:
+            await interaction.response.send_message("Es sind derzeit keine Talks verfügbar.", ephemeral=True)
+            return
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+    # Befehl zum Beitreten zu einem Talk
+    @app_commands.command(
+        name="talk_beitreten",
+        description="Tritt einem Talk bei"
+    )
+    @app_commands.describe(
+        talk_name="Der Name des Talks, dem du beitreten möchtest"
+    )
+    async def join_talk(self, interaction: discord.Interaction, talk_name: str):
+        """Befehl zum Beitreten zu einem Talk"""
+        bot = self.bot
+        guild = interaction.guild
+
+        record, channel = find_talk(bot, guild, talk_name)
+        if channel is None:
+            await interaction.response.send_message(f"❌ Kein Talk mit dem Namen '{talk_name}' gefunden.", ephemeral=True)
+            return
+
+        channel_id = channel.id
+        is_authorized = record.is_authorized(interaction.user.id)
+
+        if is_authorized:
+            if interaction.user.voice and interaction.user.voice.channel:
+                # Verschieben kann dauern, daher zuerst bestätigen
+                await interaction.response.defer(ephemeral=True, thinking=True)
+                try:
+                    if not await bot.move_into_talk(interaction.user, channel):
+                        await send_reply(interaction, "❌ Dieser Talk existiert nicht mehr.")
+                        return
+                    await send_reply(interaction, f"✅ Du wurdest in den Talk '{channel.name}' verschoben.")
+                    logger.info(f"Benutzer {interaction.user.id} wurde in Talk-Kanal {channel_id} verschoben")
+                except Exception as e:
+                    logger.error(f"Fehler beim Verschieben des Benutzers: {e}")
+                    await send_reply(interaction, "❌ Fehler beim Verschieben in den Talk-Kanal.")
+            else:
+                await interaction.response.send_message(f"✅ Du bist autorisiert! Bitte tritt dem Talk '{channel.name}' manuell bei, da du nicht in einem Voice-Channel bist.", ephemeral=True)
+        else:
+            if record.password_protected:
+                channel_name = record.name
+                embed = discord.Embed(
+                    title="🔒 Passwortgeschützter Talk",
+                    description=f"Der Talk-Kanal '{channel_name}' ist passwortgeschützt. Du musst zuerst das Passwort eingeben, bevor du beitreten kannst.",
+                    color=discord.Color.orange()
+                )
+                view = PasswordButtonView(channel_id, channel_name, guild.id, interaction.user.id)
+                await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+                logger.info(f"Passwort-Abfrage an {interaction.user} für Kanal {channel_name} gesendet")
+            else:
+                await interaction.response.send_message("❌ Du bist nicht autorisiert, diesem Talk beizutreten.", ephemeral=True)
+                logger.info(f"Benutzer {interaction.user.id} nicht autorisiert für Talk-Kanal {channel_id}")
+
+    @join_talk.autocomplete("talk_name")
+    async def talk_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Schlägt passende Talks des Servers vor, beste Treffer zuerst"""
+        return talk_name_choices(self.bot, interaction.guild, current)
+
+async def setup(bot):
+    await bot.add_cog(TalkCommands(bot))
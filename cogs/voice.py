@@ -0,0 +1,123 @@
+"""Voice-Events und Kanaländerungen für Talk-Kanäle"""
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands
+
+from talk_bot import PasswordButtonView, timed_event
+
+logger = logging.getLogger('talk-bot')
+
+class VoiceEvents(commands.Cog):
+    """Passwortschutz beim Betreten, Löschplanung beim Verlassen und Pflege der Talk-Daten"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # Laufende Passwort-DMs (starke Referenzen, bis sie fertig sind)
+        self.prompts = set()
+
+    async def send_password_prompt(self, member: discord.Member, channel_id, channel_name):
+        """Sendet die Passwort-Abfrage per DM"""
+        try:
+            embed = discord.Embed(
+                title="🔒 Passwortgeschützter Talk",
+                description=f"Der Talk-Kanal '{channel_name}' ist passwortgeschützt. Du musst zuerst das Passwort eingeben, bevor du beitreten kannst.",
+                color=discord.Color.orange()
+            )
+            view = PasswordButtonView(channel_id, channel_name, member.guild.id, member.id)
+            await self.bot.send_dm(member, key=("password_dm", member.id, channel_id), embed=embed, view=view)
+            logger.info(f"Passwort-Abfrage an {member} für Kanal {channel_name} gesendet")
+        except discord.Forbidden:
+            logger.warning(f"Konnte keine DM an {member} senden")
+        except Exception as e:
+            logger.error(f"Fehler beim Senden der Passwort-Abfrage: {e}")
+
+    async def enforce_talk_access(self, member: discord.Member, channel_id):
+        """Entfernt nicht autorisierte Benutzer aus dem Talk und sendet ihnen die Passwort-Abfrage"""
+        bot = self.bot
+        record = bot.talks.get(channel_id)
+        if record is None or not record.password_protected or record.is_authorized(member.id):
+            return
+
+        # Passwort-Abfrage (höchstens einmal pro TTL) unabhängig vom Entfernen senden: DMs haben ein
+        # eigenes, strengeres Rate-Limit und dürfen das Verschieben nicht verzögern
+        if bot.voice_events.should_prompt(member.id, channel_id):
+            task = asyncio.get_running_loop().create_task(self.send_password_prompt(member, channel_id, record.name))
+            self.prompts.add(task)
+            task.add_done_callback(self.prompts.discard)
+
+        # Benutzer aus dem Kanal entfernen, wenn er noch verbunden und weiterhin nicht autorisiert ist
+        async with bot.talk_locks.hold(channel_id):
+            if bot.talks.is_authorized(channel_id, member.id):
+                return
+            if member.voice and member.voice.channel and member.voice.channel.id == channel_id:
+                try:
+                    await bot.move_member(member, None)
+                    logger.info(f"Nicht autorisierter Benutzer {member.id} wurde aus Talk-Kanal {channel_id} entfernt")
+                except Exception as e:
+                    logger.error(f"Fehler beim Entfernen des Benutzers aus dem Kanal: {e}")
+
+    @commands.Cog.listener()
+    @timed_event
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        """Voice-Status-Updates für Talk-Kanäle verarbeiten"""
+        bot = self.bot
+        logger.debug(f"on_voice_state_update: Member: {member}, Before: {before.channel}, After: {after.channel}")
+        try:
+            before_id = before.channel.id if before.channel is not None else None
+            after_id = after.channel.id if after.channel is not None else None
+            if before_id == after_id:
+                # Nur Stummschalten, Streamen o. Ä.; kein Kanalwechsel
+                bot.voice_events.ignored += 1
+                return
+
+            # Mitgliederzahlen in der Talk-Übersicht sind veraltet
+            if before_id in bot.talks or after_id in bot.talks:
+                bot.talk_lists.invalidate(member.guild.id)
+
+            # Überprüfen, ob ein Benutzer einem Talk-Kanal beigetreten ist
+            record = bot.talks.get(after_id) if after_id is not None else None
+            if record is not None:
+                bot.occupancy.joined(member.guild.id)
+                # Wenn der Kanal passwortgeschützt ist und der Benutzer nicht autorisiert
+                if record.password_protected and not record.is_authorized(member.id):
+                    bot.voice_events.submit((member.id, after_id), lambda: self.enforce_talk_access(member, after_id))
+                else:
+                    # Jeder, der bleiben darf, hält den Talk am Leben: geplante Löschung abbrechen
+                    bot.deletion_scheduler.cancel(after_id)
+                    if member.id == record.creator_id:
+                        logger.info(f"Talk-Ersteller {member} hat seinen Talk-Kanal {after.channel.name} betreten")
+                    elif record.is_authorized(member.id):
+                        logger.info(f"Autorisierter Benutzer {member} hat Talk-Kanal {after.channel.name} betreten")
+
+            # Überprüfen, ob ein Benutzer einen Talk-Kanal verlassen hat
+            record = bot.talks.get(before_id) if before_id is not None else None
+            if record is not None:
+                bot.occupancy.left(member.guild.id)
+                if len(before.channel.members) == 0:
+                    bot.deletion_scheduler.schedule(before_id, before.channel.guild.id, before.channel.name)
+                else:
+                    if member.id == record.creator_id:
+                        logger.info(f"Talk-Ersteller {member} hat den Kanal verlassen, aber der Kanal bleibt bestehen, da andere Benutzer noch im Kanal sind")
+
+        except Exception as e:
+            logger.error(f"Fehler in on_voice_state_update: {e}")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        """Suchindex und Talk-Übersicht bei umbenannten Talks aktualisieren"""
+        if before.name != after.name and after.id in self.bot.talks:
+            self.bot.talks.rename(after.id, after.name)
+            self.bot.talk_lists.invalidate(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Daten manuell gelöschter Talks und Pool-Kanäle entfernen"""
+        self.bot.channel_pool.discard(channel.id, channel.guild.id)
+        if channel.id in self.bot.talks:
+            self.bot.forget_talk(channel.id)
+            logger.info(f"Talk-Kanal {channel.name} wurde manuell gelöscht")
+
+async def setup(bot):
+    await bot.add_cog(VoiceEvents(bot))
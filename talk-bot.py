@@ -1,138 +1,2913 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from discord.ui import Button, View, Modal, TextInput
+from discord.ui import Button, View, Modal
 from dotenv import load_dotenv
 import os
+import functools
+import json
+import gzip
+import hashlib
+import hmac
+import secrets
+import concurrent.futures
+import argparse
+import array
+import re
+import bisect
+import unicodedata
 import logging
+import logging.handlers
+import queue
+import time
 import asyncio
+import atexit
+import heapq
+import collections
+import contextlib
+import itertools
 import signal
+import sqlite3
 import sys
+import threading
+import zlib
 from datetime import datetime
 import shutil
 
+# Startzeitpunkt des Prozesses (für die Zeit bis zur Bereitschaft)
+PROCESS_STARTED = time.perf_counter()
+
+# Die Erweiterungen unter cogs/ importieren dieses Modul als talk_bot (der Dateiname ist kein gültiger Modulname)
+sys.modules.setdefault("talk_bot", sys.modules[__name__])
+
+# Umgebungsvariablen laden
+load_dotenv()
+
 # Logging einrichten
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('talk-bot')
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Live-Konsolenausgabe
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.INFO)
+console_handler.setFormatter(log_formatter)
+
+# Log-Ordner erstellen
+log_dir = os.path.join(os.getcwd(), 'logs')
+if not os.path.exists(log_dir):
+    try:
+        os.makedirs(log_dir)
+        logger.info(f"Log-Ordner erstellt: {log_dir}")
+    except Exception as e:
+        logger.error(f"Fehler beim Erstellen des Log-Ordners: {e}")
+
+# Sharding: SHARD_COUNT leer = von Discord empfohlene Anzahl, SHARD_IDS leer = alle Shards in diesem Prozess
+SHARD_COUNT = int(os.getenv("SHARD_COUNT")) if os.getenv("SHARD_COUNT") else None
+CLUSTER_ID = os.getenv("CLUSTER_ID")
+# Sekunden zwischen dem Start zweier Cluster-Prozesse (IDENTIFY-Limit)
+CLUSTER_START_DELAY = float(os.getenv("CLUSTER_START_DELAY", 5))
+
+def parse_shard_ids(value):
+    """Liest '0-3' oder '0,1,4' als Liste von Shard-IDs"""
+    if not value:
+        return None
+    shard_ids = []
+    for part in value.split(","):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return shard_ids
+
+SHARD_IDS = parse_shard_ids(os.getenv("SHARD_IDS"))
+
+def shard_for_guild(guild_id, shard_count):
+    """Shard, über den Discord einen Server ausliefert"""
+    return (guild_id >> 22) % shard_count
+
+def split_shards(shard_count, clusters):
+    """Teilt die Shards in zusammenhängende Bereiche für die einzelnen Prozesse auf"""
+    clusters = max(1, min(clusters, shard_count))
+    size, rest = divmod(shard_count, clusters)
+    ranges = []
+    start = 0
+    for cluster in range(clusters):
+        end = start + size + (1 if cluster < rest else 0)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+# Rotation: Größe in Bytes und Zeitintervall in Stunden (über .env anpassbar)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_ROTATE_HOURS = float(os.getenv("LOG_ROTATE_HOURS", 24))
+
+class SessionLogHandler(logging.handlers.BaseRotatingHandler):
+    """Schreibt in '<Start> - .log' und benennt beim Rotieren/Beenden in '<Start> - <Ende>.log' um.
+
+    Der Handler läuft ausschließlich im Thread des QueueListeners. Einträge werden
+    gepuffert geschrieben; geflusht wird erst, wenn die Queue leergelaufen ist.
+    """
+
+    def __init__(self, directory, max_bytes=0, rotate_seconds=0, label=""):
+        self.directory = directory
+        self.label = label
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.segment_start = datetime.now()
+        super().__init__(self._segment_path(), 'a', encoding='utf-8', delay=True)
+        self.rollover_at = self._next_rollover()
+
+    def _segment_path(self, end_time=None):
+        start_str = self.segment_start.strftime('%Y-%m-%d, %H-%M-%S') + self.label
+        end_str = end_time.strftime('%H-%M-%S') if end_time else ""
+        return os.path.join(self.directory, f"{start_str} - {end_str}.log")
+
+    def _next_rollover(self):
+        if not self.rotate_seconds:
+            return None
+        return time.time() + self.rotate_seconds
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() >= self.max_bytes:
+                return True
+        return False
+
+    def _finish_segment(self):
+        """Schließt die aktuelle Datei und trägt die Endzeit in den Dateinamen ein"""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        end_time = datetime.now()
+        new_path = self._unique_path(self._segment_path(end_time))
+        if os.path.exists(self.baseFilename):
+            shutil.move(self.baseFilename, new_path)
+        return new_path
+
+    @staticmethod
+    def _unique_path(path):
+        """Hängt „ (2)“, „ (3)“ … an, wenn mehrere Segmente in derselben Sekunde enden"""
+        stem, extension = os.path.splitext(path)
+        candidate = path
+        number = 2
+        while os.path.exists(candidate):
+            candidate = f"{stem} ({number}){extension}"
+            number += 1
+        return candidate
+
+    def doRollover(self):
+        self._finish_segment()
+        self.segment_start = datetime.now()
+        self.baseFilename = os.path.abspath(self._segment_path())
+        self.rollover_at = self._next_rollover()
+
+    def emit(self, record):
+        # Wie FileHandler.emit, aber ohne Flush pro Eintrag
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def close_session(self):
+        """Beendet die Sitzung und gibt den endgültigen Dateinamen zurück"""
+        self.acquire()
+        try:
+            return os.path.basename(self._finish_segment())
+        finally:
+            self.release()
+            logging.FileHandler.close(self)
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener, der seine Handler erst flusht, wenn die Queue leer ist"""
+
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+# Cluster-Prozesse starten gleichzeitig und brauchen eigene Log-Dateien
+log_label = f" [Cluster {CLUSTER_ID}]" if CLUSTER_ID is not None else ""
+file_handler = SessionLogHandler(log_dir, LOG_MAX_BYTES, int(LOG_ROTATE_HOURS * 3600), log_label)
+file_handler.setLevel(logging.INFO)
+file_handler.setFormatter(log_formatter)
+
+# Event-Handler legen Einträge nur in die Queue, geschrieben wird im Hintergrund-Thread
+log_queue = queue.SimpleQueue()
+queue_handler = logging.handlers.QueueHandler(log_queue)
+log_listener = BatchingQueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+logger.handlers = [queue_handler]  # Entfernt doppelte Handler
+logger.propagate = False
+log_listener.start()
+
+# Log-Queue leeren und Log-Datei umbenennen; wird genau einmal ausgeführt
+log_finalized = False
+
+def finalize_logs():
+    global log_finalized
+    if log_finalized:
+        return
+    log_finalized = True
+    try:
+        # Restliche Einträge schreiben, danach nur noch direkt auf die Konsole loggen
+        log_listener.stop()
+        logger.handlers = [console_handler]
+        new_log_file_name = file_handler.close_session()
+        logger.info(f"Log-Datei umbenannt zu: {new_log_file_name}")
+    except Exception as e:
+        logger.error(f"Fehler beim Umbenennen der Log-Datei: {e}")
+
+# Auch bei unerwartetem Prozessende keine gepufferten Einträge verlieren
+atexit.register(finalize_logs)
+
+# Funktion zum Umbenennen der Log-Datei beim Beenden (nur bevor die Event-Loop läuft;
+# danach übernimmt TalkBot.request_shutdown)
+def rename_log_file(signal_number=None, frame=None):
+    finalize_logs()
+    if signal_number == signal.SIGINT:
+        print("stopt")
+    logger.info("Bot ordnungsgemäß beendet")
+    sys.exit(0)
+
+# Signal-Handler für SIGINT und SIGTERM
+signal.signal(signal.SIGINT, rename_log_file)
+signal.signal(signal.SIGTERM, rename_log_file)
+
+# Prioritäten für ausgehende REST-Aufrufe (kleiner = wichtiger)
+PRIORITY_MOVE = 0
+PRIORITY_CREATE = 1
+PRIORITY_DM = 2
+PRIORITY_CLEANUP = 3
+PRIORITY_NAMES = {PRIORITY_MOVE: "move", PRIORITY_CREATE: "create", PRIORITY_DM: "dm", PRIORITY_CLEANUP: "cleanup"}
+
+# Token-Buckets pro Route und Server: (Tokens pro Sekunde, Burst)
+REST_ROUTE_LIMITS = {
+    "move": (5.0, 10),
+    "create": (0.5, 5),
+    "edit": (0.5, 5),
+    "dm": (1.0, 5),
+    "delete": (1.0, 5),
+}
+# Maximale Anzahl gleichzeitig laufender REST-Aufrufe
+REST_MAX_CONCURRENCY = int(os.getenv("REST_MAX_CONCURRENCY", 8))
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now):
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now):
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class RestJob:
+    __slots__ = ("priority", "route", "guild_id", "key", "factory", "futures", "enqueued_at")
+
+    def __init__(self, priority, route, guild_id, key, factory, future):
+        self.priority = priority
+        self.route = route
+        self.guild_id = guild_id
+        self.key = key
+        self.factory = factory
+        self.futures = [future]
+        self.enqueued_at = time.monotonic()
+
+class RestScheduler:
+    """Plant ausgehende REST-Aufrufe nach Priorität und Token-Bucket pro Route und Server.
+
+    Verschieben von Benutzern hat Vorrang vor dem Erstellen von Kanälen, DMs und
+    Aufräumarbeiten. Aufträge mit gleichem Schlüssel, die noch warten, werden
+    zusammengefasst: der neueste Auftrag gewinnt, alle Aufrufer erhalten sein Ergebnis.
+    discord.py behandelt die eigentlichen 429-Antworten weiterhin selbst.
+    """
+
+    def __init__(self, route_limits=REST_ROUTE_LIMITS, max_concurrency=REST_MAX_CONCURRENCY, metrics=None):
+        self.metrics = metrics
+        self.route_limits = route_limits
+        self.max_concurrency = max_concurrency
+        self._queues = {priority: collections.deque() for priority in PRIORITY_NAMES}
+        self._pending = {}  # {key: RestJob}
+        self._buckets = {}  # {(route, guild_id): TokenBucket}
+        self._wakeup = None
+        self._slots = None
+        self._task = None
+        self.coalesced = 0
+        self.running = 0
+        self._waits = {priority: [0, 0.0, 0.0] for priority in PRIORITY_NAMES}  # [Anzahl, Summe, Maximum]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for queue_ in self._queues.values():
+            for job in queue_:
+                for future in job.futures:
+                    future.cancel()
+            queue_.clear()
+        self._pending.clear()
+
+    async def submit(self, priority, route, factory, guild_id=None, key=None):
+        """Führt factory() geplant aus und gibt das Ergebnis zurück"""
+        if self._task is None:
+            return await factory()
+        future = asyncio.get_running_loop().create_future()
+        job = self._pending.get(key) if key is not None else None
+        if job is not None:
+            job.factory = factory
+            job.futures.append(future)
+            self.coalesced += 1
+        else:
+            job = RestJob(priority, route, guild_id, key, factory, future)
+            self._queues[priority].append(job)
+            if key is not None:
+                self._pending[key] = job
+            self._wakeup.set()
+        return await future
+
+    def _bucket(self, job):
+        bucket_key = (job.route, job.guild_id)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = TokenBucket(*self.route_limits[job.route])
+        return bucket
+
+    def _next_job(self):
+        """Wichtigster Auftrag mit freiem Token; sonst (None, Wartezeit bis zum nächsten Token)"""
+        now = time.monotonic()
+        delay = None
+        for priority in sorted(self._queues):
+            for job in self._queues[priority]:
+                bucket = self._bucket(job)
+                if bucket.take(now):
+                    self._queues[priority].remove(job)
+                    if job.key is not None:
+                        self._pending.pop(job.key, None)
+                    return job, None
+                wait = bucket.wait_time(now)
+                delay = wait if delay is None else min(delay, wait)
+        return None, delay
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            job, delay = self._next_job()
+            while job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                job, delay = self._next_job()
+            asyncio.get_running_loop().create_task(self._execute(job))
+
+    async def drain(self, interval=0.05):
+        """Wartet, bis keine Aufträge mehr warten oder laufen (mit asyncio.wait_for begrenzen)"""
+        while self.running or any(self._queues.values()):
+            await asyncio.sleep(interval)
+
+    async def _execute(self, job):
+        self.running += 1
+        wait = time.monotonic() - job.enqueued_at
+        stats = self._waits[job.priority]
+        stats[0] += 1
+        stats[1] += wait
+        stats[2] = max(stats[2], wait)
+        if self.metrics is not None:
+            self.metrics.observe("talkbot_rest_wait_seconds", wait, priority=PRIORITY_NAMES[job.priority])
+        started = time.perf_counter()
+        try:
+            result = await job.factory()
+        except asyncio.CancelledError:
+            for future in job.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in job.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in job.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.running -= 1
+            self._slots.release()
+            if self.metrics is not None:
+                self.metrics.observe("talkbot_rest_seconds", time.perf_counter() - started, route=job.route)
+
+    def queue_depth(self):
+        return {PRIORITY_NAMES[priority]: len(queue_) for priority, queue_ in self._queues.items()}
+
+    def stats(self):
+        """Warteschlangenlänge und Wartezeiten (Sekunden) je Prioritätsklasse"""
+        waits = {}
+        for priority, (count, total, maximum) in self._waits.items():
+            waits[PRIORITY_NAMES[priority]] = {
+                "count": count,
+                "avg": total / count if count else 0.0,
+                "max": maximum,
+            }
+        return {"depth": self.queue_depth(), "wait": waits, "coalesced": self.coalesced}
+
+# Obergrenzen der Latenz-Buckets in Sekunden
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class LatencyHistogram:
+    """Histogramm mit festen Buckets; observe() kostet eine Binärsuche und zwei Additionen"""
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # letzter Bucket: +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Obergrenze des Buckets, in dem das Quantil q liegt (Inf, wenn außerhalb)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class ComponentRouter:
+    """Leitet Button-Interaktionen über eine Tabelle an ihre Handler weiter.
+
+    Custom-IDs haben das Format 'tb1:<aktion>:<arg>:...'. Ältere IDs wie
+    'join_talk_<kanal>_<server>' aus bereits gesendeten Nachrichten werden weiterhin erkannt.
+    Handler mit defer=True werden vorab bestätigt und antworten per Followup.
+    """
+
+    VERSION = "tb1"
+    LEGACY_ACTIONS = {"create_talk": "create", "enter_password": "password", "join_talk": "join"}
+
+    def __init__(self):
+        self._handlers = {}  # {aktion: (handler, anzahl_argumente, defer)}
+        self.latency = {}    # {aktion: LatencyHistogram}
+
+    def register(self, action, args=0, defer=False):
+        def decorator(func):
+            self._handlers[action] = (func, args, defer)
+            # Beim Neuladen einer Erweiterung bleibt der Verlauf (und die Metrik) erhalten
+            self.latency.setdefault(action, LatencyHistogram())
+            return func
+        return decorator
+
+    def unregister(self, action):
+        self._handlers.pop(action, None)
+
+    @classmethod
+    def build(cls, action, *args):
+        return ":".join([cls.VERSION, action] + [str(arg) for arg in args])
+
+    def parse(self, custom_id):
+        """Gibt (aktion, [argumente]) zurück oder None, wenn die ID nicht zu diesem Bot gehört"""
+        if custom_id.startswith(self.VERSION + ":"):
+            parts = custom_id.split(":")
+            return parts[1], parts[2:]
+        for name, action in self.LEGACY_ACTIONS.items():
+            if custom_id == name:
+                return action, []
+            if custom_id.startswith(name + "_"):
+                return action, custom_id[len(name) + 1:].split("_")
+        return None
+
+    async def dispatch(self, interaction: discord.Interaction):
+        parsed = self.parse(interaction.data.get("custom_id", ""))
+        if parsed is None:
+            return False
+        action, raw_args = parsed
+        entry = self._handlers.get(action)
+        if entry is None:
+            return False
+        handler, arg_count, defer = entry
+
+        if len(raw_args) < arg_count or not all(arg.isdigit() for arg in raw_args[:arg_count]):
+            await interaction.response.send_message("❌ Ungültige Button-ID. Bitte versuche es erneut.", ephemeral=True)
+            return True
+
+        started = time.perf_counter()
+        try:
+            if defer:
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            await handler(interaction, *(int(arg) for arg in raw_args[:arg_count]))
+        finally:
+            self.latency[action].observe(time.perf_counter() - started)
+        return True
+
+async def send_reply(interaction: discord.Interaction, content=None, **kwargs):
+    """Antwortet ephemer; nach defer() automatisch per Followup"""
+    if interaction.response.is_done():
+        await interaction.followup.send(content, ephemeral=True, **kwargs)
+    else:
+        await interaction.response.send_message(content, ephemeral=True, **kwargs)
+
+# Lokaler Prometheus-Endpunkt (0 = deaktiviert)
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# Messintervall der Event-Loop-Verzögerung in Sekunden
+LOOP_LAG_INTERVAL = 0.5
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+class Metrics:
+    """Zähler und Histogramme mit festen Buckets, exportierbar im Prometheus-Textformat.
+
+    Gauges werden erst beim Export über Callbacks abgefragt und kosten im Betrieb nichts.
+    """
+
+    def __init__(self):
+        self._help = {}        # {name: (typ, beschreibung)}
+        self._histograms = {}  # {name: {labels: LatencyHistogram}}
+        self._counters = {}    # {name: {labels: wert}}
+        self._gauges = {}      # {name: callback -> [(labels, wert)]}
+        self._server = None
+        self._lag_task = None
+        self.loop_lag = 0.0
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def histogram(self, name, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self._histograms.setdefault(name, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = LatencyHistogram()
+        return histogram
+
+    def get(self, name, **labels):
+        """Vorhandenes Histogramm oder None"""
+        return self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def attach(self, name, histogram, **labels):
+        """Exportiert ein bereits vorhandenes Histogramm unter name"""
+        self._histograms.setdefault(name, {})[tuple(sorted(labels.items()))] = histogram
+
+    def observe(self, name, value, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self._counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + amount
+
+    def gauge(self, name, text, callback):
+        """Registriert eine Gauge; callback liefert [(dict mit Labels, Wert)]"""
+        self.describe(name, "gauge", text)
+        self._gauges[name] = callback
+
+    def render(self):
+        """Alle Metriken im Prometheus-Textformat"""
+        lines = []
+
+        def header(name, default_kind):
+            kind, text = self._help.get(name, (default_kind, name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in self._counters.items():
+            header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, series in self._histograms.items():
+            header(name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    bucket_labels = labels + (("le", _format_bound(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        for name, callback in self._gauges.items():
+            header(name, "gauge")
+            try:
+                values = callback()
+            except Exception as e:
+                logger.error(f"Fehler beim Abfragen der Metrik {name}: {e}")
+                continue
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._lag_task is None or self._lag_task.done():
+            self._lag_task = loop.create_task(self._measure_loop_lag())
+        if METRICS_PORT and self._server is None:
+            loop.create_task(self._start_server())
+
+    def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def _start_server(self):
+        try:
+            self._server = await asyncio.start_server(self._handle_http, METRICS_HOST, METRICS_PORT)
+            logger.info(f"Metriken unter http://{METRICS_HOST}:{METRICS_PORT}/metrics verfügbar")
+        except Exception as e:
+            logger.error(f"Fehler beim Starten des Metrik-Endpunkts: {e}")
+
+    async def _handle_http(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def _measure_loop_lag(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            self.loop_lag = max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL)
+            self.observe("talkbot_event_loop_lag_seconds", self.loop_lag)
+
+def timed_event(func):
+    """Misst die Laufzeit eines Event-Listeners einer Cog in talkbot_event_seconds{event=...}"""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self.bot.metrics.observe("talkbot_event_seconds", time.perf_counter() - started, event=func.__name__)
+    return wrapper
+
+class KeyedLocks:
+    """Asynchrone Sperren pro Schlüssel (z. B. pro Talk).
+
+    Sperren werden bei Bedarf angelegt und entfernt, sobald niemand mehr sie hält oder
+    auf sie wartet. Verschiedene Schlüssel blockieren sich nie gegenseitig.
+    """
+
+    def __init__(self, scope, metrics=None):
+        self.scope = scope
+        self.metrics = metrics
+        self._locks = {}  # {key: [asyncio.Lock, Nutzer]}
+        self.acquired = 0
+        self.contended = 0
+
+    @contextlib.asynccontextmanager
+    async def hold(self, key):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        lock = entry[0]
+        entry[1] += 1
+        try:
+            if lock.locked():
+                self.contended += 1
+                started = time.perf_counter()
+                await lock.acquire()
+                if self.metrics is not None:
+                    self.metrics.observe("talkbot_lock_wait_seconds", time.perf_counter() - started, scope=self.scope)
+            else:
+                await lock.acquire()
+            self.acquired += 1
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def locked(self, key):
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    def __len__(self):
+        return len(self._locks)
+
+# Zeit in Sekunden, nach der ein leerer Talk gelöscht wird
+TALK_DELETE_DELAY = float(os.getenv("TALK_DELETE_DELAY", 60))
+
+class PendingDeletion:
+    """Geplante Löschung eines leeren Talk-Kanals"""
+    __slots__ = ("channel_id", "guild_id", "channel_name", "due_at", "cancelled")
+
+    def __init__(self, channel_id, guild_id, channel_name, due_at):
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.channel_name = channel_name
+        self.due_at = due_at
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return self.due_at < other.due_at
+
+    @property
+    def remaining(self):
+        """Verbleibende Sekunden bis zur Löschung"""
+        return max(0.0, self.due_at - time.monotonic())
+
+class TalkDeletionScheduler:
+    """Zentraler Löschplaner für leere Talks.
+
+    Pro Kanal gibt es höchstens eine Frist in einem Heap. Ein einziger Hintergrundtask
+    wartet auf die nächste Frist und löscht alle fälligen Kanäle gesammelt.
+    """
+
+    def __init__(self, bot, delay=TALK_DELETE_DELAY, batch_size=10):
+        self.bot = bot
+        self.delay = delay
+        self.batch_size = batch_size
+        self._heap = []
+        self._entries = {}  # {channel_id: PendingDeletion}
+        self._wakeup = None
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, channel_id, guild_id, channel_name, delay=None):
+        """Plant die Löschung; eine bereits laufende Frist wird nicht verlängert"""
+        entry = self._entries.get(channel_id)
+        if entry is not None:
+            return entry
+        delay = self.delay if delay is None else delay
+        entry = PendingDeletion(channel_id, guild_id, channel_name, time.monotonic() + delay)
+        self._entries[channel_id] = entry
+        heapq.heappush(self._heap, entry)
+        # Nur wecken, wenn die neue Frist die früheste ist
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+        return entry
+
+    def cancel(self, channel_id):
+        """Bricht eine geplante Löschung ab (z. B. bei erneutem Beitritt)"""
+        entry = self._entries.pop(channel_id, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        return True
+
+    def get(self, channel_id):
+        return self._entries.get(channel_id)
+
+    def pending(self, guild_id=None):
+        """Alle geplanten Löschungen, nach Fälligkeit sortiert"""
+        entries = [e for e in self._entries.values() if guild_id is None or e.guild_id == guild_id]
+        return sorted(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, channel_id):
+        return channel_id in self._entries
+
+    def _pop_due(self):
+        now = time.monotonic()
+        due = []
+        while self._heap and len(due) < self.batch_size:
+            entry = self._heap[0]
+            if entry.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if entry.due_at > now:
+                break
+            heapq.heappop(self._heap)
+            self._entries.pop(entry.channel_id, None)
+            due.append(entry)
+        return due
+
+    async def _run(self):
+        while True:
+            try:
+                due = self._pop_due()
+                if due:
+                    await asyncio.gather(*(self._delete(entry) for entry in due))
+                    continue
+                timeout = self._heap[0].due_at - time.monotonic() if self._heap else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Fehler im Löschplaner: {e}")
+                await asyncio.sleep(1)
+
+    async def _delete(self, entry):
+        # Nicht gleichzeitig mit einem Beitritt oder einer Autorisierung für denselben Talk
+        try:
+            async with self.bot.talk_locks.hold(entry.channel_id):
+                await self._delete_locked(entry)
+        except discord.HTTPException as e:
+            # Neue Frist, sonst bliebe der leere Talk nach einem Fehlschlag für immer bestehen
+            self.schedule(entry.channel_id, entry.guild_id, entry.channel_name)
+            logger.error(f"Fehler beim Löschen des Talk-Kanals {entry.channel_name}, neuer Versuch in {self.delay}s: {e}")
+        except Exception as e:
+            logger.error(f"Fehler beim Löschen des Talk-Kanals: {e}")
+
+    async def delete_now(self, channel_id, guild_id, channel_name):
+        """Löscht einen leeren Talk sofort; gibt True zurück, wenn er entfernt wurde.
+
+        Eine geplante Frist wird erst nach erfolgreichem Löschen aufgehoben; schlägt der
+        API-Aufruf fehl, bleibt sie bestehen bzw. wird neu geplant.
+        """
+        entry = PendingDeletion(channel_id, guild_id, channel_name, time.monotonic())
+        async with self.bot.talk_locks.hold(channel_id):
+            try:
+                deleted = await self._delete_locked(entry)
+            except discord.HTTPException:
+                self.schedule(channel_id, guild_id, channel_name)
+                raise
+        if deleted:
+            self.cancel(channel_id)
+        return deleted
+
+    async def _delete_locked(self, entry):
+        if entry.channel_id not in self.bot.talks or self.bot.joining.get(entry.channel_id):
+            return False
+        channel = self.bot.get_channel(entry.channel_id)
+        if channel is None:
+            self.bot.forget_talk(entry.channel_id)
+            return True
+        if len(channel.members) != 0:
+            return False
+        if await self.bot.channel_pool.release(channel):
+            self.bot.forget_talk(entry.channel_id)
+            logger.info(f"Leerer Talk-Kanal {entry.channel_name} in den Pool zurückgelegt")
+            return True
+        await self.bot.rest.submit(
+            PRIORITY_CLEANUP, "delete", lambda: channel.delete(reason="Talk-Kanal leer"),
+            guild_id=entry.guild_id, key=("delete", entry.channel_id)
+        )
+        self.bot.forget_talk(entry.channel_id)
+        logger.info(f"Leerer Talk-Kanal {entry.channel_name} gelöscht")
+        return True
+
+# Vorab erstellte, versteckte Voice-Kanäle pro Server (0 = deaktiviert)
+TALK_POOL_SIZE = int(os.getenv("TALK_POOL_SIZE", 0))
+# Sekunden zwischen zwei Kanalerstellungen beim Auffüllen des Pools
+TALK_POOL_REFILL_INTERVAL = float(os.getenv("TALK_POOL_REFILL_INTERVAL", 5))
+# Obergrenze der Wartezeit für Server, auf denen das Auffüllen wiederholt fehlschlägt
+TALK_POOL_MAX_BACKOFF = float(os.getenv("TALK_POOL_MAX_BACKOFF", 600))
+TALK_POOL_NAME = "⏳ Talk-Reserve"
+
+class TalkChannelPool:
+    """Pool versteckter Voice-Kanäle in der Talk-Kategorie.
+
+    Beim Erstellen eines Talks wird ein Kanal aus dem Pool umbenannt und freigegeben,
+    statt auf create_voice_channel zu warten. Ein Hintergrundtask füllt den Pool
+    gedrosselt wieder auf; leere Talks wandern zurück in den Pool, solange Platz ist.
+    Schlägt das Erstellen auf einem Server fehl, wartet nur dieser Server exponentiell
+    länger, die übrigen werden weiter aufgefüllt.
+    """
+
+    def __init__(self, bot, size=TALK_POOL_SIZE, refill_interval=TALK_POOL_REFILL_INTERVAL,
+                 max_backoff=TALK_POOL_MAX_BACKOFF):
+        self.bot = bot
+        self.size = size
+        self.refill_interval = refill_interval
+        self.max_backoff = max_backoff
+        self._channels = {}  # {guild_id: deque[channel_id]}
+        self._failures = {}  # {guild_id: Anzahl aufeinanderfolgender Fehlschläge}
+        self._retry_at = {}  # {guild_id: time.monotonic(), ab der wieder aufgefüllt wird}
+        self._wakeup = None
+        self._task = None
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def start(self):
+        if self.enabled and (self._task is None or self._task.done()):
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def request_refill(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def available(self, guild_id):
+        return len(self._channels.get(guild_id, ()))
+
+    def adopt(self, channel):
+        """Übernimmt einen bereits vorhandenen Pool-Kanal (z. B. nach einem Neustart)"""
+        pool = self._channels.setdefault(channel.guild.id, collections.deque())
+        if channel.id not in pool:
+            pool.append(channel.id)
+
+    def discard(self, channel_id, guild_id):
+        pool = self._channels.get(guild_id)
+        if pool is not None and channel_id in pool:
+            pool.remove(channel_id)
+
+    @staticmethod
+    def _hidden_overwrites(guild):
+        return {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False, connect=False),
+            guild.me: discord.PermissionOverwrite(view_channel=True, connect=True, manage_channels=True),
+        }
+
+    async def claim(self, guild, category, name, overwrites=None):
+        """Gibt einen umbenannten, sichtbaren Pool-Kanal zurück oder None, wenn der Pool leer ist.
+
+        Ohne overwrites übernimmt der Kanal die Berechtigungen der Kategorie.
+        """
+        pool = self._channels.get(guild.id)
+        permissions = {"overwrites": overwrites} if overwrites is not None else {"sync_permissions": True}
+        while pool:
+            channel = guild.get_channel(pool.popleft())
+            if channel is None:
+                continue
+            try:
+                await self.bot.rest.submit(
+                    PRIORITY_CREATE, "edit",
+                    lambda: channel.edit(name=name, category=category, reason="Talk erstellt", **permissions),
+                    guild_id=guild.id
+                )
+            except Exception as e:
+                logger.error(f"Fehler beim Übernehmen eines Pool-Kanals: {e}")
+                continue
+            self.request_refill()
+            return channel
+        self.request_refill()
+        return None
+
+    async def release(self, channel):
+        """Legt einen leeren Talk zurück in den Pool; gibt False zurück, wenn er gelöscht werden soll"""
+        if not self.enabled or self.available(channel.guild.id) >= self.size:
+            return False
+        try:
+            await self.bot.rest.submit(
+                PRIORITY_CLEANUP, "edit",
+                lambda: channel.edit(
+                    name=TALK_POOL_NAME,
+                    overwrites=self._hidden_overwrites(channel.guild),
+                    reason="Talk-Kanal leer, zurück in den Pool"
+                ),
+                guild_id=channel.guild.id
+            )
+        except Exception as e:
+            logger.error(f"Fehler beim Zurücklegen des Kanals in den Pool: {e}")
+            return False
+        self.adopt(channel)
+        return True
+
+    def _backoff(self, guild_id):
+        """Merkt einen Fehlschlag vor und gibt die Wartezeit bis zum nächsten Versuch zurück"""
+        failures = self._failures.get(guild_id, 0) + 1
+        self._failures[guild_id] = failures
+        delay = min(self.max_backoff, self.refill_interval * 2 ** failures)
+        self._retry_at[guild_id] = time.monotonic() + delay
+        return delay
+
+    def _next_retry(self):
+        """Sekunden bis zum nächsten Wiederholungsversuch oder None, wenn keiner aussteht"""
+        now = time.monotonic()
+        pending = [retry_at for retry_at in self._retry_at.values() if retry_at > now]
+        return min(pending) - now if pending else None
+
+    async def _fill_one(self):
+        """Erstellt einen Kanal für den ersten Server mit zu kleinem Pool; False, wenn alle voll sind
+
+        Server in der Wartezeit nach einem Fehlschlag werden übersprungen.
+        """
+        now = time.monotonic()
+        for guild_id, settings in list(self.bot.talk_settings.items()):
+            if self.available(guild_id) >= self.size:
+                self._failures.pop(guild_id, None)
+                self._retry_at.pop(guild_id, None)
+                continue
+            if self._retry_at.get(guild_id, 0) > now:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            # Auffüllen ist Hintergrundarbeit und läuft mit Aufräum-Priorität
+            try:
+                channel = await self.bot.rest.submit(
+                    PRIORITY_CLEANUP, "create",
+                    lambda: guild.create_voice_channel(
+                        name=TALK_POOL_NAME,
+                        category=settings["category"],
+                        overwrites=self._hidden_overwrites(guild),
+                        reason="Talk-Pool auffüllen"
+                    ),
+                    guild_id=guild.id
+                )
+            except Exception as e:
+                delay = self._backoff(guild_id)
+                logger.error(f"Fehler beim Auffüllen des Talk-Pools auf {guild.name} (neuer Versuch in {delay:.0f}s): {e}")
+                continue
+            self._failures.pop(guild_id, None)
+            self._retry_at.pop(guild_id, None)
+            self.adopt(channel)
+            return True
+        return False
+
+    async def _run(self):
+        while True:
+            try:
+                if await self._fill_one():
+                    await asyncio.sleep(self.refill_interval)
+                    continue
+                self._wakeup.clear()
+                # Ohne ausstehende Wiederholung bis zum nächsten Auffüllwunsch schlafen
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_retry())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Fehler beim Auffüllen des Talk-Pools: {e}")
+                await asyncio.sleep(self.refill_interval)
+
+# Zugriffsschutz für Talks mit Passwort: "kick" (Standard, nachträglich entfernen) oder
+# "overwrites" (Discord verweigert das Verbinden, bis der Bot eine Berechtigung vergibt)
+TALK_ACCESS_MODE = os.getenv("TALK_ACCESS_MODE", "kick").lower()
+
+class TalkAccessControl:
+    """Kanalberechtigungen für passwortgeschützte Talks im Modus "overwrites".
+
+    Geschützte Talks entstehen mit verweigertem Verbinden für @everyone. Autorisierte
+    Benutzer erhalten eine eigene Berechtigung; dazu wird der Kanal mit den autorisierten
+    Benutzern aus dem Register abgeglichen. Aufträge pro Kanal laufen über den REST-Planer
+    mit gemeinsamem Schlüssel, sodass mehrere Autorisierungen in einer Bearbeitung landen.
+    """
+
+    def __init__(self, bot, mode=TALK_ACCESS_MODE):
+        self.bot = bot
+        self.mode = mode
+        self.edits = 0
+        self.granted = 0
+
+    @property
+    def enabled(self):
+        return self.mode == "overwrites"
+
+    def creation_overwrites(self, guild, category, creator):
+        """Berechtigungen für einen neuen geschützten Talk (Kategorie-Berechtigungen plus Sperre)"""
+        overwrites = dict(category.overwrites) if category is not None else {}
+        everyone = overwrites.get(guild.default_role, discord.PermissionOverwrite())
+        everyone.connect = False
+        overwrites[guild.default_role] = everyone
+        # Der Bot muss weiterhin verbinden und verschieben dürfen
+        me = overwrites.get(guild.me, discord.PermissionOverwrite())
+        me.update(view_channel=True, connect=True, move_members=True)
+        overwrites[guild.me] = me
+        overwrites[creator] = discord.PermissionOverwrite(connect=True)
+        return overwrites
+
+    def needs_lock(self, channel):
+        """True, wenn ein geschützter Talk (noch) ohne Sperre für @everyone ist"""
+        overwrite = channel.overwrites_for(channel.guild.default_role)
+        return overwrite.connect is not False
+
+    async def grant(self, channel):
+        """Gibt allen autorisierten Benutzern des Talks das Recht zu verbinden"""
+        if not self.enabled:
+            return
+        await self.bot.rest.submit(
+            PRIORITY_MOVE, "edit", lambda: self._sync(channel),
+            guild_id=channel.guild.id, key=("overwrites", channel.id)
+        )
+
+    async def _sync(self, channel):
+        # Bearbeitungen eines Kanals nacheinander, damit keine ältere Liste eine neuere überschreibt
+        async with self.bot.talk_locks.hold(("overwrites", channel.id)):
+            await self._sync_locked(channel)
+
+    async def _sync_locked(self, channel):
+        record = self.bot.talks.get(channel.id)
+        if record is None or not record.password_protected:
+            return
+        overwrites = dict(channel.overwrites)
+        allowed = {target.id for target, overwrite in overwrites.items() if overwrite.connect}
+        missing = ({record.creator_id} | record.authorized) - allowed - {None}
+        lock = self.needs_lock(channel)
+        if not missing and not lock:
+            return
+        if lock:
+            everyone = overwrites.get(channel.guild.default_role, discord.PermissionOverwrite())
+            everyone.connect = False
+            overwrites[channel.guild.default_role] = everyone
+            me = overwrites.get(channel.guild.me, discord.PermissionOverwrite())
+            me.update(view_channel=True, connect=True, move_members=True)
+            overwrites[channel.guild.me] = me
+        for user_id in missing:
+            overwrites[discord.Object(id=user_id, type=discord.Member)] = discord.PermissionOverwrite(connect=True)
+        await channel.edit(overwrites=overwrites, reason="Talk-Berechtigungen aktualisiert")
+        self.edits += 1
+        self.granted += len(missing)
+
+    def ensure(self, channel):
+        """Sperrt geschützte Talks aus der Zeit vor dem Moduswechsel im Hintergrund"""
+        if self.enabled and self.needs_lock(channel):
+            asyncio.get_running_loop().create_task(self._ensure(channel))
+
+    async def _ensure(self, channel):
+        try:
+            await self.grant(channel)
+        except Exception as e:
+            logger.error(f"Fehler beim Sperren des Talks {channel.name}: {e}")
+
+# Grenzen für neue Talks (0 = unbegrenzt); pro Server per /talk_system_einrichten überschreibbar
+TALK_QUOTA_USER = int(os.getenv("TALK_QUOTA_USER", 2))
+TALK_QUOTA_GUILD = int(os.getenv("TALK_QUOTA_GUILD", 100))
+TALK_CREATE_QUEUE = int(os.getenv("TALK_CREATE_QUEUE", 20))
+# Wartende Erstellungen über alle Server dieses Prozesses
+TALK_CREATE_QUEUE_GLOBAL = int(os.getenv("TALK_CREATE_QUEUE_GLOBAL", 100))
+# Sekunden zwischen zwei Aktualisierungen der Warteposition
+TALK_QUEUE_PROGRESS_INTERVAL = float(os.getenv("TALK_QUEUE_PROGRESS_INTERVAL", 2))
+
+class TalkLimits:
+    """Kontingente und Warteschlangengröße eines Servers"""
+    __slots__ = ("user_quota", "guild_quota", "queue_size")
+
+    def __init__(self, user_quota, guild_quota, queue_size):
+        self.user_quota = user_quota
+        self.guild_quota = guild_quota
+        self.queue_size = queue_size
+
+class CreationTicket:
+    """Platz einer zugelassenen Talk-Erstellung in der Warteschlange ihres Servers"""
+    __slots__ = ("guild_id", "user_id")
+
+    def __init__(self, guild_id, user_id):
+        self.guild_id = guild_id
+        self.user_id = user_id
+
+class TalkAdmission:
+    """Zulassung neuer Talks bei Ansturm: Kontingente pro Benutzer und Server und eine begrenzte Warteschlange.
+
+    Geprüft wird schon beim Klick auf „Talk erstellen“, damit niemand ein Formular
+    ausfüllt, das ohnehin abgelehnt würde, und erneut beim Absenden. Zugelassene
+    Erstellungen stehen pro Server in einer FIFO-Warteschlange, bis der Kanal erstellt
+    ist; wartende Erstellungen zählen bereits zu den Kontingenten. Ist die Warteschlange
+    des Servers oder die globale voll, wird sofort abgelehnt statt ins Rate-Limit zu laufen.
+    """
+
+    def __init__(self, bot, user_quota=TALK_QUOTA_USER, guild_quota=TALK_QUOTA_GUILD,
+                 queue_size=TALK_CREATE_QUEUE, global_size=TALK_CREATE_QUEUE_GLOBAL):
+        self.bot = bot
+        self.defaults = TalkLimits(user_quota, guild_quota, queue_size)
+        self.global_size = global_size
+        self.overrides = {}  # {guild_id: TalkLimits}
+        self.queues = {}     # {guild_id: deque[CreationTicket]}
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = collections.Counter()  # {"user" | "guild" | "queue": anzahl}
+
+    def limits(self, guild_id):
+        return self.overrides.get(guild_id, self.defaults)
+
+    def configure(self, guild_id, user_quota=None, guild_quota=None, queue_size=None):
+        """Setzt die Grenzen eines Servers und speichert sie; None behält den bisherigen Wert"""
+        current = self.limits(guild_id)
+        limits = TalkLimits(
+            current.user_quota if user_quota is None else user_quota,
+            current.guild_quota if guild_quota is None else guild_quota,
+            current.queue_size if queue_size is None else queue_size,
+        )
+        self.overrides[guild_id] = limits
+        self.bot.store.save_limits(guild_id, limits.user_quota, limits.guild_quota, limits.queue_size)
+        return limits
+
+    def check(self, guild_id, user_id):
+        """Gibt den Ablehnungsgrund ("queue", "user", "guild") zurück oder None"""
+        limits = self.limits(guild_id)
+        pending = self.queues.get(guild_id, ())
+        # Volle Warteschlange zuerst: billigster Test, greift gerade beim Ansturm
+        if (limits.queue_size and len(pending) >= limits.queue_size) or (self.global_size and self.queued >= self.global_size):
+            return "queue"
+        if limits.user_quota or limits.guild_quota:
+            talks = self.bot.talks.for_guild(guild_id)
+            if limits.user_quota:
+                owned = sum(1 for record in talks if record.creator_id == user_id)
+                owned += sum(1 for ticket in pending if ticket.user_id == user_id)
+                if owned >= limits.user_quota:
+                    return "user"
+            if limits.guild_quota and len(talks) + len(pending) >= limits.guild_quota:
+                return "guild"
+        return None
+
+    def reject(self, guild_id, user_id):
+        """Wie check(), zählt aber die Ablehnung"""
+        reason = self.check(guild_id, user_id)
+        if reason is not None:
+            self.rejected[reason] += 1
+        return reason
+
+    def admit(self, guild_id, user_id):
+        """Reiht eine Erstellung ein; gibt (Ticket, None) oder (None, Ablehnungsgrund) zurück"""
+        reason = self.reject(guild_id, user_id)
+        if reason is not None:
+            return None, reason
+        ticket = CreationTicket(guild_id, user_id)
+        self.queues.setdefault(guild_id, collections.deque()).append(ticket)
+        self.queued += 1
+        self.admitted += 1
+        return ticket, None
+
+    def position(self, ticket):
+        """1 = wird gerade erstellt; 0 = nicht (mehr) in der Warteschlange"""
+        pending = self.queues.get(ticket.guild_id)
+        if not pending:
+            return 0
+        try:
+            return pending.index(ticket) + 1
+        except ValueError:
+            return 0
+
+    def estimate(self, position):
+        """Geschätzte Wartezeit in Sekunden anhand des Rate-Limits für neue Kanäle"""
+        rate, burst = self.bot.rest.route_limits["create"]
+        return max(0, position - burst) / rate
+
+    def release(self, ticket):
+        pending = self.queues.get(ticket.guild_id)
+        if pending is None or ticket not in pending:
+            return
+        pending.remove(ticket)
+        self.queued -= 1
+        if not pending:
+            del self.queues[ticket.guild_id]
+
+# Zeitfenster in Sekunden, in dem Voice-Events pro (Benutzer, Kanal) zusammengefasst werden
+VOICE_EVENT_WINDOW = float(os.getenv("VOICE_EVENT_WINDOW", 2))
+# Sekunden, in denen dieselbe Passwort-Abfrage nicht erneut gesendet wird
+PASSWORD_PROMPT_TTL = float(os.getenv("PASSWORD_PROMPT_TTL", 60))
+
+class TTLCache:
+    """Menge von Schlüsseln, die nach ttl Sekunden verfallen"""
+
+    def __init__(self, ttl, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._expires = collections.OrderedDict()  # {key: Ablaufzeit}, älteste zuerst
+
+    def add(self, key):
+        """Merkt sich den Schlüssel; gibt False zurück, wenn er noch gültig vorhanden war"""
+        now = time.monotonic()
+        while self._expires:
+            oldest, expires = next(iter(self._expires.items()))
+            if expires > now and len(self._expires) < self.maxsize:
+                break
+            del self._expires[oldest]
+        if key in self._expires:
+            return False
+        self._expires[key] = now + self.ttl
+        return True
+
+    def discard(self, key):
+        self._expires.pop(key, None)
+
+    def __len__(self):
+        return len(self._expires)
+
+class VoiceEventCoalescer:
+    """Fasst schnelle Folgen von Voice-Events pro (Benutzer, Kanal) zusammen.
+
+    Das erste Event löst die Entscheidung sofort aus. Weitere Events für denselben
+    Schlüssel innerhalb des Zeitfensters werden nur gezählt; gab es welche, wird die
+    Entscheidung am Ende des Fensters einmal mit dem dann aktuellen Zustand wiederholt.
+    """
+
+    def __init__(self, window=VOICE_EVENT_WINDOW, prompt_ttl=PASSWORD_PROMPT_TTL):
+        self.window = window
+        self.prompts = TTLCache(prompt_ttl)
+        self._active = {}  # {key: [unterdrückte Events, Task]}
+        self.suppressed = 0
+        self.ignored = 0
+        self.prompts_suppressed = 0
+
+    def submit(self, key, decide):
+        """Plant decide() für key ein, ohne den Aufrufer warten zu lassen"""
+        state = self._active.get(key)
+        if state is not None:
+            state[0] += 1
+            self.suppressed += 1
+            return
+        state = self._active[key] = [0, None]
+        state[1] = asyncio.get_running_loop().create_task(self._run(key, state, decide))
+
+    async def _run(self, key, state, decide):
+        try:
+            while True:
+                try:
+                    await decide()
+                except Exception as e:
+                    logger.error(f"Fehler bei der Verarbeitung eines Voice-Events: {e}")
+                await asyncio.sleep(self.window)
+                if not state[0]:
+                    return
+                state[0] = 0
+        finally:
+            self._active.pop(key, None)
+
+    def tasks(self):
+        """Laufende Entscheidungen (zum Abwarten beim Herunterfahren)"""
+        return [state[1] for state in self._active.values() if state[1] is not None]
+
+    def should_prompt(self, user_id, channel_id):
+        """True, wenn die Passwort-Abfrage gesendet werden soll (nicht innerhalb der TTL bereits gesendet)"""
+        if self.prompts.add((user_id, channel_id)):
+            return True
+        self.prompts_suppressed += 1
+        return False
+
+    def stats(self):
+        return {
+            "pending": len(self._active),
+            "suppressed": self.suppressed,
+            "ignored": self.ignored,
+            "prompts_suppressed": self.prompts_suppressed,
+        }
+
+# Kostenparameter für scrypt (N muss eine Zweierpotenz sein; Speicherbedarf etwa 128 * N * r Bytes)
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", 2 ** 14))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", 8))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", 1))
+# Threads für das Hashen und Prüfen von Passwörtern
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+# Höchstens so viele Passwortversuche pro (Benutzer, Talk) innerhalb des Zeitfensters (Sekunden)
+PASSWORD_MAX_ATTEMPTS = int(os.getenv("PASSWORD_MAX_ATTEMPTS", 5))
+PASSWORD_ATTEMPT_WINDOW = float(os.getenv("PASSWORD_ATTEMPT_WINDOW", 60))
+PASSWORD_HASH_PREFIX = "scrypt$"
+
+def hash_password(password, n=PASSWORD_SCRYPT_N, r=PASSWORD_SCRYPT_R, p=PASSWORD_SCRYPT_P, salt=None):
+    """Gibt 'scrypt$N$r$p$salz$hash' zurück (blockierend, im Executor ausführen)"""
+    salt = salt if salt is not None else secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=128 * r * (n + p + 2) + 1024 * 1024, dklen=32)
+    return f"{PASSWORD_HASH_PREFIX}{n}${r}${p}${salt.hex()}${digest.hex()}"
+
+def is_password_hash(stored):
+    return stored is not None and stored.startswith(PASSWORD_HASH_PREFIX)
+
+def verify_password(stored, password):
+    """Prüft ein Passwort; gibt (korrekt, neu_hashen) zurück (blockierend, im Executor ausführen).
+
+    Klartext aus älteren Versionen wird weiterhin akzeptiert und soll danach gehasht werden,
+    ebenso Hashes mit veralteten Kostenparametern.
+    """
+    if not is_password_hash(stored):
+        return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8")), True
+    try:
+        n, r, p, salt, digest = stored[len(PASSWORD_HASH_PREFIX):].split("$")
+        n, r, p = int(n), int(r), int(p)
+        expected = hash_password(password, n, r, p, bytes.fromhex(salt))
+    except ValueError:
+        logger.error("Ungültiger Passwort-Hash gespeichert")
+        return False, False
+    outdated = (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return hmac.compare_digest(expected, stored), outdated
+
+class PasswordHasher:
+    """Hasht und prüft Passwörter in einem begrenzten Thread-Pool, damit scrypt die Event-Loop nicht blockiert"""
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, metrics=None):
+        self.metrics = metrics
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+
+    async def _run(self, operation, func, *args):
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("talkbot_password_seconds", time.perf_counter() - started, op=operation)
+
+    async def hash(self, password):
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, stored, password):
+        return await self._run("verify", verify_password, stored, password)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+class AttemptThrottle:
+    """Begrenzt Versuche pro Schlüssel auf max_attempts innerhalb eines gleitenden Zeitfensters"""
+
+    def __init__(self, max_attempts=PASSWORD_MAX_ATTEMPTS, window=PASSWORD_ATTEMPT_WINDOW, maxsize=10000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.maxsize = maxsize
+        self._attempts = {}  # {key: deque[Zeitpunkte]}
+        self.throttled = 0
+
+    def _prune(self, now):
+        cutoff = now - self.window
+        for key in [key for key, attempts in self._attempts.items() if attempts[-1] <= cutoff]:
+            del self._attempts[key]
+
+    def hit(self, key):
+        """Zählt einen Versuch; gibt 0 oder die Wartezeit in Sekunden zurück, wenn das Limit erreicht ist"""
+        now = time.monotonic()
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            if len(self._attempts) >= self.maxsize:
+                self._prune(now)
+            attempts = self._attempts[key] = collections.deque()
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if len(attempts) >= self.max_attempts:
+            self.throttled += 1
+            return attempts[0] + self.window - now
+        attempts.append(now)
+        return 0
+
+    def reset(self, key):
+        self._attempts.pop(key, None)
+
+    def __len__(self):
+        return len(self._attempts)
+
+# Persistenz: "memory" (Standard) oder "sqlite"
+TALK_STORE = os.getenv("TALK_STORE", "memory").lower()
+TALK_DB_PATH = os.getenv("TALK_DB_PATH", os.path.join(os.getcwd(), "talks.db"))
+
+class MemoryTalkStore:
+    """Speicher ohne Persistenz; hält die Daten nur für die Laufzeit des Prozesses.
+
+    Definiert gleichzeitig die Schnittstelle, die jede Speicher-Implementierung anbietet.
+    Alle Schreibmethoden sind synchron und dürfen die Event-Loop nicht blockieren.
+    """
+
+    def __init__(self):
+        self.settings = {}    # {guild_id: (category_id, channel_id)}
+        self.talks = {}       # {channel_id: (guild_id, creator_id, password, name)}
+        self.authorized = {}  # {channel_id: {user_id, ...}}
+        self.limits = {}      # {guild_id: (user_quota, guild_quota, queue_size)}
+
+    def start(self):
+        pass
+
+    def load(self):
+        """Gibt (settings, talks, authorized, limits) zurück"""
+        return (
+            dict(self.settings),
+            dict(self.talks),
+            {channel_id: set(users) for channel_id, users in self.authorized.items()},
+            dict(self.limits),
+        )
+
+    def save_settings(self, guild_id, category_id, channel_id):
+        self.settings[guild_id] = (category_id, channel_id)
+
+    def save_limits(self, guild_id, user_quota, guild_quota, queue_size):
+        self.limits[guild_id] = (user_quota, guild_quota, queue_size)
+
+    def save_talk(self, channel_id, guild_id, creator_id, password, name):
+        self.talks[channel_id] = (guild_id, creator_id, password, name)
+
+    def add_authorized(self, channel_id, user_id):
+        self.authorized.setdefault(channel_id, set()).add(user_id)
+
+    def delete_talk(self, channel_id):
+        self.talks.pop(channel_id, None)
+        self.authorized.pop(channel_id, None)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class SQLiteTalkStore(MemoryTalkStore):
+    """SQLite-Speicher (WAL) mit Write-Behind.
+
+    Änderungen landen in einer Queue und werden von einem Hintergrund-Thread
+    gesammelt in einer Transaktion geschrieben, damit Voice-Events nie auf die
+    Festplatte warten. Beim Start wird jede Tabelle mit einer einzigen Abfrage gelesen.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS settings ("
+        " guild_id INTEGER PRIMARY KEY, category_id INTEGER NOT NULL, channel_id INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS talks ("
+        " channel_id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, creator_id INTEGER NOT NULL,"
+        " password TEXT, name TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS authorized ("
+        " channel_id INTEGER NOT NULL, user_id INTEGER NOT NULL,"
+        " PRIMARY KEY (channel_id, user_id)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS limits ("
+        " guild_id INTEGER PRIMARY KEY, user_quota INTEGER NOT NULL, guild_quota INTEGER NOT NULL, queue_size INTEGER NOT NULL)",
+    )
+
+    STATEMENTS = {
+        "settings": "INSERT OR REPLACE INTO settings VALUES (?, ?, ?)",
+        "limits": "INSERT OR REPLACE INTO limits VALUES (?, ?, ?, ?)",
+        "talk": "INSERT OR REPLACE INTO talks VALUES (?, ?, ?, ?, ?)",
+        "auth": "INSERT OR IGNORE INTO authorized VALUES (?, ?)",
+        "delete_talk": "DELETE FROM talks WHERE channel_id = ?",
+        "delete_auth": "DELETE FROM authorized WHERE channel_id = ?",
+    }
+
+    def __init__(self, path, flush_interval=1.0, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._closed = False
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Im Cluster-Betrieb schreiben mehrere Prozesse in dieselbe Datenbank
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._conn:
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="talk-store-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def load(self):
+        settings = {row[0]: (row[1], row[2]) for row in self._conn.execute("SELECT * FROM settings")}
+        talks = {row[0]: row[1:] for row in self._conn.execute("SELECT * FROM talks")}
+        authorized = {}
+        for channel_id, user_id in self._conn.execute("SELECT channel_id, user_id FROM authorized"):
+            authorized.setdefault(channel_id, set()).add(user_id)
+        limits = {row[0]: row[1:] for row in self._conn.execute("SELECT * FROM limits")}
+        return settings, talks, authorized, limits
+
+    def save_settings(self, guild_id, category_id, channel_id):
+        self._queue.put(("settings", (guild_id, category_id, channel_id)))
+
+    def save_limits(self, guild_id, user_quota, guild_quota, queue_size):
+        self._queue.put(("limits", (guild_id, user_quota, guild_quota, queue_size)))
+
+    def save_talk(self, channel_id, guild_id, creator_id, password, name):
+        self._queue.put(("talk", (channel_id, guild_id, creator_id, password, name)))
+
+    def add_authorized(self, channel_id, user_id):
+        self._queue.put(("auth", (channel_id, user_id)))
+
+    def delete_talk(self, channel_id):
+        self._queue.put(("delete_talk", (channel_id,)))
+        self._queue.put(("delete_auth", (channel_id,)))
+
+    def _drain(self, first=None):
+        ops = [] if first is None else [first]
+        while len(ops) < self.batch_size:
+            try:
+                ops.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return ops
+
+    def _write(self, ops):
+        # Aufeinanderfolgende gleichartige Änderungen mit executemany schreiben, Reihenfolge bleibt erhalten
+        try:
+            with self._conn:
+                for kind, group in itertools.groupby(ops, key=lambda op: op[0]):
+                    self._conn.executemany(self.STATEMENTS[kind], [args for _, args in group])
+        except Exception as e:
+            logger.error(f"Fehler beim Schreiben in die Datenbank: {e}")
+
+    def _writer(self):
+        while True:
+            op = self._queue.get()
+            if op is None:
+                self._commit(self._drain())
+                break
+            # Kurz sammeln, damit Bursts in einer Transaktion landen; flush() wartet nicht
+            if op[0] != "flush":
+                time.sleep(self.flush_interval)
+            ops = self._drain(op)
+            stop = None in ops
+            self._commit([o for o in ops if o is not None])
+            if stop:
+                break
+
+    def _commit(self, ops):
+        """Schreibt einen Block und meldet wartenden flush()-Aufrufen, dass alles davor gespeichert ist"""
+        self._write([op for op in ops if op[0] != "flush"])
+        for kind, args in ops:
+            if kind == "flush":
+                args.set()
+
+    def flush(self):
+        """Wartet, bis alle bisher eingereihten Änderungen geschrieben sind (blockierend).
+
+        Solange der Writer-Thread läuft, schreibt nur er; flush() reiht eine Marke ein
+        und wartet auf deren Bestätigung, damit kein späterer Commit einen früheren überholt.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put(("flush", done))
+            while not done.wait(0.1):
+                if not self._thread.is_alive():
+                    break  # Writer hat sich inzwischen beendet; Rest unten selbst schreiben
+            else:
+                return
+        ops = self._drain()
+        while ops:
+            self._commit([o for o in ops if o is not None])
+            ops = self._drain()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self.flush()
+        self._conn.close()
+
+# Aufzeichnung der Gateway-Events zum Nachspielen (benchmarks/replay.py); standardmäßig aus
+EVENT_JOURNAL = os.getenv("EVENT_JOURNAL", "0").lower() in ("1", "true", "yes", "ja")
+EVENT_JOURNAL_DIR = os.getenv("EVENT_JOURNAL_DIR", os.path.join(os.getcwd(), "journals"))
+
+def _journal_voice_state(data):
+    return {"guild_id": data.get("guild_id"), "channel_id": data.get("channel_id"), "user_id": data.get("user_id")}
+
+def _journal_interaction(data):
+    # Formulareingaben (Typ 5, z. B. Passwörter) werden nie aufgezeichnet, nur ihre Wirkung per note()
+    if data.get("type") not in (2, 3, 4):
+        return None
+    user = data.get("member", {}).get("user") or data.get("user") or {}
+    raw = data.get("data", {})
+    if data["type"] == 3:
+        payload = {"custom_id": raw.get("custom_id")}
+    else:
+        payload = {"name": raw.get("name"), "options": [
+            {key: option.get(key) for key in ("name", "type", "value", "focused") if key in option}
+            for option in raw.get("options", ())
+        ]}
+    return {"type": data["type"], "guild_id": data.get("guild_id"), "user_id": user.get("id"), "data": payload}
+
+def _journal_channel(data):
+    return {key: data.get(key) for key in ("id", "guild_id", "type", "name", "parent_id")}
+
+class EventJournal:
+    """Schreibt ausgewählte Gateway-Events als komprimiertes, fortlaufendes JSON-Lines-Journal.
+
+    Jede Zeile ist [Millisekunden seit Start, Event, Daten]. In der Event-Loop wird nur
+    ein kleines Dict mit den benötigten Feldern gebaut und in eine Queue gelegt;
+    Serialisieren und gzip übernimmt ein Hintergrund-Thread. Nach jedem Schwall wird
+    mit Z_SYNC_FLUSH geschrieben, sodass das Journal auch nach einem Absturz bis dahin lesbar ist.
+    Am Anfang steht ein Schnappschuss der Talks, damit benchmarks/replay.py denselben Zustand aufbauen kann.
+    """
+
+    VERSION = 1
+    EVENTS = {
+        "VOICE_STATE_UPDATE": _journal_voice_state,
+        "INTERACTION_CREATE": _journal_interaction,
+        "CHANNEL_CREATE": _journal_channel,
+        "CHANNEL_UPDATE": _journal_channel,
+        "CHANNEL_DELETE": _journal_channel,
+    }
+
+    def __init__(self, directory=EVENT_JOURNAL_DIR, enabled=EVENT_JOURNAL, label=""):
+        self.directory = directory
+        self.enabled = enabled
+        self.label = label
+        self.path = None
+        self.recorded = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._started = None
+
+    def install(self, bot):
+        """Schaltet sich vor die Parser von discord.py und schreibt den Schnappschuss (einmalig)"""
+        if not self.enabled or self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}{self.label}.jsonl.gz")
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._writer, name="event-journal-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+        self.note("JOURNAL", version=self.VERSION, started=datetime.now().isoformat(timespec="seconds"), delete_delay=TALK_DELETE_DELAY)
+        self._snapshot(bot)
+        parsers = bot._connection.parsers
+        for event, extract in self.EVENTS.items():
+            parsers[event] = self._wrap(event, extract, parsers[event])
+        logger.info(f"Gateway-Events werden aufgezeichnet in {self.path}")
+
+    def _wrap(self, event, extract, parser):
+        put = self._queue.put
+        started = self._started
+
+        def record(data):
+            payload = extract(data)
+            if payload is not None:
+                put(((time.perf_counter() - started) * 1000, event, payload))
+            parser(data)
+        return record
+
+    def _snapshot(self, bot):
+        for guild_id, settings in bot.talk_settings.items():
+            self.note("SNAPSHOT_GUILD", guild_id=guild_id, category_id=settings["category"].id, channel_id=settings["channel"].id)
+        for record in bot.talks:
+            guild = bot.get_guild(record.guild_id)
+            channel = guild.get_channel(record.channel_id) if guild else None
+            self.note(
+                "SNAPSHOT_TALK", channel_id=record.channel_id, guild_id=record.guild_id, creator_id=record.creator_id,
+                protected=record.password_protected, name=record.name, authorized=sorted(record.authorized),
+                parent_id=channel.category_id if channel else None,
+                members=sorted(channel.voice_states) if channel else [],
+            )
+
+    def note(self, event, **payload):
+        """Zeichnet eine Zustandsänderung auf, die sich nicht aus den Gateway-Events ergibt (z. B. ein richtiges Passwort)"""
+        if self._thread is not None:
+            self._queue.put(((time.perf_counter() - self._started) * 1000, event, payload))
+
+    def _writer(self):
+        with gzip.open(self.path, "wb", compresslevel=6) as f:
+            while True:
+                entry = self._queue.get()
+                stop = False
+                while entry is not None:
+                    f.write(json.dumps([round(entry[0], 3), entry[1], entry[2]], separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n")
+                    self.recorded += 1
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                else:
+                    stop = True
+                f.flush(zlib.Z_SYNC_FLUSH)
+                if stop:
+                    break
+
+    def close(self):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        logger.info(f"{self.recorded} Einträge im Event-Journal {self.path}")
+
+# Auslastungsstatistik pro Server; OCCUPANCY_PATH bekommt im Cluster-Betrieb die Cluster-ID angehängt
+OCCUPANCY_PATH = os.getenv("OCCUPANCY_PATH", os.path.join(os.getcwd(), "occupancy.bin"))
+OCCUPANCY_SNAPSHOT_INTERVAL = float(os.getenv("OCCUPANCY_SNAPSHOT_INTERVAL", 300))
+# Sekunden zwischen zwei Durchläufen von Spitzenwert-Fortschreibung und Verdichtung
+OCCUPANCY_TICK_INTERVAL = 60
+# Größter Wert je array-Typcode; Zähler bleiben dort stehen statt überzulaufen
+OCCUPANCY_LIMITS = {"H": 0xFFFF, "I": 0xFFFFFFFF}
+
+class OccupancyRing:
+    """Ringpuffer fester Größe mit einem Bucket pro `resolution` Sekunden.
+
+    Jedes Feld ist ein eigenes array; ein Slot gehört zu dem Bucket, dessen Nummer in
+    `stamps` steht, und wird beim ersten Schreiben in einen neuen Bucket geleert.
+    """
+
+    # Feld -> array-Typcode; "peak" ist ein Maximum, alle anderen Felder sind Summen
+    FIELDS = {
+        "peak": "H",       # gleichzeitige Talks
+        "joins": "I",      # Beitritte zu Talks
+        "leaves": "I",     # Verlassen von Talks
+        "created": "H",    # erstellte Talks
+        "ended": "H",      # gelöschte Talks
+        "lifetime": "I",   # Summe der Lebensdauer beendeter Talks mit bekanntem Start (Sekunden)
+        "timed": "H",      # Anzahl dieser Talks
+    }
+
+    __slots__ = ("resolution", "slots", "stamps") + tuple(FIELDS)
+
+    def __init__(self, resolution, slots):
+        self.resolution = resolution
+        self.slots = slots
+        self.stamps = array.array("I", bytes(4 * slots))
+        for field, typecode in self.FIELDS.items():
+            setattr(self, field, array.array(typecode, bytes(array.array(typecode).itemsize * slots)))
+
+    def _slot(self, bucket):
+        slot = bucket % self.slots
+        if self.stamps[slot] != bucket:
+            self.stamps[slot] = bucket
+            for field in self.FIELDS:
+                getattr(self, field)[slot] = 0
+        return slot
+
+    def add(self, now, field, amount=1):
+        values = getattr(self, field)
+        slot = self._slot(int(now // self.resolution))
+        values[slot] = min(values[slot] + amount, OCCUPANCY_LIMITS[values.typecode])
+
+    def observe(self, now, talks):
+        slot = self._slot(int(now // self.resolution))
+        self.peak[slot] = max(self.peak[slot], min(talks, OCCUPANCY_LIMITS["H"]))
+
+    def merge(self, other, slot, now):
+        """Überträgt einen Slot eines feineren Rings in den Bucket dieses Rings, zu dem `now` gehört"""
+        target = self._slot(int(now // self.resolution))
+        for field in self.FIELDS:
+            values = getattr(self, field)
+            value = getattr(other, field)[slot]
+            if field == "peak":
+                values[target] = max(values[target], value)
+            else:
+                values[target] = min(values[target] + value, OCCUPANCY_LIMITS[values.typecode])
+
+    def buckets(self, first, last):
+        """Slots der Buckets first..last, die tatsächlich Daten enthalten"""
+        first = max(first, last - self.slots + 1)
+        stamps = self.stamps
+        for bucket in range(first, last + 1):
+            slot = bucket % self.slots
+            if stamps[slot] == bucket:
+                yield bucket, slot
+
+    def arrays(self):
+        return [self.stamps] + [getattr(self, field) for field in self.FIELDS]
+
+class GuildOccupancy:
+    """Zwei Auflösungsstufen eines Servers: 5-Minuten-Buckets für 24 Stunden, Stunden-Buckets für 30 Tage"""
+
+    TIERS = ((300, 288), (3600, 720))
+
+    __slots__ = ("fine", "coarse", "merged")
+
+    def __init__(self):
+        self.fine = OccupancyRing(*self.TIERS[0])
+        self.coarse = OccupancyRing(*self.TIERS[1])
+        self.merged = 0  # letzter in die Stunden-Buckets übertragene 5-Minuten-Bucket
+
+    def downsample(self, now):
+        """Überträgt abgeschlossene 5-Minuten-Buckets in die Stunden-Buckets"""
+        current = int(now // self.fine.resolution)
+        for bucket, slot in self.fine.buckets(self.merged + 1, current - 1):
+            self.coarse.merge(self.fine, slot, bucket * self.fine.resolution)
+        self.merged = current - 1
+
+    def rings(self):
+        return (self.fine, self.coarse)
+
+class TalkOccupancy:
+    """Auslastung der Talks pro Server als Zeitreihe mit festem Speicherbedarf.
+
+    Der Voice-Handler zählt Beitritte und Verlassen, Erstellen und Löschen zählen
+    Talks und ihre Lebensdauer. Ein Hintergrundtask schreibt einmal pro Minute die
+    aktuelle Talk-Zahl als Spitzenwert fort, verdichtet abgeschlossene 5-Minuten-Buckets
+    zu Stunden-Buckets und sichert alle OCCUPANCY_SNAPSHOT_INTERVAL Sekunden die Arrays
+    auf die Festplatte. Abfragen summieren nur Buckets, nie einzelne Ereignisse.
+    Puffer entstehen erst bei der ersten Talk-Aktivität eines Servers (ca. 24 KiB).
+    """
+
+    VERSION = 1
+
+    def __init__(self, bot, path=OCCUPANCY_PATH, snapshot_interval=OCCUPANCY_SNAPSHOT_INTERVAL, clock=time.time):
+        self.bot = bot
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.clock = clock
+        self.guilds = {}  # {guild_id: GuildOccupancy}
+        self.opened = {}  # {channel_id: Erstellungszeitpunkt} für Talks, deren Erstellung beobachtet wurde
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _series(self, guild_id):
+        series = self.guilds.get(guild_id)
+        if series is None:
+            series = self.guilds[guild_id] = GuildOccupancy()
+        return series
+
+    def joined(self, guild_id):
+        self._series(guild_id).fine.add(self.clock(), "joins")
+
+    def left(self, guild_id):
+        self._series(guild_id).fine.add(self.clock(), "leaves")
+
+    def talk_opened(self, guild_id, channel_id):
+        now = self.clock()
+        fine = self._series(guild_id).fine
+        fine.add(now, "created")
+        fine.observe(now, self.bot.talks.count(guild_id))
+        self.opened[channel_id] = now
+
+    def talk_closed(self, guild_id, channel_id):
+        now = self.clock()
+        fine = self._series(guild_id).fine
+        fine.add(now, "ended")
+        started = self.opened.pop(channel_id, None)
+        if started is not None:
+            fine.add(now, "lifetime", int(now - started))
+            fine.add(now, "timed")
+
+    def tick(self):
+        """Spitzenwerte ohne Ereignisse fortschreiben und abgeschlossene Buckets verdichten"""
+        now = self.clock()
+        counts = self.bot.talks.counts_by_guild()
+        for guild_id, count in counts.items():
+            self._series(guild_id).fine.observe(now, count)
+        for series in self.guilds.values():
+            series.downsample(now)
+
+    def summary(self, guild_id, window):
+        """Kennzahlen der letzten `window` Sekunden; None, wenn für den Server nichts aufgezeichnet ist"""
+        series = self.guilds.get(guild_id)
+        if series is None:
+            return None
+        now = self.clock()
+        fine, coarse = series.fine, series.coarse
+        totals = dict.fromkeys(OccupancyRing.FIELDS, 0)
+        peak_at = None
+        since = now
+
+        def collect(ring, first, last):
+            nonlocal peak_at, since
+            for bucket, slot in ring.buckets(first, last):
+                since = min(since, bucket * ring.resolution)
+                for field in OccupancyRing.FIELDS:
+                    value = getattr(ring, field)[slot]
+                    if field != "peak":
+                        totals[field] += value
+                    elif value > totals["peak"]:
+                        totals["peak"] = value
+                        peak_at = bucket * ring.resolution
+
+        current = int(now // fine.resolution)
+        if window <= fine.resolution * fine.slots:
+            collect(fine, int((now - window) // fine.resolution) + 1, current)
+            resolution = fine.resolution
+        else:
+            # Verdichtete Stunden plus die noch nicht übertragenen 5-Minuten-Buckets
+            collect(coarse, int((now - window) // coarse.resolution) + 1, int(series.merged * fine.resolution // coarse.resolution))
+            collect(fine, series.merged + 1, current)
+            resolution = coarse.resolution
+        # Raten nur über den Zeitraum, für den es Daten gibt (z. B. kurz nach der Einrichtung)
+        hours = max(min(window, now - since), fine.resolution) / 3600
+        return {
+            "talks": self.bot.talks.count(guild_id),
+            "peak": totals["peak"],
+            "peak_at": peak_at,
+            "created": totals["created"],
+            "ended": totals["ended"],
+            "avg_lifetime": totals["lifetime"] / totals["timed"] if totals["timed"] else None,
+            "joins_per_hour": totals["joins"] / hours,
+            "leaves_per_hour": totals["leaves"] / hours,
+            "resolution": resolution,
+        }
+
+    def memory_bytes(self):
+        return sum(
+            values.itemsize * len(values)
+            for series in self.guilds.values() for ring in series.rings() for values in ring.arrays()
+        )
+
+    def snapshot(self):
+        """Kopiert alle Arrays in ein Byte-Abbild; läuft in der Event-Loop und ist daher konsistent"""
+        header = {"version": self.VERSION, "tiers": GuildOccupancy.TIERS, "fields": list(OccupancyRing.FIELDS),
+                  "guilds": [[guild_id, series.merged] for guild_id, series in self.guilds.items()]}
+        chunks = [json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n"]
+        for series in self.guilds.values():
+            for ring in series.rings():
+                chunks.extend(values.tobytes() for values in ring.arrays())
+        return b"".join(chunks)
+
+    def write(self, data):
+        """Schreibt ein Abbild atomar (im Thread-Pool)"""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(temporary, self.path)
+
+    def load(self, owns_guild=lambda guild_id: True):
+        """Liest das letzte Abbild; ein Abbild mit anderem Aufbau wird verworfen"""
+        try:
+            with open(self.path, "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return 0
+        line, _, body = data.partition(b"\n")
+        header = json.loads(line)
+        if (header.get("version") != self.VERSION or header.get("fields") != list(OccupancyRing.FIELDS)
+                or [tuple(tier) for tier in header.get("tiers", ())] != list(GuildOccupancy.TIERS)):
+            logger.warning(f"Auslastungsstatistik {self.path} hat ein anderes Format und wird verworfen")
+            return 0
+        view = memoryview(body)
+        offset = 0
+        for guild_id, merged in header["guilds"]:
+            series = GuildOccupancy()
+            series.merged = merged
+            for ring in series.rings():
+                for values in ring.arrays():
+                    size = values.itemsize * len(values)
+                    values[:] = array.array(values.typecode, view[offset:offset + size].tobytes())
+                    offset += size
+            if owns_guild(guild_id):
+                self.guilds[guild_id] = series
+        return len(self.guilds)
+
+    async def save(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.write, self.snapshot())
+
+    async def _run(self):
+        last_snapshot = time.monotonic()
+        while True:
+            await asyncio.sleep(OCCUPANCY_TICK_INTERVAL)
+            try:
+                self.tick()
+                if time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    last_snapshot = time.monotonic()
+                    await self.save()
+            except Exception as e:
+                logger.error(f"Fehler bei der Auslastungsstatistik: {e}")
+
+# Präfixe, mit denen der Bot Talk-Kanäle benennt
+TALK_PREFIXES = ("🔒", "🎙️")
+
+def create_talk_store():
+    """Erstellt den in TALK_STORE konfigurierten Speicher"""
+    if TALK_STORE == "sqlite":
+        return SQLiteTalkStore(TALK_DB_PATH)
+    return MemoryTalkStore()
+
+def normalize_talk_name(name):
+    """Vereinheitlicht einen Talk-Namen für die Suche (ohne Präfix, Groß-/Kleinschreibung, Sonderzeichen)"""
+    name = unicodedata.normalize("NFKC", name).strip()
+    for prefix in TALK_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    return " ".join(re.findall(r"\w+", name.casefold()))
+
+class TalkNameIndex:
+    """Namensindex der Talks eines Servers.
+
+    Eine sortierte Liste der normalisierten Namen dient der Präfixsuche per bisect,
+    ein Token-Index findet Treffer auf Wortanfänge innerhalb des Namens.
+    """
+
+    def __init__(self):
+        self._names = {}    # {channel_id: (normalisierter Name, angezeigter Name)}
+        self._sorted = []   # [(normalisierter Name, channel_id)]
+        self._tokens = {}   # {token: {channel_id, ...}}
+        self._sorted_tokens = []
+        # Alle Namen aus _sorted, durch \n getrennt, für die Teilzeichenkettensuche per str.find;
+        # wird nach Änderungen erst bei der nächsten Suche neu aufgebaut
+        self._blob = None
+        self._offsets = []
+
+    def add(self, channel_id, name):
+        self.remove(channel_id)
+        self._blob = None
+        normalized = normalize_talk_name(name)
+        self._names[channel_id] = (normalized, name)
+        bisect.insort(self._sorted, (normalized, channel_id))
+        for token in set(normalized.split()):
+            if token not in self._tokens:
+                self._tokens[token] = set()
+                bisect.insort(self._sorted_tokens, token)
+            self._tokens[token].add(channel_id)
+
+    def remove(self, channel_id):
+        entry = self._names.pop(channel_id, None)
+        if entry is None:
+            return
+        self._blob = None
+        normalized = entry[0]
+        index = bisect.bisect_left(self._sorted, (normalized, channel_id))
+        if index < len(self._sorted) and self._sorted[index] == (normalized, channel_id):
+            del self._sorted[index]
+        for token in set(normalized.split()):
+            ids = self._tokens.get(token)
+            if ids is None:
+                continue
+            ids.discard(channel_id)
+            if not ids:
+                del self._tokens[token]
+                del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
 
-# Live-Konsolenausgabe
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logger.handlers = [console_handler]  # Entfernt doppelte Handler
+    def display_name(self, channel_id):
+        entry = self._names.get(channel_id)
+        return entry[1] if entry else None
 
-# Log-Ordner erstellen
-log_dir = os.path.join(os.getcwd(), 'logs')
-if not os.path.exists(log_dir):
-    try:
-        os.makedirs(log_dir)
-        logger.info(f"Log-Ordner erstellt: {log_dir}")
-    except Exception as e:
-        logger.error(f"Fehler beim Erstellen des Log-Ordners: {e}")
+    def __len__(self):
+        return len(self._names)
 
-# Log-Datei mit Startzeit initialisieren
-start_time = datetime.now()
-start_time_str = start_time.strftime('%Y-%m-%d, %H-%M-%S')
-log_file_name = f"{start_time_str} - .log"
-log_file_path = os.path.join(log_dir, log_file_name)
+    def _token_matches(self, prefix):
+        ids = set()
+        index = bisect.bisect_left(self._sorted_tokens, prefix)
+        while index < len(self._sorted_tokens) and self._sorted_tokens[index].startswith(prefix):
+            ids |= self._tokens[self._sorted_tokens[index]]
+            index += 1
+        return ids
 
-file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logger.addHandler(file_handler)
+    def _substring_matches(self, query):
+        """Kanal-IDs aller Namen, die query enthalten, in sortierter Reihenfolge"""
+        if self._blob is None:
+            self._offsets = []
+            position = 0
+            for normalized, _ in self._sorted:
+                self._offsets.append(position)
+                position += len(normalized) + 1
+            self._blob = "\n".join(normalized for normalized, _ in self._sorted)
+        blob, offsets = self._blob, self._offsets
+        position = blob.find(query)
+        while position != -1:
+            index = bisect.bisect_right(offsets, position) - 1
+            yield self._sorted[index][1]
+            # Weiter beim nächsten Namen, damit jeder Name höchstens einmal zählt
+            if index + 1 >= len(offsets):
+                return
+            position = blob.find(query, offsets[index + 1])
 
-# Funktion zum Umbenennen der Log-Datei beim Beenden
-def rename_log_file(signal_number=None, frame=None):
+    def search(self, query, limit=25):
+        """Gibt Kanal-IDs nach Relevanz sortiert zurück.
+
+        Reihenfolge: exakter Name, Namenspräfix, Wortanfänge, beliebige Teilzeichenkette.
+        """
+        query = normalize_talk_name(query)
+        if not query:
+            return [channel_id for _, channel_id in self._sorted[:limit]]
+
+        # Exakte Treffer stehen in der sortierten Liste vor den übrigen Präfixtreffern,
+        # daher kann die Suche abbrechen, sobald limit Treffer beisammen sind
+        exact, prefix = [], []
+        index = bisect.bisect_left(self._sorted, (query,))
+        while index < len(self._sorted) and len(exact) + len(prefix) < limit and self._sorted[index][0].startswith(query):
+            normalized, channel_id = self._sorted[index]
+            (exact if normalized == query else prefix).append(channel_id)
+            index += 1
+        results = exact + prefix
+        if len(results) >= limit:
+            return results[:limit]
+
+        seen = set(results)
+        candidates = None
+        for token in query.split():
+            ids = self._token_matches(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        if candidates:
+            results.extend(sorted((c for c in candidates if c not in seen), key=lambda c: self._names[c][0]))
+            if len(results) >= limit:
+                return results[:limit]
+            seen.update(candidates)
+
+        if "\n" in query:
+            return results
+        for channel_id in self._substring_matches(query):
+            if channel_id not in seen:
+                results.append(channel_id)
+                if len(results) >= limit:
+                    break
+        return results
+
+class TalkRecord:
+    """Gespeicherte Daten eines Talk-Kanals"""
+    __slots__ = ("channel_id", "guild_id", "creator_id", "password", "name", "authorized")
+
+    def __init__(self, channel_id, guild_id, creator_id, password, name, authorized=()):
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.creator_id = creator_id
+        self.password = password
+        self.name = name
+        self.authorized = set(authorized)
+
+    @property
+    def password_protected(self):
+        return self.password is not None
+
+    def is_authorized(self, user_id):
+        return user_id == self.creator_id or user_id in self.authorized
+
+class TalkRegistry:
+    """Alle Talks, nach Kanal-ID und zusätzlich pro Server indiziert"""
+
+    def __init__(self):
+        self._talks = {}     # {channel_id: TalkRecord}
+        self._by_guild = {}  # {guild_id: {channel_id: TalkRecord}}
+        self._names = {}     # {guild_id: TalkNameIndex}
+
+    def add(self, channel_id, guild_id, creator_id, password, name, authorized=()):
+        record = TalkRecord(channel_id, guild_id, creator_id, password, name, authorized)
+        self.remove(channel_id)
+        self._talks[channel_id] = record
+        self._by_guild.setdefault(guild_id, {})[channel_id] = record
+        self._names.setdefault(guild_id, TalkNameIndex()).add(channel_id, name)
+        return record
+
+    def remove(self, channel_id):
+        record = self._talks.pop(channel_id, None)
+        if record is not None:
+            guild_talks = self._by_guild.get(record.guild_id)
+            if guild_talks is not None:
+                guild_talks.pop(channel_id, None)
+                if not guild_talks:
+                    del self._by_guild[record.guild_id]
+            names = self._names.get(record.guild_id)
+            if names is not None:
+                names.remove(channel_id)
+                if not len(names):
+                    del self._names[record.guild_id]
+        return record
+
+    def rename(self, channel_id, name):
+        """Aktualisiert den Suchindex, wenn ein Talk-Kanal umbenannt wurde"""
+        record = self._talks.get(channel_id)
+        if record is not None:
+            self._names[record.guild_id].add(channel_id, name)
+
+    def search(self, guild_id, query, limit=25):
+        """Sucht Talks eines Servers nach Namen; gibt [(TalkRecord, aktueller Name)] zurück"""
+        names = self._names.get(guild_id)
+        if names is None:
+            return []
+        return [(self._talks[channel_id], names.display_name(channel_id)) for channel_id in names.search(query, limit)]
+
+    def get(self, channel_id):
+        return self._talks.get(channel_id)
+
+    def for_guild(self, guild_id):
+        """Talks eines Servers in Erstellungsreihenfolge"""
+        return list(self._by_guild.get(guild_id, {}).values())
+
+    def guild_ids(self):
+        return list(self._by_guild)
+
+    def counts_by_guild(self):
+        return {guild_id: len(talks) for guild_id, talks in self._by_guild.items()}
+
+    def count(self, guild_id):
+        return len(self._by_guild.get(guild_id, ()))
+
+    def authorize(self, channel_id, user_id):
+        """Autorisiert einen Benutzer; gibt True zurück, wenn er neu hinzugefügt wurde"""
+        record = self._talks.get(channel_id)
+        if record is None or user_id in record.authorized:
+            return False
+        record.authorized.add(user_id)
+        return True
+
+    def is_authorized(self, channel_id, user_id):
+        record = self._talks.get(channel_id)
+        return record is not None and record.is_authorized(user_id)
+
+    def __contains__(self, channel_id):
+        return channel_id in self._talks
+
+    def __len__(self):
+        return len(self._talks)
+
+    def __iter__(self):
+        return iter(list(self._talks.values()))
+
+# Talks pro Seite bei /talks_anzeigen (Discord erlaubt höchstens 25 Felder pro Embed)
+TALKS_PER_PAGE = 10
+
+class TalkListCache:
+    """Vorberechnete Talk-Übersichten pro Server für /talks_anzeigen.
+
+    Ein Schnappschuss enthält Name, Schutzstatus und Mitgliederzahl jedes Talks. Er wird
+    beim Erstellen, Löschen und Umbenennen sowie bei Beitritt und Verlassen verworfen und
+    erst bei der nächsten Abfrage neu aufgebaut. Die Zugriffsspalte hängt vom Benutzer ab
+    und wird nur für die angezeigte Seite berechnet.
+    """
+
+    def __init__(self, per_page=TALKS_PER_PAGE):
+        self.per_page = per_page
+        self._snapshots = {}  # {guild_id: [(channel_id, name, status, mitglieder)]}
+        self.hits = 0
+        self.builds = 0
+
+    def invalidate(self, guild_id):
+        self._snapshots.pop(guild_id, None)
+
+    def snapshot(self, guild, talks):
+        entries = self._snapshots.get(guild.id)
+        if entries is not None:
+            self.hits += 1
+            return entries
+        self.builds += 1
+        entries = []
+        for record in talks.for_guild(guild.id):
+            channel = guild.get_channel(record.channel_id)
+            if channel is None:
+                continue
+            status = "🔒 Passwortgeschützt" if record.password_protected else "🔓 Offen"
+            entries.append((record.channel_id, channel.name, status, len(channel.members)))
+        entries.sort(key=lambda entry: normalize_talk_name(entry[1]))
+        self._snapshots[guild.id] = entries
+        return entries
+
+    def page(self, guild, talks, page):
+        """Gibt (Einträge der Seite, Seite, Seitenanzahl, Talks insgesamt) zurück; die Seite wird begrenzt"""
+        entries = self.snapshot(guild, talks)
+        pages = max(1, -(-len(entries) // self.per_page))
+        page = min(max(page, 0), pages - 1)
+        start = page * self.per_page
+        return entries[start:start + self.per_page], page, pages, len(entries)
+
+# Schlanker Cache: keine Presences, keine vollständige Mitgliederliste, nur Mitglieder in Voice-Kanälen
+LEAN_CACHE = os.getenv("LEAN_CACHE", "0").lower() in ("1", "true", "yes", "ja")
+# Größe und Gültigkeit (Sekunden) des Caches für nachgeladene Mitglieder
+MEMBER_LRU_SIZE = int(os.getenv("MEMBER_LRU_SIZE", 256))
+MEMBER_LRU_TTL = float(os.getenv("MEMBER_LRU_TTL", 300))
+
+def build_intents(lean=LEAN_CACHE):
+    """Intents für den normalen bzw. schlanken Betrieb"""
+    intents = discord.Intents.default()
+    intents.message_content = True  # Für das Lesen von Nachrichteninhalten
+    intents.members = not lean      # Für den Zugriff auf Servermitglieder
+    intents.presences = not lean    # Für den Zugriff auf Benutzerstatus
+    intents.voice_states = True     # Für die Überwachung von Voice-Zuständen
+    return intents
+
+def build_member_cache_flags(lean=LEAN_CACHE):
+    """Im schlanken Betrieb werden nur Mitglieder in Voice-Kanälen zwischengespeichert"""
+    if lean:
+        return discord.MemberCacheFlags(voice=True, joined=False)
+    return discord.MemberCacheFlags.from_intents(build_intents(lean))
+
+class MemberLRU:
+    """Kleiner LRU-Cache für per REST nachgeladene Mitglieder"""
+
+    def __init__(self, maxsize=MEMBER_LRU_SIZE, ttl=MEMBER_LRU_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()  # {(guild_id, user_id): (Ablaufzeit, Member)}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, member):
+        key = (member.guild.id, member.id)
+        self._entries[key] = (time.monotonic() + self.ttl, member)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+# Datei mit dem Hash der zuletzt synchronisierten Slash-Befehle
+COMMAND_HASH_PATH = os.getenv("COMMAND_HASH_PATH", os.path.join(os.getcwd(), ".command_hash"))
+
+# Höchstens so viele Sekunden auf laufende Handler und REST-Aufrufe warten, bevor der Bot beendet wird
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", 10))
+# Tasks, die discord.py für Events, Slash-Befehle und UI-Interaktionen startet
+HANDLER_TASK_PREFIXES = ("discord.py: ", "CommandTree-invoker", "discord-ui-modal-dispatch-", "discord-ui-view-dispatch-")
+
+# Befehle, Button-Handler und Voice-Events; einzeln per /erweiterung_neu_laden austauschbar, der Zustand liegt am Bot
+EXTENSIONS = ("cogs.interactions", "cogs.talks", "cogs.voice", "cogs.admin")
+
+async def reject_during_shutdown(bot, interaction: discord.Interaction):
+    """Beantwortet Interaktionen während des Herunterfahrens; gibt True zurück, wenn abgelehnt"""
+    if not bot.shutting_down:
+        return False
     try:
-        file_handler.close()
-        logger.handlers.remove(file_handler)
-        end_time = datetime.now()
-        end_time_str = end_time.strftime('%H-%M-%S')
-        new_log_file_name = f"{start_time_str} - {end_time_str}.log"
-        new_log_file_path = os.path.join(log_dir, new_log_file_name)
-        if os.path.exists(log_file_path):
-            shutil.move(log_file_path, new_log_file_path)
-            logger.info(f"Log-Datei umbenannt zu: {new_log_file_name}")
-    except Exception as e:
-        logger.error(f"Fehler beim Umbenennen der Log-Datei: {e}")
-    finally:
-        if signal_number == signal.SIGINT:
-            print("stopt")
-        logger.info("Bot ordnungsgemäß beendet")
-        sys.exit(0)
+        await interaction.response.send_message("🔄 Der Bot wird gerade neu gestartet. Bitte versuche es gleich noch einmal.", ephemeral=True)
+    except discord.HTTPException:
+        pass
+    return True
 
-# Signal-Handler für SIGINT und SIGTERM
-signal.signal(signal.SIGINT, rename_log_file)
-signal.signal(signal.SIGTERM, rename_log_file)
+class TalkCommandTree(app_commands.CommandTree):
+    """Nimmt beim Herunterfahren keine Slash-Befehle mehr an"""
 
-# Asynchrone Funktion zum periodischen Umbenennen der Log-Datei
-async def update_log_file_name():
-    global log_file_path, file_handler
-    while True:
-        try:
-            # Alten FileHandler schließen und entfernen
-            file_handler.close()
-            logger.handlers.remove(file_handler)
-            
-            # Neue Zeit für Dateinamen
-            current_time = datetime.now()
-            current_time_str = current_time.strftime('%H-%M-%S')
-            new_log_file_name = f"{start_time_str} - {current_time_str}.log"
-            new_log_file_path = os.path.join(log_dir, new_log_file_name)
-            
-            # Alte Log-Datei umbenennen
-            if os.path.exists(log_file_path):
-                shutil.move(log_file_path, new_log_file_path)
-            
-            # Neuen FileHandler erstellen
-            log_file_path = new_log_file_path
-            file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-            file_handler.setLevel(logging.INFO)
-            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-            logger.addHandler(file_handler)
-            
-            # Eine Sekunde warten
-            await asyncio.sleep(1)
-        except Exception as e:
-            logger.error(f"Fehler beim periodischen Umbenennen der Log-Datei: {e}")
-            await asyncio.sleep(1)  # Fortfahren, auch wenn ein Fehler auftritt
+    async def interaction_check(self, interaction: discord.Interaction):
+        return not await reject_during_shutdown(self.client, interaction)
 
-# Umgebungsvariablen laden
-load_dotenv()
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(error, app_commands.CheckFailure) and self.client.shutting_down:
+            return
+        await super().on_error(interaction, error)
 
 # Bot-Konfiguration
-class TalkBot(commands.Bot):
-    def __init__(self):
-        # Intents konfigurieren
-        intents = discord.Intents.default()
-        intents.message_content = True  # Für das Lesen von Nachrichteninhalten
-        intents.members = True          # Für den Zugriff auf Servermitglieder
-        intents.presences = True        # Für den Zugriff auf Benutzerstatus
-        intents.voice_states = True     # Für die Überwachung von Voice-Zuständen
-        
-        super().__init__(command_prefix="!", intents=intents)
+class TalkBot(commands.AutoShardedBot):
+    def __init__(self, shard_count=SHARD_COUNT):
+        # Intents und Mitglieder-Cache konfigurieren
+        super().__init__(
+            command_prefix="!",
+            tree_cls=TalkCommandTree,
+            intents=build_intents(),
+            member_cache_flags=build_member_cache_flags(),
+            chunk_guilds_at_startup=not LEAN_CACHE,
+            shard_count=shard_count,
+            shard_ids=SHARD_IDS
+        )
         
         # Speicher für Talk-Einstellungen und Ersteller
         self.talk_settings = {}  # {guild_id: {"category": category_obj, "channel": channel_obj}}
-        self.talk_creators = {}  # {channel_id: creator_user_id}
-        self.talk_passwords = {}  # {channel_id: password}
-        # Speichern der ursprünglichen Kanalnamen für Fehlerbehebung
-        self.channel_names = {}  # {channel_id: channel_name}
-        # Speichern der autorisierten Benutzer für jeden Kanal
-        self.authorized_users = {}  # {channel_id: [user_id1, user_id2, ...]}
+        # Ersteller, Passwort, ursprünglicher Name und autorisierte Benutzer je Talk
+        self.talks = TalkRegistry()
+        # Zwischengespeicherte Übersichten für /talks_anzeigen
+        self.talk_lists = TalkListCache()
+        # Geplante Löschungen leerer Talks
+        self.deletion_scheduler = TalkDeletionScheduler(self)
+        # Nachgeladene Mitglieder, die nicht im Gateway-Cache liegen
+        self.member_lru = MemberLRU()
+        # Tabelle der Button-Handler
+        self.components = ComponentRouter()
+        # Zusammenfassung schneller Voice-Event-Folgen
+        self.voice_events = VoiceEventCoalescer()
+        # Latenzen, Zähler und Gauges
+        self.metrics = Metrics()
+        # Geplante REST-Aufrufe mit Prioritäten
+        self.rest = RestScheduler(metrics=self.metrics)
+        # Sperren pro Talk für Löschen, Autorisieren und Beitreten; laufende Beitritte pro Talk
+        self.talk_locks = KeyedLocks("talk", metrics=self.metrics)
+        self.joining = collections.Counter()
+        # Passwort-Hashing außerhalb der Event-Loop und Begrenzung der Versuche
+        self.passwords = PasswordHasher(metrics=self.metrics)
+        self.password_attempts = AttemptThrottle()
+        # Vorab erstellte Voice-Kanäle für schnelle Talk-Erstellung
+        self.channel_pool = TalkChannelPool(self)
+        # Kanalberechtigungen statt nachträglichem Entfernen (TALK_ACCESS_MODE=overwrites)
+        self.talk_access = TalkAccessControl(self)
+        # Kontingente und Warteschlange für neue Talks
+        self.admission = TalkAdmission(self)
+        # Persistenter Speicher und noch nicht aufgelöste Einstellungen aus dem letzten Lauf
+        self.store = create_talk_store()
+        # Aufzeichnung der Gateway-Events zum Nachspielen (EVENT_JOURNAL=1)
+        self.journal = EventJournal(label=f"_cluster{CLUSTER_ID}" if CLUSTER_ID is not None else "")
+        # Zeitreihe der Talk-Auslastung pro Server für /talk_auslastung
+        self.occupancy = TalkOccupancy(self, path=OCCUPANCY_PATH if CLUSTER_ID is None else f"{OCCUPANCY_PATH}_cluster{CLUSTER_ID}")
+        self.stored_settings = {}  # {guild_id: (category_id, channel_id)}
+        # Befehle auch bei unverändertem Hash synchronisieren (--sync-commands)
+        self.force_sync = False
+        self.ready_reported = False
+        self.startup_seconds = None  # Kaltstart bis zur ersten Bereitschaft, zum Vergleich mit dem Neuladen
+        self.shutting_down = False
+
+    def forget_talk(self, channel_id):
+        """Entfernt alle gespeicherten Daten eines Talks"""
+        self.deletion_scheduler.cancel(channel_id)
+        record = self.talks.remove(channel_id)
+        if record is not None:
+            self.talk_lists.invalidate(record.guild_id)
+            self.occupancy.talk_closed(record.guild_id, channel_id)
+        self.store.delete_talk(channel_id)
+
+    async def resolve_member(self, guild, user_id):
+        """Mitglied aus dem Cache, sonst aus dem LRU oder per REST nachladen"""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        member = self.member_lru.get(guild.id, user_id)
+        if member is not None:
+            self.member_lru.hits += 1
+            return member
+        self.member_lru.misses += 1
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
+        except discord.HTTPException as e:
+            logger.warning(f"Mitglied {user_id} auf {guild.name} konnte nicht geladen werden: {e}")
+            return None
+        self.member_lru.put(member)
+        return member
+
+    async def move_member(self, member, channel):
+        """Verschiebt einen Benutzer (oder trennt ihn bei channel=None) mit höchster Priorität"""
+        return await self.rest.submit(
+            PRIORITY_MOVE, "move", lambda: member.move_to(channel),
+            guild_id=member.guild.id, key=("move", member.guild.id, member.id)
+        )
+
+    async def move_into_talk(self, member, channel):
+        """Verschiebt einen Benutzer in einen Talk, ohne dass der Talk währenddessen gelöscht wird.
+
+        Gibt False zurück, wenn der Talk inzwischen nicht mehr existiert.
+        """
+        async with self.talk_locks.hold(channel.id):
+            if channel.id not in self.talks:
+                return False
+            self.deletion_scheduler.cancel(channel.id)
+            self.joining[channel.id] += 1
+        try:
+            await self.move_member(member, channel)
+        except Exception:
+            if channel.id in self.talks and len(channel.members) == 0:
+                self.deletion_scheduler.schedule(channel.id, channel.guild.id, channel.name)
+            raise
+        finally:
+            self.joining[channel.id] -= 1
+            if self.joining[channel.id] <= 0:
+                del self.joining[channel.id]
+        return True
+
+    async def send_dm(self, member, key=None, **kwargs):
+        """Sendet eine Direktnachricht; gleiche Schlüssel werden zusammengefasst.
+
+        Der Token-Bucket gilt pro Server, damit ein Ansturm auf einem Server die DMs der anderen nicht aufhält.
+        """
+        guild = getattr(member, "guild", None)
+        return await self.rest.submit(
+            PRIORITY_DM, "dm", lambda: member.send(**kwargs), guild_id=guild.id if guild else None, key=key
+        )
+
+    def owns_guild(self, guild_id):
+        """True, wenn der Server über einen Shard dieses Prozesses läuft"""
+        if self.shard_ids is None or self.shard_count is None:
+            return True
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+
+    async def load_state(self):
+        """Lädt den gespeicherten Zustand mit einem einzigen Lesevorgang pro Tabelle.
+
+        Im Cluster-Betrieb werden nur die Server übernommen, deren Shards dieser Prozess betreibt.
+        """
+        settings, talks, authorized, limits = await asyncio.get_running_loop().run_in_executor(None, self.store.load)
+        settings = {guild_id: value for guild_id, value in settings.items() if self.owns_guild(guild_id)}
+        for guild_id, (user_quota, guild_quota, queue_size) in limits.items():
+            if self.owns_guild(guild_id):
+                self.admission.overrides[guild_id] = TalkLimits(user_quota, guild_quota, queue_size)
+        talks = {channel_id: value for channel_id, value in talks.items() if self.owns_guild(value[0])}
+        self.stored_settings = settings
+        for channel_id, (guild_id, creator_id, password, name) in talks.items():
+            self.talks.add(channel_id, guild_id, creator_id, password, name, authorized.get(channel_id, ()))
+        logger.info(f"Zustand geladen: {len(settings)} Server, {len(talks)} Talks")
+
+    async def upgrade_passwords(self):
+        """Hasht im Klartext gespeicherte Passwörter aus älteren Versionen"""
+        upgraded = 0
+        for record in self.talks:
+            if record.password is None or is_password_hash(record.password):
+                continue
+            plain = record.password
+            hashed = await self.passwords.hash(plain)
+            if self.talks.get(record.channel_id) is record and record.password == plain:
+                record.password = hashed
+                self.store.save_talk(record.channel_id, record.guild_id, record.creator_id, hashed, record.name)
+                upgraded += 1
+        if upgraded:
+            logger.info(f"{upgraded} Klartext-Passwörter gehasht")
+
+    def resolve_settings(self):
+        """Wandelt gespeicherte Kategorie-/Kanal-IDs in Objekte um, sobald der Cache gefüllt ist"""
+        for guild_id, (category_id, channel_id) in list(self.stored_settings.items()):
+            guild = self.get_guild(guild_id)
+            if guild is None:
+                continue
+            category = guild.get_channel(category_id)
+            channel = guild.get_channel(channel_id)
+            if category and channel:
+                self.talk_settings.setdefault(guild_id, {"category": category, "channel": channel})
+            self.stored_settings.pop(guild_id)
+
+    def register_metrics(self):
+        """Beschreibt die Metriken und registriert die Gauges"""
+        metrics = self.metrics
+        metrics.describe("talkbot_event_seconds", "histogram", "Laufzeit der Event-Handler")
+        metrics.describe("talkbot_rest_seconds", "histogram", "Dauer der REST-Aufrufe je Route")
+        metrics.describe("talkbot_rest_wait_seconds", "histogram", "Wartezeit im REST-Planer (Token-Buckets und Warteschlange) je Priorität")
+        metrics.describe("talkbot_event_loop_lag_seconds", "histogram", "Verzögerung der Event-Loop")
+        metrics.describe("talkbot_password_seconds", "histogram", "Dauer von Passwort-Hashing und -Prüfung inklusive Wartezeit im Thread-Pool")
+        metrics.gauge("talkbot_password_attempts_throttled", "Abgewiesene Passwortversuche", lambda: [({}, self.password_attempts.throttled)])
+        metrics.gauge("talkbot_talks_active", "Aktive Talks je Server", lambda: [
+            ({"guild": guild_id}, count) for guild_id, count in self.talks.counts_by_guild().items()
+        ])
+        metrics.gauge("talkbot_occupancy_bytes", "Speicher der Auslastungs-Zeitreihen", lambda: [({}, self.occupancy.memory_bytes())])
+        metrics.gauge("talkbot_deletions_pending", "Geplante Löschungen leerer Talks", lambda: [({}, len(self.deletion_scheduler))])
+        metrics.gauge("talkbot_gateway_latency_seconds", "Gateway-Latenz je Shard", lambda: [
+            ({"shard": shard_id}, latency) for shard_id, latency in self.latencies
+        ])
+        metrics.gauge("talkbot_rest_queue_depth", "Wartende REST-Aufrufe je Priorität", lambda: [
+            ({"priority": name}, depth) for name, depth in self.rest.queue_depth().items()
+        ])
+        metrics.gauge("talkbot_voice_events", "Zusammengefasste und ignorierte Voice-Events", lambda: [
+            ({"kind": kind}, value) for kind, value in self.voice_events.stats().items()
+        ])
+        metrics.gauge("talkbot_talk_list_cache", "Treffer und Neuaufbauten des Talk-Übersichts-Caches", lambda: [
+            ({"kind": "hits"}, self.talk_lists.hits), ({"kind": "builds"}, self.talk_lists.builds)
+        ])
+        metrics.gauge("talkbot_access_overwrites", "Kanalbearbeitungen und damit vergebene Berechtigungen", lambda: [
+            ({"kind": "edits"}, self.talk_access.edits), ({"kind": "granted"}, self.talk_access.granted)
+        ])
+        metrics.gauge("talkbot_talk_admission", "Wartende, zugelassene und abgelehnte Talk-Erstellungen", lambda: [
+            ({"kind": "queued"}, self.admission.queued), ({"kind": "admitted"}, self.admission.admitted),
+        ] + [({"kind": f"rejected_{reason}"}, count) for reason, count in self.admission.rejected.items()])
+        metrics.describe("talkbot_lock_wait_seconds", "histogram", "Wartezeit auf belegte Sperren je Bereich")
+        metrics.gauge("talkbot_lock_acquisitions", "Erworbene und umkämpfte Sperren", lambda: [
+            ({"scope": self.talk_locks.scope, "kind": "acquired"}, self.talk_locks.acquired),
+            ({"scope": self.talk_locks.scope, "kind": "contended"}, self.talk_locks.contended),
+        ])
+        metrics.describe("talkbot_extension_reload_seconds", "histogram", "Dauer des Neuladens einer Erweiterung")
+        metrics.describe("talkbot_component_seconds", "histogram", "Laufzeit der Button-Handler")
+        for action, histogram in self.components.latency.items():
+            metrics.attach("talkbot_component_seconds", histogram, action=action)
+
+    def command_hash(self):
+        """Stabiler Hash aller registrierten Slash-Befehle (inklusive Anwendungs-ID)"""
+        commands_data = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda data: data["name"]
+        )
+        payload = json.dumps({"application_id": self.application_id, "commands": commands_data}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def sync_commands(self):
+        """Synchronisiert die Slash-Befehle nur, wenn sie sich seit dem letzten Mal geändert haben"""
+        if CLUSTER_ID not in (None, "0"):
+            # Befehle sind global; im Cluster-Betrieb synchronisiert nur Cluster 0
+            return
+        current = self.command_hash()
+        try:
+            with open(COMMAND_HASH_PATH, encoding="utf-8") as f:
+                previous = f.read().strip()
+        except OSError:
+            previous = None
+        if current == previous and not self.force_sync:
+            logger.info("Slash-Befehle unverändert, Synchronisierung übersprungen")
+            return
+        try:
+            synced = await self.tree.sync()
+            logger.info(f"{len(synced)} Befehle synchronisiert")
+        except Exception as e:
+            logger.error(f"Fehler beim Synchronisieren der Befehle: {e}")
+            return
+        try:
+            with open(COMMAND_HASH_PATH, "w", encoding="utf-8") as f:
+                f.write(current)
+        except OSError as e:
+            logger.error(f"Fehler beim Speichern des Befehls-Hashes: {e}")
+
+    async def load_extensions(self):
+        """Lädt alle Erweiterungen; ein Fehler bricht den Start ab, damit keine Befehle per Sync verloren gehen"""
+        started = time.perf_counter()
+        for name in EXTENSIONS:
+            await self.load_extension(name)
+        logger.info(f"{len(EXTENSIONS)} Erweiterungen geladen in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    async def reload_extension_timed(self, name):
+        """Lädt eine Erweiterung neu, ohne die Gateway-Verbindung oder den Zustand am Bot anzutasten.
+
+        Schlägt das Neuladen fehl, stellt discord.py die vorherige Version wieder her.
+        Gibt die Dauer in Sekunden zurück.
+        """
+        started = time.perf_counter()
+        if name in self.extensions:
+            await self.reload_extension(name)
+        else:
+            await self.load_extension(name)
+        elapsed = time.perf_counter() - started
+        self.metrics.observe("talkbot_extension_reload_seconds", elapsed, extension=name)
+        logger.info(f"Erweiterung {name} neu geladen in {elapsed * 1000:.1f} ms")
+        return elapsed
+
+    async def reconcile_talks(self):
+        """Gleicht den gespeicherten Zustand mit den Talk-Kategorien aller Server ab.
+
+        Arbeitet nur mit dem Gateway-Cache und ruft selbst keine REST-Endpunkte auf.
+        Leere Talks werden an den Löschplaner übergeben, der sie gesammelt löscht;
+        dessen Stapelgröße und die Token-Buckets des REST-Planers begrenzen die Last.
+        """
+        started = time.perf_counter()
+        removed = skipped = queued = 0
+        for guild in self.guilds:
+            result = self.reconcile_guild(guild)
+            removed += result[0]
+            skipped += result[1]
+            queued += result[2]
+            await asyncio.sleep(0)  # Event-Loop zwischen den Servern freigeben
+        logger.info(
+            f"Abgleich abgeschlossen in {time.perf_counter() - started:.2f}s: "
+            f"{removed} verwaiste Einträge entfernt, {skipped} unbekannte Kanäle übersprungen, {queued} leere Talks zur Löschung vorgemerkt"
+        )
+
+    def reconcile_guild(self, guild):
+        """Gleicht einen Server ab; gibt (entfernt, übersprungen, vorgemerkt) zurück"""
+        removed = skipped = queued = 0
+        for record in self.talks.for_guild(guild.id):
+            channel = guild.get_channel(record.channel_id)
+            if channel is None:
+                # Während der Ausfallzeit gelöscht
+                self.forget_talk(record.channel_id)
+                removed += 1
+            else:
+                if record.password_protected:
+                    self.talk_access.ensure(channel)
+                if len(channel.members) == 0:
+                    self.deletion_scheduler.schedule(channel.id, guild.id, channel.name)
+                    queued += 1
+
+        settings = self.talk_settings.get(guild.id)
+        if settings:
+            for channel in settings["category"].voice_channels:
+                if channel.name == TALK_POOL_NAME and channel.id not in self.talks:
+                    self.channel_pool.adopt(channel)
+                    continue
+                if channel.id in self.talks or not channel.name.startswith(TALK_PREFIXES):
+                    continue
+                # Ohne gespeicherten Eintrag ist nicht sicher, dass der Bot den Kanal erstellt hat
+                # (z. B. eine „🎙️ Lobby“ der Administratoren); solche Kanäle nie übernehmen oder löschen
+                logger.info(f"Kanal {channel.name} ({channel.id}) in der Talk-Kategorie ist kein bekannter Talk und wird übersprungen")
+                skipped += 1
+        self.talk_lists.invalidate(guild.id)
+        return removed, skipped, queued
+
+    def dispatch(self, event_name, /, *args, **kwargs):
+        # Beim Herunterfahren keine neuen Voice-Events und Button-Klicks mehr annehmen
+        if self.shutting_down and event_name in ("voice_state_update", "interaction"):
+            return
+        super().dispatch(event_name, *args, **kwargs)
+
+    def install_signal_handlers(self):
+        """SIGINT/SIGTERM über die Event-Loop behandeln statt sys.exit() im laufenden Handler"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown, sig)
+            except NotImplementedError:
+                # Windows: Signal im Hauptthread an die Event-Loop weiterreichen
+                signal.signal(sig, lambda number, frame: loop.call_soon_threadsafe(self.request_shutdown, number))
+
+    def request_shutdown(self, signal_number=None):
+        if self.shutting_down:
+            logger.info("Herunterfahren läuft bereits")
+            return
+        self.shutting_down = True
+        if signal_number == signal.SIGINT:
+            print("stopt")
+        name = signal.Signals(signal_number).name if signal_number is not None else "Anfrage"
+        logger.info(f"{name} empfangen, Bot wird heruntergefahren")
+        asyncio.get_running_loop().create_task(self.graceful_shutdown())
+
+    async def graceful_shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Laufende Handler und REST-Aufrufe abwarten, Zustand sichern und die Verbindung schließen"""
+        started = time.perf_counter()
+        deadline = started + timeout
+        phases = []
+
+        def phase(name, since):
+            now = time.perf_counter()
+            phases.append(f"{name} {now - since:.2f}s")
+            return now
+
+        # Laufende Event-Handler, Befehle und Voice-Entscheidungen abwarten
+        current = asyncio.current_task()
+        handlers = [
+            task for task in asyncio.all_tasks()
+            if task is not current and not task.done() and task.get_name().startswith(HANDLER_TASK_PREFIXES)
+        ] + self.voice_events.tasks()
+        mark = started
+        if handlers:
+            _, pending = await asyncio.wait(handlers, timeout=max(0.0, deadline - time.perf_counter()))
+            if pending:
+                logger.warning(f"{len(pending)} Handler beim Herunterfahren nicht rechtzeitig fertig geworden")
+        mark = phase(f"Handler ({len(handlers)})", mark)
+
+        # Ausstehende REST-Aufrufe (Verschieben, DMs, Löschungen) abschließen
+        try:
+            await asyncio.wait_for(self.rest.drain(), max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            logger.warning(f"REST-Warteschlange beim Herunterfahren nicht leer: {self.rest.queue_depth()}")
+        mark = phase("REST", mark)
+
+        # Offene Löschungen holt der Abgleich beim nächsten Start nach
+        self.deletion_scheduler.stop()
+        self.channel_pool.stop()
+        self.occupancy.stop()
+        if len(self.deletion_scheduler):
+            logger.info(f"{len(self.deletion_scheduler)} geplante Löschungen werden beim nächsten Start nachgeholt")
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.store.flush)
+        except Exception as e:
+            logger.error(f"Fehler beim Sichern des Zustands: {e}")
+        try:
+            self.occupancy.tick()
+            await self.occupancy.save()
+        except Exception as e:
+            logger.error(f"Fehler beim Sichern der Auslastungsstatistik: {e}")
+        mark = phase("Zustand", mark)
+
+        try:
+            await self.close()
+        except Exception as e:
+            logger.error(f"Fehler beim Schließen der Verbindung: {e}")
+        phase("Verbindung", mark)
+        logger.info(f"Heruntergefahren in {time.perf_counter() - started:.2f}s ({', '.join(phases)})")
+
+    async def close(self):
+        self.rest.stop()
+        self.metrics.stop()
+        await super().close()
+        self.passwords.close()
+        # Wartet auf den Writer-Thread, daher nicht in der Event-Loop
+        await asyncio.get_running_loop().run_in_executor(None, self.store.close)
+        self.journal.close()
     
     async def setup_hook(self):
         """Setup-Hook, der ausgeführt wird, wenn der Bot initialisiert ist"""
         print("done", flush=True)  # Frühe Ausgabe für Pelican Panel
         logger.info(f'Angemeldet als {self.user}')
+        self.install_signal_handlers()
         try:
-            synced = await self.tree.sync()
-            logger.info(f"{len(synced)} Befehle synchronisiert")
+            await self.load_state()
         except Exception as e:
-            logger.error(f"Fehler beim Synchronisieren der Befehle: {e}")
+            logger.error(f"Fehler beim Laden des gespeicherten Zustands: {e}")
+        self.store.start()
+        try:
+            restored = await asyncio.get_running_loop().run_in_executor(None, self.occupancy.load, self.owns_guild)
+            if restored:
+                logger.info(f"Auslastungsstatistik für {restored} Server geladen")
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Auslastungsstatistik: {e}")
+        asyncio.get_running_loop().create_task(self.upgrade_passwords())
+        await self.load_extensions()
+        await self.sync_commands()
         
-        # Hintergrundtask zum Umbenennen der Log-Datei starten
-        self.loop.create_task(update_log_file_name())
+        # REST-Planer und Löschplaner für leere Talks starten
+        self.rest.start()
+        self.register_metrics()
+        self.metrics.start()
+        self.deletion_scheduler.start()
+        self.channel_pool.start()
+        self.occupancy.start()
         
         # Hinweis für PyNaCl
         try:
@@ -143,6 +2918,21 @@ class TalkBot(commands.Bot):
     
     async def on_ready(self):
         """Wird aufgerufen, wenn der Bot vollständig bereit ist"""
+        if not self.ready_reported:
+            self.ready_reported = True
+            self.startup_seconds = time.perf_counter() - PROCESS_STARTED
+            logger.info(f"Bereit nach {self.startup_seconds:.2f}s seit Prozessstart")
+        self.resolve_settings()
+        try:
+            await self.reconcile_talks()
+        except Exception as e:
+            logger.error(f"Fehler beim Abgleich der Talks: {e}")
+        # Aufzeichnung erst nach dem Abgleich beginnen, damit der Schnappschuss vollständig ist
+        try:
+            self.journal.install(self)
+        except Exception as e:
+            logger.error(f"Fehler beim Starten des Event-Journals: {e}")
+        self.channel_pool.request_refill()
         try:
             activity = discord.CustomActivity(
                 name="allosmp Talk Bot | https://allosmp.de/discord_talk_bot"
@@ -153,222 +2943,16 @@ class TalkBot(commands.Bot):
         except Exception as e:
             logger.error(f"Fehler beim Setzen der Bot-Beschreibung: {e}")
 
-# UI-Komponenten
-class TalkCreationModal(Modal):
-    def __init__(self):
-        super().__init__(title="Talk-Nachricht erstellen")
-        
-        self.channel = TextInput(
-            label="Kanalname", 
-            placeholder="Gib den Namen des Kanals ein, in dem die Nachricht gepostet werden soll",
-            required=True
-        )
-        self.message = TextInput(
-            label="Nachrichteninhalt", 
-            placeholder="Gib den Inhalt der Nachricht ein", 
-            style=discord.TextStyle.paragraph,
-            required=True
-        )
-        self.category = TextInput(
-            label="Kategoriename", 
-            placeholder="Gib den Namen der Kategorie ein, in der Talks erstellt werden sollen",
-            required=True
-        )
-        
-        self.add_item(self.channel)
-        self.add_item(self.message)
-        self.add_item(self.category)
-
-    async def on_submit(self, interaction: discord.Interaction):
-        channel = discord.utils.get(interaction.guild.text_channels, name=self.channel.value)
-        category = discord.utils.get(interaction.guild.categories, name=self.category.value)
-
-        if not channel:
-            await interaction.response.send_message("❌ Kanal nicht gefunden!", ephemeral=True)
-            return
-            
-        if not category:
-            await interaction.response.send_message("❌ Kategorie nicht gefunden!", ephemeral=True)
-            return
-
-        # Einstellungen für diesen Server speichern
-        bot.talk_settings[interaction.guild.id] = {"category": category, "channel": channel}
-
-        # Talk-Erstellungsnachricht erstellen und senden
-        embed = discord.Embed(
-            title="📣 Erstelle einen Talk-Kanal", 
-            description=self.message.value,
-            color=discord.Color.blue()
-        )
-        
-        # Button-View erstellen
-        view = View(timeout=None)  # Kein Timeout für persistenten Button
-        view.add_item(Button(
-            label="Talk erstellen", 
-            style=discord.ButtonStyle.primary, 
-            custom_id="create_talk",
-            emoji="🎙️"
-        ))
-
-        await channel.send(embed=embed, view=view)
-        await interaction.response.send_message("✅ Talk-Erstellungsnachricht erfolgreich eingerichtet!", ephemeral=True)
+# UI-Komponenten (die Formulare liegen in den Erweiterungen unter cogs/)
+class TalkModal(Modal):
+    """Formular, das beim Herunterfahren keine Eingaben mehr annimmt"""
 
-class CreateTalkModal(Modal):
-    def __init__(self):
-        super().__init__(title="Erstelle deinen Talk")
-        
-        self.talk_name = TextInput(
-            label="Talk-Name", 
-            placeholder="Gib den Namen deines Talks ein",
-            required=True,
-            max_length=32
-        )
-        
-        self.password_required = TextInput(
-            label="Passwort erforderlich?", 
-            placeholder="Ja oder Nein",
-            required=True,
-            max_length=3
-        )
-        
-        self.password = TextInput(
-            label="Passwort (falls erforderlich)", 
-            placeholder="Leer lassen, wenn kein Passwort benötigt wird",
-            required=False,
-            max_length=20
-        )
-        
-        self.add_item(self.talk_name)
-        self.add_item(self.password_required)
-        self.add_item(self.password)
-    
-    async def on_submit(self, interaction: discord.Interaction):
-        guild_id = interaction.guild.id
-        
-        if guild_id not in bot.talk_settings:
-            await interaction.response.send_message("❌ Das Talk-System ist in diesem Server nicht eingerichtet!", ephemeral=True)
-            return
-            
-        category = bot.talk_settings[guild_id]["category"]
-        
-        # Überprüfen, ob ein Passwort erforderlich ist
-        password_required = self.password_required.value.lower() in ["ja", "yes", "j", "y"]
-        password = self.password.value if password_required else None
-        
-        if password_required and not password:
-            await interaction.response.send_message("❌ Du hast angegeben, dass ein Passwort erforderlich ist, aber keines eingegeben!", ephemeral=True)
-            return
-        
-        try:
-            # Voice-Kanal erstellen
-            prefix = "🔒" if password_required else "🎙️"
-            new_channel = await interaction.guild.create_voice_channel(
-                name=f"{prefix} {self.talk_name.value}", 
-                category=category
-            )
-            
-            # Ersteller des Talks speichern
-            bot.talk_creators[new_channel.id] = interaction.user.id
-            
-            # Passwort speichern, falls erforderlich
-            if password_required:
-                bot.talk_passwords[new_channel.id] = password
-                
-            # Kanalname für spätere Referenz speichern
-            bot.channel_names[new_channel.id] = new_channel.name
-            
-            # Ersteller zur Liste der autorisierten Benutzer hinzufügen
-            bot.authorized_users[new_channel.id] = [interaction.user.id]
-            
-            password_info = "mit Passwortschutz" if password_required else "ohne Passwortschutz"
-            await interaction.response.send_message(
-                f"✅ Dein Talk wurde in {new_channel.mention} erstellt ({password_info})!", 
-                ephemeral=True
-            )
-            
-            logger.info(f"Talk-Kanal '{new_channel.name}' erstellt von {interaction.user}")
-            
-        except discord.Forbidden:
-            await interaction.response.send_message(
-                "❌ Ich habe keine Berechtigung, Voice-Kanäle zu erstellen!", 
-                ephemeral=True
-            )
-        except Exception as e:
-            logger.error(f"Fehler beim Erstellen des Talk-Kanals: {e}")
-            await interaction.response.send_message(
-                "❌ Beim Erstellen deines Talk-Kanals ist ein Fehler aufgetreten.", 
-                ephemeral=True
-            )
+    def __init__(self, bot, **kwargs):
+        super().__init__(**kwargs)
+        self.bot = bot
 
-class PasswordModal(Modal):
-    def __init__(self, channel_id, channel_name, guild_id, user_id):
-        super().__init__(title="Passwort eingeben")
-        self.channel_id = channel_id
-        self.channel_name = channel_name
-        self.guild_id = guild_id
-        self.user_id = user_id
-        
-        self.password = TextInput(
-            label="Passwort", 
-            placeholder="Gib das Passwort für diesen Talk ein",
-            required=True
-        )
-        
-        self.add_item(self.password)
-    
-    async def on_submit(self, interaction: discord.Interaction):
-        entered_password = self.password.value
-        correct_password = bot.talk_passwords.get(self.channel_id)
-        
-        # Überprüfen, ob wir in einer DM sind
-        if interaction.guild is None:
-            guild = bot.get_guild(self.guild_id)
-            if not guild:
-                await interaction.response.send_message("❌ Server nicht gefunden. Bitte versuche es erneut.", ephemeral=True)
-                return
-            channel = guild.get_channel(self.channel_id)
-            member = guild.get_member(self.user_id)
-        else:
-            guild = interaction.guild
-            channel = guild.get_channel(self.channel_id)
-            member = interaction.user
-        
-        if not channel or not member:
-            await interaction.response.send_message("❌ Kanal oder Benutzer nicht gefunden.", ephemeral=True)
-            return
-        
-        if entered_password == correct_password:
-            # Passwort ist korrekt, Benutzer autorisieren
-            if self.channel_id not in bot.authorized_users:
-                bot.authorized_users[self.channel_id] = []
-            if self.user_id not in bot.authorized_users[self.channel_id]:
-                bot.authorized_users[self.channel_id].append(self.user_id)
-            
-            logger.info(f"Benutzer {self.user_id} wurde für Talk-Kanal {self.channel_id} autorisiert")
-            
-            # Überprüfen, ob der Benutzer mit einem Voice-Channel verbunden ist
-            if member.voice and member.voice.channel:
-                try:
-                    await member.move_to(channel)
-                    await interaction.response.send_message(
-                        f"✅ Passwort korrekt! Du wurdest in den Talk '{self.channel_name}' verschoben.", 
-                        ephemeral=True
-                    )
-                    logger.info(f"Benutzer {member.id} wurde in Talk-Kanal {self.channel_id} verschoben")
-                except Exception as e:
-                    logger.error(f"Fehler beim Verschieben des Benutzers in den Kanal: {e}")
-                    await interaction.response.send_message(
-                        f"✅ Passwort korrekt! Bitte tritt dem Talk '{self.channel_name}' manuell bei.", 
-                        ephemeral=True
-                    )
-            else:
-                await interaction.response.send_message(
-                    f"✅ Passwort korrekt! Bitte tritt dem Talk '{self.channel_name}' manuell bei, da du derzeit nicht in einem Voice-Channel bist.", 
-                    ephemeral=True
-                )
-        else:
-            await interaction.response.send_message("❌ Falsches Passwort!", ephemeral=True)
-            logger.info(f"Benutzer {self.user_id} hat ein falsches Passwort für Talk-Kanal {self.channel_id} eingegeben")
+    async def interaction_check(self, interaction: discord.Interaction):
+        return not await reject_during_shutdown(self.bot, interaction)
 
 # Benutzerdefinierte View für Passwort-Button
 class PasswordButtonView(View):
@@ -379,7 +2963,7 @@ class PasswordButtonView(View):
         self.guild_id = guild_id
         self.user_id = user_id
         
-        custom_id = f"enter_password_{channel_id}_{guild_id}_{user_id}"
+        custom_id = ComponentRouter.build("password", channel_id, guild_id, user_id)
         self.add_item(Button(
             label="Passwort eingeben", 
             style=discord.ButtonStyle.primary, 
@@ -394,7 +2978,7 @@ class JoinTalkButtonView(View):
         self.channel_id = channel_id
         self.guild_id = guild_id
         
-        custom_id = f"join_talk_{channel_id}_{guild_id}"
+        custom_id = ComponentRouter.build("join", channel_id, guild_id)
         self.add_item(Button(
             label="Talk beitreten", 
             style=discord.ButtonStyle.success, 
@@ -402,239 +2986,106 @@ class JoinTalkButtonView(View):
             emoji="🎙️"
         ))
 
-# Bot-Instanz erstellen
-bot = TalkBot()
-
-# Befehle
-@bot.tree.command(
-    name="talk_system_einrichten", 
-    description="Richte das Talk-Erstellungssystem für deinen Server ein"
-)
-@app_commands.default_permissions(administrator=True)
-async def setup_talk_system(interaction: discord.Interaction):
-    """Befehl zum Einrichten des Talk-Erstellungssystems"""
-    if not interaction.user.guild_permissions.administrator:
-        await interaction.response.send_message("❌ Du benötigst Administratorrechte, um diesen Befehl zu verwenden!", ephemeral=True)
-        return
+def find_talk(bot, guild, talk_name):
+    """Bester Treffer für einen Talk als (TalkRecord, Kanal) oder (None, None)
+
+    Die Autovervollständigung liefert die Kanal-ID, damit gleichnamige Talks eindeutig
+    bleiben; frei eingetippte Namen werden über die Namenssuche aufgelöst.
+    """
+    if talk_name.isdigit():
+        record = bot.talks.get(int(talk_name))
+        channel = guild.get_channel(record.channel_id) if record and record.guild_id == guild.id else None
+        if channel:
+            return record, channel
+    for record, _ in bot.talks.search(guild.id, talk_name, limit=5):
+        channel = guild.get_channel(record.channel_id)
+        if channel:
+            return record, channel
+    return None, None
 
-    modal = TalkCreationModal()
-    await interaction.response.send_modal(modal)
+def talk_name_choices(bot, guild, current):
+    """Vorschläge für die Autovervollständigung von Talk-Namen, beste Treffer zuerst.
 
-# Event-Handler
-@bot.event
-async def on_interaction(interaction: discord.Interaction):
-    """Button-Interaktionen verarbeiten"""
-    if not interaction.type == discord.InteractionType.component:
-        return
-        
-    if interaction.data.get("custom_id") == "create_talk":
-        modal = CreateTalkModal()
-        await interaction.response.send_modal(modal)
-    
-    elif interaction.data.get("custom_id", "").startswith("enter_password_"):
-        parts = interaction.data.get("custom_id").split("_")
-        if len(parts) >= 5:
-            channel_id = int(parts[2])
-            guild_id = int(parts[3])
-            user_id = int(parts[4])
-            channel_name = bot.channel_names.get(channel_id, "Unbekannter Kanal")
-            modal = PasswordModal(channel_id, channel_name, guild_id, user_id)
-            await interaction.response.send_modal(modal)
-        else:
-            await interaction.response.send_message("❌ Ungültige Button-ID. Bitte versuche es erneut.", ephemeral=True)
-    
-    elif interaction.data.get("custom_id", "").startswith("join_talk_"):
-        parts = interaction.data.get("custom_id").split("_")
-        if len(parts) >= 4:
-            channel_id = int(parts[2])
-            guild_id = int(parts[3])
-            
-            if channel_id in bot.authorized_users and interaction.user.id in bot.authorized_users[channel_id]:
-                guild = bot.get_guild(guild_id)
-                if guild:
-                    channel = guild.get_channel(channel_id)
-                    member = guild.get_member(interaction.user.id)
-                    
-                    if channel and member and member.voice and member.voice.channel:
-                        try:
-                            await member.move_to(channel)
-                            await interaction.response.send_message("✅ Du wurdest in den Talk verschoben.", ephemeral=True)
-                            logger.info(f"Benutzer {member.id} wurde in Talk-Kanal {channel_id} verschoben")
-                        except Exception as e:
-                            logger.error(f"Fehler beim Verschieben des Benutzers: {e}")
-                            await interaction.response.send_message("❌ Fehler beim Verschieben in den Talk-Kanal.", ephemeral=True)
-                    else:
-                        await interaction.response.send_message("❌ Du musst in einem Voice-Channel sein, um verschoben zu werden.", ephemeral=True)
-                else:
-                    await interaction.response.send_message("❌ Server nicht gefunden.", ephemeral=True)
-            else:
-                await interaction.response.send_message("❌ Du bist nicht autorisiert, diesem Talk beizutreten.", ephemeral=True)
-                logger.info(f"Benutzer {interaction.user.id} nicht autorisiert für Talk-Kanal {channel_id}")
-        else:
-            await interaction.response.send_message("❌ Ungültige Button-ID. Bitte versuche es erneut.", ephemeral=True)
+    Angezeigt wird der Name, übergeben wird die Kanal-ID (siehe find_talk).
+    """
+    if guild is None:
+        return []
+    return [
+        app_commands.Choice(name=name[:100], value=str(record.channel_id))
+        for record, name in bot.talks.search(guild.id, current, limit=25)
+    ]
 
-@bot.event
-async def on_voice_state_update(member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-    """Voice-Status-Updates für Talk-Kanäle verarbeiten"""
-    logger.debug(f"on_voice_state_update: Member: {member}, Before: {before.channel}, After: {after.channel}")
+# Bot-Instanz; wird erst nach dem Auswerten der Argumente erstellt (der Supervisor braucht keine).
+# Befehle und Event-Handler lädt setup_hook aus EXTENSIONS
+bot = None
+
+async def fetch_recommended_shard_count(token):
+    """Fragt Discord nach der empfohlenen Anzahl von Shards"""
+    client = discord.Client(intents=discord.Intents.none())
     try:
-        # Überprüfen, ob ein Benutzer einem Talk-Kanal beigetreten ist
-        if after.channel is not None and after.channel.id in bot.talk_creators:
-            # Wenn der Benutzer autorisiert ist oder der Ersteller, darf er bleiben
-            if (after.channel.id in bot.authorized_users and member.id in bot.authorized_users[after.channel.id]) or \
-               member.id == bot.talk_creators.get(after.channel.id):
-                if member.id == bot.talk_creators.get(after.channel.id):
-                    logger.info(f"Talk-Ersteller {member} hat seinen Talk-Kanal {after.channel.name} betreten")
-                else:
-                    logger.info(f"Autorisierter Benutzer {member} hat Talk-Kanal {after.channel.name} betreten")
-                return
+        await client.login(token)
+        shard_count, _, _ = await client.http.get_bot_gateway()
+        return shard_count
+    finally:
+        await client.close()
 
-            # Wenn der Kanal passwortgeschützt ist und der Benutzer nicht autorisiert
-            if after.channel.id in bot.talk_passwords:
-                channel_name = bot.channel_names.get(after.channel.id, after.channel.name)
-                
-                # Passwort-Abfrage senden
-                try:
-                    embed = discord.Embed(
-                        title="🔒 Passwortgeschützter Talk",
-                        description=f"Der Talk-Kanal '{channel_name}' ist passwortgeschützt. Du musst zuerst das Passwort eingeben, bevor du beitreten kannst.",
-                        color=discord.Color.orange()
-                    )
-                    view = PasswordButtonView(after.channel.id, channel_name, member.guild.id, member.id)
-                    await member.send(embed=embed, view=view)
-                    logger.info(f"Passwort-Abfrage an {member} für Kanal {channel_name} gesendet")
-                except discord.Forbidden:
-                    logger.warning(f"Konnte keine DM an {member} senden")
-                
-                # Benutzer aus dem Kanal entfernen, wenn er noch verbunden ist
-                if member.voice and member.voice.channel:
-                    try:
-                        await member.move_to(None)
-                        logger.info(f"Nicht autorisierter Benutzer {member.id} wurde aus Talk-Kanal {after.channel.id} entfernt")
-                    except Exception as e:
-                        logger.error(f"Fehler beim Entfernen des Benutzers aus dem Kanal: {e}")
-
-        # Überprüfen, ob ein Benutzer einen Talk-Kanal verlassen hat
-        if before.channel is not None and before.channel.id in bot.talk_creators:
-            if len(before.channel.members) == 0:
-                await asyncio.sleep(60)
-                channel = bot.get_channel(before.channel.id)
-                if channel and len(channel.members) == 0:
-                    try:
-                        await channel.delete(reason="Talk-Kanal leer")
-                        bot.talk_creators.pop(before.channel.id, None)
-                        bot.talk_passwords.pop(before.channel.id, None)
-                        bot.channel_names.pop(before.channel.id, None)
-                        bot.authorized_users.pop(before.channel.id, None)
-                        logger.info(f"Leerer Talk-Kanal {before.channel.name} gelöscht")
-                    except Exception as e:
-                        logger.error(f"Fehler beim Löschen des Talk-Kanals: {e}")
-            else:
-                if member.id == bot.talk_creators.get(before.channel.id):
-                    logger.info(f"Talk-Ersteller {member} hat den Kanal verlassen, aber der Kanal bleibt bestehen, da andere Benutzer noch im Kanal sind")
+async def run_supervisor(token, clusters, shard_count=None):
+    """Startet pro Cluster einen Prozess mit eigenem Shard-Bereich und startet abgestürzte Prozesse neu"""
+    if shard_count is None:
+        shard_count = await fetch_recommended_shard_count(token)
+    ranges = split_shards(shard_count, clusters)
+    logger.info(f"Supervisor startet {len(ranges)} Cluster für {shard_count} Shards")
 
-    except Exception as e:
-        logger.error(f"Fehler in on_voice_state_update: {e}")
-
-# Befehl zum Anzeigen aller verfügbaren Talks
-@bot.tree.command(
-    name="talks_anzeigen",
-    description="Zeigt alle verfügbaren Talks an"
-)
-async def list_talks(interaction: discord.Interaction):
-    """Befehl zum Anzeigen aller verfügbaren Talks"""
-    guild = interaction.guild
-    
-    talk_channels = []
-    for channel_id, creator_id in bot.talk_creators.items():
-        channel = guild.get_channel(channel_id)
-        if channel:
-            is_password_protected = channel_id in bot.talk_passwords
-            is_authorized = (channel_id in bot.authorized_users and interaction.user.id in bot.authorized_users[channel_id]) or \
-                            interaction.user.id == creator_id
-            talk_channels.append({
-                "channel": channel,
-                "password_protected": is_password_protected,
-                "authorized": is_authorized
-            })
-    
-    if not talk_channels:
-        await interaction.response.send_message("Es sind derzeit keine Talks verfügbar.", ephemeral=True)
-        return
-    
-    embed = discord.Embed(
-        title="📣 Verfügbare Talks",
-        description="Hier sind alle verfügbaren Talks auf diesem Server:",
-        color=discord.Color.blue()
-    )
-    
-    for talk in talk_channels:
-        channel = talk["channel"]
-        status = "🔒 Passwortgeschützt" if talk["password_protected"] else "🔓 Offen"
-        access = "✅ Zugriff erlaubt" if talk["authorized"] else "❌ Zugriff verweigert"
-        embed.add_field(
-            name=channel.name,
-            value=f"{status}\n{access}\nMitglieder: {len(channel.members)}",
-            inline=True
+    stopping = asyncio.Event()
+    processes = {}  # {cluster_id: Process}
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    async def supervise(cluster_id, shard_range):
+        env = dict(
+            os.environ,
+            SHARD_COUNT=str(shard_count),
+            SHARD_IDS=f"{shard_range.start}-{shard_range.stop - 1}",
+            CLUSTER_ID=str(cluster_id),
         )
-    
-    await interaction.response.send_message(embed=embed, ephemeral=True)
-
-# Befehl zum Beitreten zu einem Talk
-@bot.tree.command(
-    name="talk_beitreten",
-    description="Tritt einem Talk bei"
-)
-@app_commands.describe(
-    talk_name="Der Name des Talks, dem du beitreten möchtest"
-)
-async def join_talk(interaction: discord.Interaction, talk_name: str):
-    """Befehl zum Beitreten zu einem Talk"""
-    guild = interaction.guild
-    
-    channel = None
-    channel_id = None
-    for ch in guild.voice_channels:
-        if talk_name.lower() in ch.name.lower() and ch.id in bot.talk_creators:
-            channel = ch
-            channel_id = ch.id
-            break
-    
-    if not channel:
-        await interaction.response.send_message(f"❌ Kein Talk mit dem Namen '{talk_name}' gefunden.", ephemeral=True)
-        return
-    
-    is_authorized = (channel_id in bot.authorized_users and interaction.user.id in bot.authorized_users[channel_id]) or \
-                    interaction.user.id == bot.talk_creators.get(channel_id)
-    
-    if is_authorized:
-        if interaction.user.voice and interaction.user.voice.channel:
+        backoff = 1
+        await asyncio.sleep(cluster_id * CLUSTER_START_DELAY)
+        while not stopping.is_set():
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), env=env)
+            processes[cluster_id] = process
+            logger.info(f"Cluster {cluster_id} gestartet (PID {process.pid}, Shards {env['SHARD_IDS']})")
+            code = await process.wait()
+            if stopping.is_set():
+                break
+            # Nach längerer stabiler Laufzeit wieder mit kurzer Wartezeit beginnen
+            backoff = 1 if time.monotonic() - started > 60 else min(backoff * 2, 60)
+            logger.warning(f"Cluster {cluster_id} beendet mit Code {code}, Neustart in {backoff}s")
             try:
-                await interaction.user.move_to(channel)
-                await interaction.response.send_message(f"✅ Du wurdest in den Talk '{channel.name}' verschoben.", ephemeral=True)
-                logger.info(f"Benutzer {interaction.user.id} wurde in Talk-Kanal {channel_id} verschoben")
-            except Exception as e:
-                logger.error(f"Fehler beim Verschieben des Benutzers: {e}")
-                await interaction.response.send_message("❌ Fehler beim Verschieben in den Talk-Kanal.", ephemeral=True)
-        else:
-            await interaction.response.send_message(f"✅ Du bist autorisiert! Bitte tritt dem Talk '{channel.name}' manuell bei, da du nicht in einem Voice-Channel bist.", ephemeral=True)
-    else:
-        if channel_id in bot.talk_passwords:
-            channel_name = bot.channel_names.get(channel_id, channel.name)
-            embed = discord.Embed(
-                title="🔒 Passwortgeschützter Talk",
-                description=f"Der Talk-Kanal '{channel_name}' ist passwortgeschützt. Du musst zuerst das Passwort eingeben, bevor du beitreten kannst.",
-                color=discord.Color.orange()
-            )
-            view = PasswordButtonView(channel_id, channel_name, guild.id, interaction.user.id)
-            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
-            logger.info(f"Passwort-Abfrage an {interaction.user} für Kanal {channel_name} gesendet")
-        else:
-            await interaction.response.send_message("❌ Du bist nicht autorisiert, diesem Talk beizutreten.", ephemeral=True)
-            logger.info(f"Benutzer {interaction.user.id} nicht autorisiert für Talk-Kanal {channel_id}")
+                await asyncio.wait_for(stopping.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+
+    tasks = [loop.create_task(supervise(cluster_id, shard_range)) for cluster_id, shard_range in enumerate(ranges)]
+    await stopping.wait()
+    logger.info("Supervisor wird beendet, stoppe Cluster")
+    for process in processes.values():
+        if process.returncode is None:
+            process.terminate()
+    await asyncio.gather(*(process.wait() for process in processes.values()))
+    for task in tasks:
+        task.cancel()
 
 # Bot starten
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="allosmp Talk Bot")
+    parser.add_argument("--supervisor", action="store_true", help="Cluster-Prozesse starten und überwachen")
+    parser.add_argument("--clusters", type=int, default=1, help="Anzahl der Prozesse im Supervisor-Betrieb")
+    parser.add_argument("--sync-commands", action="store_true", help="Slash-Befehle auch ohne Änderung synchronisieren")
+    parser.add_argument("--shard-count", type=int, default=SHARD_COUNT, help="Gesamtzahl der Shards (Standard: Empfehlung von Discord)")
+    args = parser.parse_args()
+
     bot_token = os.getenv("DISCORD_BOT_TOKEN")
     if not bot_token:
         print("ERROR: DISCORD_BOT_TOKEN nicht gefunden!", flush=True)
@@ -649,10 +3100,20 @@ if __name__ == "__main__":
         print("Bitte installiere PyNaCl mit dem Befehl:", flush=True)
         print("pip install PyNaCl\n\n", flush=True)
     
+    if args.supervisor:
+        try:
+            asyncio.run(run_supervisor(bot_token, args.clusters, args.shard_count))
+        except Exception as e:
+            logger.error(f"Fehler im Supervisor: {e}")
+        rename_log_file()
+
+    bot = TalkBot(shard_count=args.shard_count)
+    bot.force_sync = args.sync_commands
     print("Starting bot...", flush=True)
     try:
         bot.run(bot_token)
     except Exception as e:
         print(f"ERROR: Bot konnte nicht gestartet werden: {e}", flush=True)
         logger.error(f"Fehler beim Ausführen des Bots: {e}")
-        rename_log_file()
+    finalize_logs()
+    logger.info("Bot ordnungsgemäß beendet")